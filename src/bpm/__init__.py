@@ -1,8 +1,15 @@
+from . import bambuasync as bambuasync
+from . import bambucache as bambucache
 from . import bambucommands as bambucommands
 from . import bambuconfig as bambuconfig
 from . import bambudiscovery as bambudiscovery
+from . import bambufleet as bambufleet
+from . import bambuftpspool as bambuftpspool
+from . import bambuprefetch as bambuprefetch
 from . import bambuprinter as bambuprinter
 from . import bambuproject as bambuproject
+from . import bambusdcard as bambusdcard
 from . import bambuspool as bambuspool
 from . import bambustate as bambustate
 from . import bambutools as bambutools
+from . import bambuworkers as bambuworkers
@@ -0,0 +1,365 @@
+"""
+`bambuasync` provides `AsyncBambuPrinter`, an `asyncio` facade over `BambuPrinter` whose
+`mqtt` session is driven by the running event loop.
+"""
+
+import asyncio
+import functools
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+import paho.mqtt.client as mqtt
+
+from bpm.bambuconfig import BambuConfig
+from bpm.bambuprinter import BambuPrinter
+from bpm.bambuproject import ProjectInfo, get_project_info
+from bpm.bambutools import LoggerName, ServiceState
+
+logger = logging.getLogger(LoggerName)
+
+_FTPS_METHODS = frozenset(
+    {
+        "delete_sdcard_file",
+        "delete_sdcard_folder",
+        "download_sdcard_file",
+        "get_sdcard_3mf_files",
+        "get_sdcard_contents",
+        "make_sdcard_directory",
+        "rename_sdcard_file",
+        "sdcard_file_exists",
+        "upload_sdcard_file",
+    }
+)
+"""`BambuPrinter` methods that block on FTPS I/O and are run off the event loop."""
+
+
+class _UpdateSubscriber:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.pending: set[str] | None = None
+
+
+class AsyncBambuPrinter:
+    """
+    An `asyncio` interface to a `BambuPrinter`.
+
+    The printer's `mqtt` socket is registered with the running event loop
+    (`add_reader` / `add_writer`) and serviced with paho's `loop_read` /
+    `loop_write` / `loop_misc`, so a session needs no dedicated thread.  Telemetry
+    is parsed on the event loop and surfaced through `updates()`.
+
+    Every public `BambuPrinter` method is available as a coroutine of the same name.
+    `mqtt` commands only queue a packet and complete immediately; SD card (FTPS)
+    operations run in the default executor, one at a time per printer.  Properties
+    can be read directly; assign writable properties through `printer`.
+
+    Example
+    -------
+    ```python
+    printer = AsyncBambuPrinter(config)
+    await printer.start_session()
+    async for changed in printer.updates():
+        print(printer.printer_state.gcode_state, changed)
+    ```
+    """
+
+    def __init__(
+        self,
+        config: BambuConfig | None = None,
+        printer: BambuPrinter | None = None,
+        reconnect_delay: float = 1.0,
+    ):
+        """
+        Parameters
+        ----------
+        * config : Optional[BambuConfig] = None - Configuration for a new `BambuPrinter`.
+        * printer : Optional[BambuPrinter] = None - An existing printer to wrap instead.
+            Its `on_update` callback is taken over by `updates()`.
+        * reconnect_delay : float = 1.0 - Seconds to wait before reconnecting a lost session.
+        """
+        self._printer = printer if printer is not None else BambuPrinter(config=config)
+        self._printer.on_update = self._on_update
+        self._reconnect_delay = reconnect_delay
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._session: mqtt.Client | None = None
+        self._fd: int | None = None
+        self._writing = False
+        self._socket_closed: asyncio.Event | None = None
+        self._misc_handle: asyncio.TimerHandle | None = None
+        self._reconnect_handle: asyncio.TimerHandle | None = None
+        self._ftps_lock: asyncio.Lock | None = None
+        self._subscribers: set[_UpdateSubscriber] = set()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._printer, name)
+        if not callable(attr):
+            return attr
+
+        if name in _FTPS_METHODS:
+
+            async def call(*args, **kwargs):
+                async with self._get_ftps_lock():
+                    return await asyncio.to_thread(attr, *args, **kwargs)
+
+        else:
+
+            async def call(*args, **kwargs):
+                return attr(*args, **kwargs)
+
+        return functools.update_wrapper(call, attr)
+
+    @property
+    def printer(self) -> BambuPrinter:
+        """The wrapped `BambuPrinter`."""
+        return self._printer
+
+    async def start_session(self):
+        """
+        Connects to the printer and starts servicing its `mqtt` session on the running
+        event loop.  Lost connections are re-established automatically until `quit`.
+        """
+        printer = self._printer
+        logger.debug("start_session - starting async session")
+        if (
+            printer.config.hostname is None
+            or printer.config.access_code is None
+            or printer.config.serial_number is None
+        ):
+            raise Exception("hostname, access_code, and serial_number are required")
+        if self._session is not None or (
+            printer.client and printer.client.is_connected()
+        ):
+            raise Exception("a session is already active")
+
+        self._loop = asyncio.get_running_loop()
+        self._socket_closed = asyncio.Event()
+        self._socket_closed.set()
+
+        printer._create_client()
+        client = printer.client
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+        self._session = client
+        self._misc_handle = self._loop.call_later(1.0, self._misc)
+
+        # the TCP connect and TLS handshake are blocking
+        if await asyncio.to_thread(printer._connect_client):
+            printer._start_watchdog()
+            printer._start_metadata_prefetch()
+        else:
+            self._end_session()
+
+    async def quit(self):
+        """
+        Disconnects from the printer, waits for the socket to close and ends every
+        `updates()` iterator.
+        """
+        client = self._session
+        self._end_session()
+        await asyncio.to_thread(self._printer.quit)
+
+        if client is not None and self._socket_closed is not None:
+            try:
+                await asyncio.wait_for(self._socket_closed.wait(), timeout=5)
+            except TimeoutError:
+                logger.warning("quit - timed out waiting for the mqtt socket to close")
+                self._unwatch_socket()
+
+        for subscriber in self._subscribers:
+            subscriber.event.set()
+
+    async def get_project_info(
+        self,
+        project_file_id: str,
+        project_file_md5: str | None = None,
+        plate_num: int = 1,
+        local_file: str = "",
+        use_cached_list: bool = False,
+    ) -> ProjectInfo | None:
+        """
+        Runs `bambuproject.get_project_info` for this printer in the default executor.
+        """
+        async with self._get_ftps_lock():
+            return await asyncio.to_thread(
+                get_project_info,
+                project_file_id,
+                self._printer,
+                project_file_md5=project_file_md5,
+                plate_num=plate_num,
+                local_file=local_file,
+                use_cached_list=use_cached_list,
+            )
+
+    async def updates(self) -> AsyncIterator[frozenset[str]]:
+        """
+        Yields once per state update until the session quits.
+
+        Updates that arrive while the consumer is busy are merged, so a slow consumer
+        always observes the latest state instead of a backlog.  Each item is the set
+        of changed field paths (see `BambuConfig.report_changed_fields`), or an empty
+        set when change reporting is disabled.
+        """
+        subscriber = _UpdateSubscriber()
+        self._subscribers.add(subscriber)
+        try:
+            while True:
+                await subscriber.event.wait()
+                subscriber.event.clear()
+                changed = subscriber.pending
+                subscriber.pending = None
+                if changed is not None:
+                    yield frozenset(changed)
+                if (
+                    self._session is None
+                    and self._printer.service_state == ServiceState.QUIT
+                ):
+                    return
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def _get_ftps_lock(self) -> asyncio.Lock:
+        if self._ftps_lock is None:
+            self._ftps_lock = asyncio.Lock()
+        return self._ftps_lock
+
+    def _call_in_loop(self, fn, *args):
+        # paho callbacks can fire on the scheduler / executor threads as well
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            fn(*args)
+        else:
+            loop.call_soon_threadsafe(fn, *args)
+
+    def _on_update(self, printer: BambuPrinter, changed: frozenset[str] = frozenset()):
+        self._call_in_loop(self._publish, changed)
+
+    def _publish(self, changed: frozenset[str]):
+        for subscriber in self._subscribers:
+            if subscriber.pending is None:
+                subscriber.pending = set()
+            subscriber.pending.update(changed)
+            subscriber.event.set()
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._call_in_loop(self._watch_socket, client, sock.fileno())
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._call_in_loop(self._socket_lost, client)
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._call_in_loop(self._set_writing, client, True)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._call_in_loop(self._set_writing, client, False)
+
+    def _watch_socket(self, client: mqtt.Client, fd: int):
+        if client is not self._printer.client:
+            return
+        self._unwatch_socket()
+        self._fd = fd
+        self._socket_closed.clear()
+        self._loop.add_reader(fd, self._on_readable, client)
+
+    def _unwatch_socket(self):
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._loop.remove_writer(self._fd)
+            self._fd = None
+            self._writing = False
+        self._socket_closed.set()
+
+    def _set_writing(self, client: mqtt.Client, writing: bool):
+        if self._fd is None or client is not self._printer.client:
+            return
+        if writing and not self._writing:
+            self._loop.add_writer(self._fd, self._on_writable, client)
+        elif not writing and self._writing:
+            self._loop.remove_writer(self._fd)
+        self._writing = writing
+
+    def _socket_lost(self, client: mqtt.Client):
+        if client is not self._printer.client:
+            return
+        self._unwatch_socket()
+        if self._session is client:
+            self._reconnect_handle = self._loop.call_later(
+                self._reconnect_delay, self._start_reconnect, client
+            )
+        else:
+            # the session was ended; `on_disconnect` may have run after `quit`
+            self._printer.service_state = ServiceState.QUIT
+
+    def _start_reconnect(self, client: mqtt.Client):
+        self._reconnect_handle = None
+        if self._session is client and client.socket() is None:
+            self._loop.create_task(self._reconnect(client))
+
+    async def _reconnect(self, client: mqtt.Client):
+        try:
+            logger.debug("_reconnect - reconnecting async session")
+            await asyncio.to_thread(client.reconnect)
+        except Exception as e:
+            logger.debug(f"_reconnect - reconnect failed - reason: [{e}]")
+            if self._session is client:
+                self._reconnect_handle = self._loop.call_later(
+                    self._reconnect_delay, self._start_reconnect, client
+                )
+
+    def _on_readable(self, client: mqtt.Client):
+        try:
+            client.loop_read()
+            # TLS may have decrypted more records than the kernel reports
+            sock = client.socket()
+            while sock is not None and getattr(sock, "pending", lambda: 0)():
+                client.loop_read()
+                sock = client.socket()
+        except Exception as e:
+            self._session_failed(client, e)
+
+    def _on_writable(self, client: mqtt.Client):
+        try:
+            client.loop_write()
+        except Exception as e:
+            self._session_failed(client, e)
+
+    def _misc(self):
+        client = self._session
+        if client is None:
+            self._misc_handle = None
+            return
+        try:
+            if client.socket() is not None:
+                client.loop_misc()
+        except Exception as e:
+            self._session_failed(client, e)
+        if self._session is not None:
+            self._misc_handle = self._loop.call_later(1.0, self._misc)
+
+    def _end_session(self):
+        self._session = None
+        for handle in (self._misc_handle, self._reconnect_handle):
+            if handle is not None:
+                handle.cancel()
+        self._misc_handle = self._reconnect_handle = None
+
+    def _session_failed(self, client: mqtt.Client, e: Exception):
+        # mirrors the handling around `loop_forever` for standalone sessions
+        logger.exception("_session_failed - an internal exception occurred")
+        self._end_session()
+        self._printer._internalException = e
+        if client.is_connected():
+            client.disconnect()
+        self._printer.service_state = ServiceState.QUIT
+        for subscriber in self._subscribers:
+            subscriber.event.set()
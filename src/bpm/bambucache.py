@@ -0,0 +1,628 @@
+"""
+`bambucache` manages the on-disk cache under `bpm_cache_path`: `BambuCacheManager`
+bounds its size and age, and `ProjectMetadataCache` keeps the parsed `3mf` metadata used
+by `get_project_info` as one record per project file with an in-memory index, so a
+lookup by SD card path or md5 never touches the disk unless the record is needed.
+Parsed contents are stored once per md5 and shared by every printer.
+`ProjectInfoCache` sits in front of both and answers repeat lookups from memory.
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from bpm.bambutools import LoggerName
+
+if TYPE_CHECKING:
+    from bpm.bambuproject import ProjectInfo
+
+logger = logging.getLogger(LoggerName)
+
+RECORD_VERSION = 1
+"""Format version written to every record; records with any other version are dropped."""
+
+# a download or atomic write younger than this may still be in progress (in this or
+# another process) and is left alone by the startup sweep
+_ORPHAN_GRACE = 300.0
+# how often the access time of a hot entry is written back to disk, so LRU order and
+# `max_age` survive a restart without an `utime` on every hit
+_PERSIST_ACCESS_AFTER = 3600.0
+# minimum seconds between `max_age` scans triggered by writes
+_EXPIRE_INTERVAL = 60.0
+
+
+@dataclasses.dataclass
+class BambuCacheStats:
+    """Counters describing a `BambuCacheManager`'s contents and behaviour."""
+
+    entries: int = 0
+    """Files currently tracked in the cache."""
+    bytes: int = 0
+    """Total size of the tracked files."""
+    hits: int = 0
+    """Metadata lookups answered from the cache."""
+    misses: int = 0
+    """Metadata lookups that had to parse the `3mf`."""
+    evictions: int = 0
+    """Files removed for exceeding `max_bytes` or `max_age`."""
+    orphans_removed: int = 0
+    """Partial downloads and temporary files removed by the startup sweep."""
+
+
+class _CacheEntry:
+    __slots__ = ("size", "accessed", "persisted")
+
+    def __init__(self, size: int, accessed: float):
+        self.size = size
+        self.accessed = self.persisted = accessed
+
+
+class BambuCacheManager:
+    """
+    Bounds the `3mf` metadata cache under one `bpm_cache_path`: the shared `projects/`
+    contents and `thumbnails/`, and every printer's `metadata/` records.  Nothing else
+    under `bpm_cache_path` (e.g. `elapsed/` job state) is tracked or evicted.
+
+    Every cached file is tracked in least-recently-used order.  Writers report new
+    files with `record`, readers report hits with `touch`; once the total exceeds
+    `max_bytes` the least recently used files are deleted, and files not used for
+    `max_age` seconds are deleted as well.  Access times are seeded from the files'
+    modification times when the manager is created and written back occasionally, so
+    the order survives restarts.
+
+    Creating the manager starts a background sweep of those directories that seeds the
+    LRU order and removes `3mf` copies and temporary files left behind by downloads or
+    writes that never finished (e.g. after a crash).  One manager is shared per
+    directory by every printer in the process.
+    """
+
+    _shared: dict[Path, "BambuCacheManager"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root: Path, max_bytes: int = 0, max_age: float = 0.0):
+        """
+        Parameters
+        ----------
+        * root : Path - The cache directory (`bpm_cache_path`).
+        * max_bytes : int = 0 - Maximum total size of the cached files (`0` for no limit).
+        * max_age : float = 0.0 - Seconds an unused file is kept (`0` for no limit).
+        """
+        self.root = Path(root).absolute()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Path, _CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._stats = BambuCacheStats()
+        self._last_expired = 0.0
+        self._swept = threading.Event()
+        threading.Thread(
+            target=self._sweep, name="bambuprinter-cache-sweep", daemon=True
+        ).start()
+
+    @classmethod
+    def shared(cls, root: Path) -> "BambuCacheManager":
+        """The manager shared by every caller in the process for `root`."""
+        key = Path(root).absolute()
+        with cls._shared_lock:
+            manager = cls._shared.get(key)
+            if manager is None:
+                manager = cls._shared[key] = cls(key)
+            return manager
+
+    @property
+    def stats(self) -> BambuCacheStats:
+        """A snapshot of the cache's statistics."""
+        with self._lock:
+            self._stats.entries = len(self._entries)
+            self._stats.bytes = self._bytes
+            return dataclasses.replace(self._stats)
+
+    def record(self, path: Path, size: int | None = None):
+        """
+        Tracks a file that was just written (or rewritten) as the most recently used
+        entry, then evicts whatever no longer fits.
+        """
+        path = Path(path).absolute()
+        if size is None:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                return
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._bytes -= entry.size
+            self._entries[path] = _CacheEntry(size, now)
+            self._bytes += size
+        self.enforce()
+
+    def touch(self, path: Path):
+        """Marks a cached file as just used."""
+        path = Path(path).absolute()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return
+            entry.accessed = now
+            self._entries.move_to_end(path)
+            persist = now - entry.persisted >= _PERSIST_ACCESS_AFTER
+            if persist:
+                entry.persisted = now
+        if persist:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def hit(self, path: Path | None = None):
+        """Counts a metadata lookup served from the cache, marking `path` as just used."""
+        with self._lock:
+            self._stats.hits += 1
+        if path is not None:
+            self.touch(path)
+
+    def miss(self):
+        """Counts a metadata lookup that could not be served from the cache."""
+        with self._lock:
+            self._stats.misses += 1
+
+    def forget(self, path: Path):
+        """Stops tracking a file its owner has deleted."""
+        with self._lock:
+            entry = self._entries.pop(Path(path).absolute(), None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def enforce(self):
+        """Evicts files until the cache is within `max_bytes` and `max_age`."""
+        now = time.time()
+        victims: list[Path] = []
+        with self._lock:
+            if self.max_age > 0 and now - self._last_expired >= _EXPIRE_INTERVAL:
+                self._last_expired = now
+                cutoff = now - self.max_age
+                while self._entries:
+                    if next(iter(self._entries.values())).accessed > cutoff:
+                        break
+                    victims.append(self._evict_oldest())
+            if self.max_bytes > 0:
+                while self._bytes > self.max_bytes and self._entries:
+                    victims.append(self._evict_oldest())
+            self._stats.evictions += len(victims)
+        for path in victims:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.debug(
+                    f"BambuCacheManager - could not evict [{path}] - reason: [{e}]"
+                )
+        if victims:
+            logger.debug(f"BambuCacheManager - evicted [{len(victims)}] cache entries")
+
+    def _evict_oldest(self) -> Path:
+        # called with the lock held
+        path, entry = self._entries.popitem(last=False)
+        self._bytes -= entry.size
+        return path
+
+    def _sweep(self):
+        try:
+            self._sweep_directories()
+            self.enforce()
+        except Exception:
+            logger.exception("BambuCacheManager - cache sweep failed")
+        finally:
+            self._swept.set()
+
+    def _sweep_directories(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        # `get_project_info` downloads into `{root}/{serial_number}/` (or `root` without
+        # a serial) and deletes its copy once parsed
+        for path in [*self.root.glob("*.3mf"), *self.root.glob("*/*.3mf")]:
+            self._remove_orphan(path, now)
+
+        found: list[tuple[float, Path, int]] = []
+        owned = [
+            self.root / "projects",
+            self.root / "thumbnails",
+            self.root / "metadata",
+            *self.root.glob("*/metadata"),
+        ]
+        for owned_dir in owned:
+            for directory, _, files in os.walk(owned_dir):
+                for name in files:
+                    path = Path(directory) / name
+                    if name.endswith(".tmp"):
+                        self._remove_orphan(path, now)
+                        continue
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, path, st.st_size))
+
+        with self._lock:
+            # files recorded while the sweep ran are newer than anything it found
+            entries: OrderedDict[Path, _CacheEntry] = OrderedDict()
+            for mtime, path, size in sorted(found):
+                if path not in self._entries:
+                    entries[path] = _CacheEntry(size, mtime)
+                    self._bytes += size
+            entries.update(self._entries)
+            self._entries = entries
+
+    def _remove_orphan(self, path: Path, now: float):
+        try:
+            if now - path.stat().st_mtime < _ORPHAN_GRACE:
+                return
+            path.unlink()
+        except OSError:
+            return
+        logger.debug(f"BambuCacheManager - removing orphaned file [{path}]")
+        with self._lock:
+            self._stats.orphans_removed += 1
+
+
+@dataclass
+class _IndexEntry:
+    file: Path
+    size: int
+    timestamp: int
+    md5: str
+
+
+class ProjectMetadataCache:
+    """
+    The metadata records stored in one cache directory.
+
+    `get_project_info` keeps two of them.  `{bpm_cache_path}/projects` holds the parsed
+    contents of each distinct `3mf`, keyed (and named) by md5 and shared by every
+    printer; `{bpm_cache_path}/{serial_number}/metadata` holds one record per SD card
+    file that points at those contents by md5.  Records written before the contents
+    were shared keep their `plates` / `plate_data` inline and are still read.
+
+    Each record is a compact JSON document written to a temporary file and renamed into
+    place, so a reader never sees a partial record:
+
+    ```json
+    {"version": 1, "id": "A1B2...", "md5": "A1B2...", "plates": [1, 2],
+     "plate_data": {"1": {"thumbnail_md5": "...", "topimg_md5": "...", "metadata": {}}}}
+    {"version": 1, "id": "/cache/model.3mf", "name": "model.3mf", "size": 1234,
+     "timestamp": 1700000000, "md5": "A1B2..."}
+    ```
+
+    The directory is scanned once, when the cache is first opened; records in an older
+    format (including the previous one-file-per-plate layout) are removed at that point.
+    From then on the index is kept in step with `put` / `remove`, so lookups by path or
+    md5 are dictionary hits and a cache hit costs a single small read.
+    """
+
+    _shared: dict[Path, "ProjectMetadataCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory: Path, manager: BambuCacheManager | None = None):
+        """
+        Parameters
+        ----------
+        * directory : Path - The directory holding the records (created if missing).
+        * manager : Optional[BambuCacheManager] - Tracks the records' size and use.
+        """
+        self.directory = Path(directory)
+        self.manager = manager
+        self._lock = threading.Lock()
+        self._by_id: dict[str, _IndexEntry] = {}
+        self._by_md5: dict[str, str] = {}
+        self._by_file: dict[Path, str] = {}
+        self._load_index()
+
+    @classmethod
+    def shared(
+        cls, directory: Path, manager: BambuCacheManager | None = None
+    ) -> "ProjectMetadataCache":
+        """
+        The cache instance shared by every caller in the process for `directory`;
+        `manager` is only used when the instance is first created.
+        """
+        key = Path(directory).absolute()
+        with cls._shared_lock:
+            cache = cls._shared.get(key)
+            if cache is None:
+                cache = cls._shared[key] = cls(key, manager)
+            return cache
+
+    def __contains__(self, project_id: str) -> bool:
+        with self._lock:
+            return project_id in self._by_id
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._by_id)
+
+    def find(
+        self,
+        project_id: str,
+        size: int | None = None,
+        timestamp: int | None = None,
+        md5: str | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Returns the record for `project_id` if it is still valid, otherwise `None`.
+
+        A record is valid if `md5` matches its md5, or if both `size` and `timestamp`
+        match the values it was written with.  Validity is decided from the index, so a
+        stale or missing record costs no disk access.
+
+        Parameters
+        ----------
+        * project_id : str - The SD card path of the `3mf`.
+        * size : Optional[int] - The file's current size on the SD card.
+        * timestamp : Optional[int] - The file's current timestamp on the SD card.
+        * md5 : Optional[str] - The file's md5, if known.
+        """
+        with self._lock:
+            entry = self._by_id.get(project_id)
+        record = None
+        if entry is not None and _is_current(entry, size, timestamp, md5):
+            record = self._read(project_id, entry)
+        if record is not None and self.manager:
+            self.manager.touch(entry.file)
+        return record
+
+    def has(
+        self,
+        project_id: str,
+        size: int | None = None,
+        timestamp: int | None = None,
+        md5: str | None = None,
+    ) -> bool:
+        """
+        Returns whether `find` would return a record, without reading it.
+        """
+        with self._lock:
+            entry = self._by_id.get(project_id)
+        return entry is not None and _is_current(entry, size, timestamp, md5)
+
+    def get_by_md5(self, md5: str) -> dict[str, Any] | None:
+        """Returns the most recently written record whose file has `md5`, if any."""
+        with self._lock:
+            project_id = self._by_md5.get(md5.upper())
+            entry = self._by_id.get(project_id) if project_id else None
+        if entry is None:
+            return None
+        record = self._read(project_id, entry)
+        if record is not None and self.manager:
+            self.manager.touch(entry.file)
+        return record
+
+    def put(self, record: dict[str, Any]):
+        """Writes (or replaces) the record for `record["id"]`."""
+        record = {"version": RECORD_VERSION, **record}
+        project_id = record["id"]
+        file = self.directory / f"{project_id.lstrip('/').replace('/', '-')}.json"
+        tmp = file.with_name(f"{file.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w") as f:
+            json.dump(record, f, separators=(",", ":"))
+        tmp.replace(file)
+        with self._lock:
+            self._unindex(project_id)
+            self._index(record, file)
+        if self.manager:
+            self.manager.record(file)
+
+    def remove(self, project_id: str):
+        """Drops the record for `project_id`, if there is one."""
+        with self._lock:
+            entry = self._unindex(project_id)
+        if entry is not None:
+            entry.file.unlink(missing_ok=True)
+            if self.manager:
+                self.manager.forget(entry.file)
+
+    def remove_tree(self, path: str):
+        """Drops the records for `path` and for every project file beneath it."""
+        path = "/" + path.strip("/")
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            project_ids = [k for k in self._by_id if k == path or k.startswith(prefix)]
+        for project_id in project_ids:
+            self.remove(project_id)
+
+    def _read(self, project_id: str, entry: _IndexEntry) -> dict[str, Any] | None:
+        try:
+            with entry.file.open("r") as f:
+                record = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(
+                f"ProjectMetadataCache - dropping unreadable record [{entry.file.name}] - reason: [{e}]"
+            )
+            with self._lock:
+                if self._by_id.get(project_id) is entry:
+                    self._unindex(project_id)
+            return None
+        # another path may have been written over the same file name since it was indexed
+        if not isinstance(record, dict) or record.get("id") != project_id:
+            return None
+        return record
+
+    def _load_index(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for file in self.directory.iterdir():
+            if file.suffix == ".tmp":
+                file.unlink(missing_ok=True)
+                continue
+            if file.suffix != ".json":
+                continue
+            try:
+                with file.open("r") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                record = None
+            if (
+                not isinstance(record, dict)
+                or record.get("version") != RECORD_VERSION
+                or "id" not in record
+            ):
+                logger.debug(
+                    f"ProjectMetadataCache - removing outdated record [{file.name}]"
+                )
+                file.unlink(missing_ok=True)
+                if self.manager:
+                    self.manager.forget(file)
+                continue
+            self._index(record, file)
+
+    def _index(self, record: dict[str, Any], file: Path):
+        # called with the lock held (or before the cache is shared)
+        # two SD card paths can map to the same file name ("/a-b.3mf", "/a/b.3mf")
+        previous = self._by_file.get(file)
+        if previous is not None and previous != record["id"]:
+            self._unindex(previous)
+        entry = _IndexEntry(
+            file,
+            record.get("size", 0),
+            record.get("timestamp", 0),
+            (record.get("md5") or "").upper(),
+        )
+        self._by_id[record["id"]] = entry
+        self._by_file[file] = record["id"]
+        if entry.md5:
+            self._by_md5[entry.md5] = record["id"]
+
+    def _unindex(self, project_id: str) -> _IndexEntry | None:
+        # called with the lock held
+        entry = self._by_id.pop(project_id, None)
+        if entry is None:
+            return None
+        if self._by_file.get(entry.file) == project_id:
+            del self._by_file[entry.file]
+        if self._by_md5.get(entry.md5) == project_id:
+            del self._by_md5[entry.md5]
+        return entry
+
+
+def _is_current(
+    entry: "_IndexEntry | ProjectInfo",
+    size: int | None,
+    timestamp: int | None,
+    md5: str | None,
+) -> bool:
+    # the md5 alone, or both size and timestamp, identify an unchanged file
+    return bool(md5 and entry.md5 == md5.upper()) or (
+        size is not None
+        and timestamp is not None
+        and entry.size == size
+        and entry.timestamp == timestamp
+    )
+
+
+class ProjectInfoCache:
+    """
+    A bounded, process-wide LRU of the `ProjectInfo` objects returned by
+    `get_project_info`, keyed by printer serial, SD card path and plate.
+
+    An entry is only returned while the file it was parsed from is unchanged: the
+    caller's `md5`, or its `size` and `timestamp`, must match the cached `ProjectInfo`,
+    exactly as for `ProjectMetadataCache.find`.  A hit touches neither the disk nor the
+    printer.  `BambuPrinter` invalidates entries whenever it changes the card itself
+    (upload, delete, rename).
+
+    The cached objects are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Parameters
+        ----------
+        * max_entries : int = 256 - Plates kept in memory (`0` disables the cache).
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, int], ProjectInfo] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(
+        self,
+        serial: str,
+        project_id: str,
+        plate_num: int,
+        size: int | None = None,
+        timestamp: int | None = None,
+        md5: str | None = None,
+    ) -> "ProjectInfo | None":
+        """
+        Returns the cached `ProjectInfo` for a plate if it is still valid, otherwise
+        `None` (dropping the stale entry).
+
+        Parameters
+        ----------
+        * serial : str - The printer's serial number.
+        * project_id : str - The SD card path of the `3mf`.
+        * plate_num : int - The plate number requested from `get_project_info`.
+        * size : Optional[int] - The file's current size on the SD card.
+        * timestamp : Optional[int] - The file's current timestamp on the SD card.
+        * md5 : Optional[str] - The file's md5, if known.
+        """
+        key = (serial, project_id, plate_num)
+        with self._lock:
+            info = self._entries.get(key)
+            if info is None:
+                return None
+            if _is_current(info, size, timestamp, md5):
+                self._entries.move_to_end(key)
+                return info
+            del self._entries[key]
+            return None
+
+    def put(self, serial: str, plate_num: int, info: "ProjectInfo"):
+        """
+        Caches `info` as the answer for `plate_num` of `info.id` (which may differ from
+        `info.plate_num` when the requested plate does not exist).
+        """
+        if self.max_entries <= 0:
+            return
+        key = (serial, info.id, plate_num)
+        with self._lock:
+            self._entries[key] = info
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, serial: str, project_id: str):
+        """Drops every cached plate of one project file."""
+        self.invalidate_tree(serial, project_id)
+
+    def invalidate_tree(self, serial: str, path: str):
+        """Drops the cached plates of every project file at or beneath `path`."""
+        path = "/" + path.strip("/")
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            for key in [
+                k
+                for k in self._entries
+                if k[0] == serial and (k[1] == path or k[1].startswith(prefix))
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drops every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+project_info_cache = ProjectInfoCache()
+"""process-wide `ProjectInfo` cache used by `get_project_info`"""
@@ -6,7 +6,12 @@ import logging
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from bpm.bambutools import LoggerName, PrinterModel, getPrinterModelBySerial
+from bpm.bambutools import (
+    LoggerName,
+    PrinterModel,
+    UpdateDispatchMode,
+    getPrinterModelBySerial,
+)
 
 logger = logging.getLogger(LoggerName)
 
@@ -130,6 +135,38 @@ class BambuConfig:
     """Toggles air-print detection to detect clogging or filament grinding conditions."""
     verbose: bool = False
     """Provides an additional log level for dumping all messages"""
+    report_changed_fields: bool = False
+    """If True, `on_update` is called as `on_update(printer, changed)` with the `frozenset` of field paths that changed."""
+    update_dispatch_mode: UpdateDispatchMode = UpdateDispatchMode.SYNCHRONOUS
+    """Whether `on_update` runs on the `mqtt` thread for every update or is coalesced onto a dispatcher thread."""
+    update_max_rate: float = 5.0
+    """Maximum `on_update` deliveries per second in `COALESCED` mode (`0` disables the limit)."""
+    ftps_pool_size: int = 2
+    """Maximum number of idle FTPS sessions kept warm for SD card operations (`0` disables pooling)."""
+    ftps_idle_timeout: float = 60.0
+    """Duration in seconds an unused pooled FTPS session is kept before being closed."""
+    ftps_keepalive_interval: float = 20.0
+    """Seconds between keepalive `NOOP`s sent on idle pooled FTPS sessions (`0` disables keepalives)."""
+    ftps_prefer_mlsd: bool = True
+    """List SD card directories with `MLSD` when the printer advertises it, falling back to `LIST`."""
+    ftps_ranged_reads: bool = True
+    """Read `3mf` metadata with ranged FTPS transfers when the printer reported its md5."""
+    sdcard_listing_ttl: float = 30.0
+    """Seconds a cached SD card directory listing is reused before being re-listed (`0` disables caching)."""
+    sdcard_listing_workers: int = 2
+    """Maximum SD card directories listed concurrently, each over its own FTPS session."""
+    cache_max_bytes: int = 256 * 1024 * 1024
+    """Maximum total size of the `3mf` metadata cache under `bpm_cache_path`; least recently used files are evicted first (`0` disables the limit)."""
+    cache_max_age: float = 30 * 24 * 3600.0
+    """Seconds a file in the `3mf` metadata cache is kept after it was last used (`0` disables the limit)."""
+    metadata_prefetch: bool = False
+    """Parse every `3mf` on the SD card into the metadata cache in the background while the printer is idle."""
+    metadata_prefetch_workers: int = 1
+    """Maximum `3mf` files the background prefetch reads concurrently, each over its own FTPS session."""
+    metadata_prefetch_max_rate: int = 1024 * 1024
+    """Bytes per second the background prefetch may read, charging each file at its full size (`0` disables the limit)."""
+    metadata_prefetch_interval: float = 300.0
+    """Seconds between background prefetch passes over the SD card."""
 
     def __post_init__(self):
         """
@@ -0,0 +1,387 @@
+"""
+`bambufleet` drives the `mqtt` sessions of many `BambuPrinter` instances from a single
+selector-based network thread.
+"""
+
+import logging
+import selectors
+import socket
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any
+
+import paho.mqtt.client as mqtt
+
+from bpm.bambuprinter import BambuPrinter
+from bpm.bambutools import LoggerName, ServiceState
+from bpm.bambuworkers import BambuJobExecutor, BambuScheduler
+
+logger = logging.getLogger(LoggerName)
+
+
+@dataclass
+class FleetState:
+    """An aggregate snapshot of every printer in a `BambuFleet`."""
+
+    printers: int = 0
+    """The number of printers in the fleet."""
+    service_states: dict[str, int] = field(default_factory=dict)
+    """Number of printers per `ServiceState` name."""
+    gcode_states: dict[str, int] = field(default_factory=dict)
+    """Number of printers per reported `gcode_state`."""
+    printing: list[str] = field(default_factory=list)
+    """Serial numbers of printers that are preparing or running a job."""
+    hms_errors: list[str] = field(default_factory=list)
+    """Serial numbers of printers reporting HMS errors."""
+    sockets: int = 0
+    """The number of `mqtt` sockets registered with the network loop."""
+
+
+class BambuFleet:
+    """
+    Manages a group of `BambuPrinter` instances that share one network thread.
+
+    Without a fleet every session runs paho's `loop_forever` on its own thread.  A
+    fleet instead registers each client's socket with one `selectors` loop and drives
+    it with `loop_read` / `loop_write` / `loop_misc`.  Blocking connects and reconnects
+    run on a small connector pool, and watchdogs and delayed refreshes use the
+    process-wide `BambuScheduler`, so a fleet of any size needs a fixed number of
+    threads.
+
+    Example
+    -------
+    ```python
+    fleet = BambuFleet()
+    for config in configs:
+        printer = BambuPrinter(config=config)
+        printer.on_update = on_update
+        fleet.add(printer)
+    fleet.start_sessions()
+    ```
+    """
+
+    def __init__(
+        self,
+        name: str = "bambufleet",
+        max_connect_workers: int = 4,
+        reconnect_delay: float = 1.0,
+    ):
+        """
+        Parameters
+        ----------
+        * name : str = "bambufleet" - Prefix for the fleet's thread names.
+        * max_connect_workers : int = 4 - Threads used for blocking connects / reconnects.
+        * reconnect_delay : float = 1.0 - Seconds to wait before reconnecting a lost session.
+        """
+        self._name = name
+        self._reconnect_delay = reconnect_delay
+        self._lock = threading.RLock()
+        self._printers: dict[str, BambuPrinter] = {}
+        self._sessions: dict[str, mqtt.Client] = {}
+        self._scheduler = BambuScheduler.shared()
+        self._connector = BambuJobExecutor(
+            max_workers=max_connect_workers,
+            max_pending=1024,
+            name=f"{name}-connect",
+        )
+        self._selector: selectors.BaseSelector | None = None
+        self._wakeup_r: socket.socket | None = None
+        self._wakeup_w: socket.socket | None = None
+        self._ops: deque[tuple[Any, ...]] = deque()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+    def add(self, printer: BambuPrinter):
+        """
+        Adds a printer to the fleet.  Its sessions will be driven by the fleet's network
+        loop from the next call to `start_session`.
+
+        Parameters
+        ----------
+        * printer : BambuPrinter - The printer to add.  Its `serial_number` must be set.
+        """
+        serial = printer.config.serial_number
+        if not serial:
+            raise Exception("serial_number is required")
+        with self._lock:
+            if serial in self._printers:
+                raise Exception(f"printer [{serial}] is already part of the fleet")
+            self._printers[serial] = printer
+            printer._fleet = self
+
+    def remove(self, serial: str) -> BambuPrinter | None:
+        """
+        Quits the printer's session (if any) and removes it from the fleet.
+
+        Returns
+        -------
+        The removed `BambuPrinter`, or `None` if no printer has that serial number.
+        """
+        with self._lock:
+            printer = self._printers.pop(serial, None)
+        if printer is None:
+            return None
+        if printer.service_state != ServiceState.QUIT:
+            printer.quit()
+        self._end_session(printer)
+        printer._fleet = None
+        return printer
+
+    @property
+    def printers(self) -> dict[str, BambuPrinter]:
+        """A copy of the fleet's printers keyed by serial number."""
+        with self._lock:
+            return dict(self._printers)
+
+    def start_sessions(self):
+        """Starts a session for every printer in the fleet that is not already connected."""
+        for printer in self.printers.values():
+            if printer.client and printer.client.is_connected():
+                continue
+            printer.start_session()
+
+    def quit(self):
+        """Quits every printer's session and stops the fleet's threads."""
+        for printer in self.printers.values():
+            if printer.service_state != ServiceState.QUIT:
+                printer.quit()
+
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wakeup()
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._connector.shutdown()
+        logger.debug(f"{self._name} - fleet has terminated")
+
+    @property
+    def state(self) -> FleetState:
+        """An aggregate snapshot of the fleet's printers."""
+        state = FleetState()
+        service_states: Counter[str] = Counter()
+        gcode_states: Counter[str] = Counter()
+        for serial, printer in self.printers.items():
+            state.printers += 1
+            service_states[printer.service_state.name] += 1
+            printer_state = printer.printer_state
+            gcode_states[printer_state.gcode_state] += 1
+            if printer_state.gcode_state in ("PREPARE", "RUNNING"):
+                state.printing.append(serial)
+            if printer_state.hms_errors:
+                state.hms_errors.append(serial)
+        state.service_states = dict(service_states)
+        state.gcode_states = dict(gcode_states)
+        with self._lock:
+            if self._selector is not None:
+                state.sockets = max(0, len(self._selector.get_map()) - 1)
+        return state
+
+    def _start_session(self, printer: BambuPrinter):
+        """
+        Called by `BambuPrinter.start_session` once its client has been created.  Hooks
+        the client's socket callbacks up to the network loop and connects it on the
+        connector pool.
+        """
+        client = printer.client
+        serial = printer.config.serial_number
+
+        def on_socket_open(client, userdata, sock):
+            self._post_op("open", client, sock, printer)
+
+        def on_socket_close(client, userdata, sock):
+            self._post_op("close", client, sock, printer)
+            with self._lock:
+                active = self._sessions.get(serial) is client
+            if active:
+                self._schedule_reconnect(printer, client)
+            elif printer.client is client:
+                # the session was ended; `on_disconnect` may have run after `quit`
+                printer.service_state = ServiceState.QUIT
+
+        def on_socket_register_write(client, userdata, sock):
+            self._post_op("write", client, sock, True)
+
+        def on_socket_unregister_write(client, userdata, sock):
+            self._post_op("write", client, sock, False)
+
+        client.on_socket_open = on_socket_open
+        client.on_socket_close = on_socket_close
+        client.on_socket_register_write = on_socket_register_write
+        client.on_socket_unregister_write = on_socket_unregister_write
+
+        with self._lock:
+            self._sessions[serial] = client
+            self._stopping = False
+            self._ensure_loop()
+
+        self._connector.submit(("connect", serial), printer._connect_client)
+
+    def _end_session(self, printer: BambuPrinter):
+        """Stops the fleet from reconnecting the printer's current client."""
+        with self._lock:
+            serial = printer.config.serial_number
+            if self._sessions.get(serial) is printer.client:
+                del self._sessions[serial]
+
+    def _schedule_reconnect(self, printer: BambuPrinter, client: mqtt.Client):
+        self._scheduler.call_later(
+            self._reconnect_delay, self._submit_reconnect, printer, client
+        )
+
+    def _submit_reconnect(self, printer: BambuPrinter, client: mqtt.Client):
+        self._connector.submit(
+            ("reconnect", printer.config.serial_number), self._reconnect, printer, client
+        )
+
+    def _reconnect(self, printer: BambuPrinter, client: mqtt.Client):
+        with self._lock:
+            current = self._sessions.get(printer.config.serial_number)
+        if (
+            self._stopping
+            or current is not client
+            or printer.client is not client
+            or printer.service_state == ServiceState.QUIT
+            or client.socket() is not None
+        ):
+            return
+        try:
+            logger.debug(f"{self._name} - reconnecting [{printer.config.serial_number}]")
+            client.reconnect()
+        except Exception as e:
+            logger.debug(
+                f"{self._name} - reconnect failed for [{printer.config.serial_number}] - reason: [{e}]"
+            )
+            self._schedule_reconnect(printer, client)
+
+    def _ensure_loop(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(
+            target=self._run, name=f"{self._name}-network", daemon=True
+        )
+        self._thread.start()
+
+    def _post_op(self, *op):
+        # socket callbacks fire on whichever thread touched the client; only the
+        # network thread may modify the selector
+        if threading.current_thread() is self._thread:
+            self._apply_op(op)
+        else:
+            self._ops.append(op)
+            self._wakeup()
+
+    def _wakeup(self):
+        wakeup_w = self._wakeup_w
+        if wakeup_w is not None:
+            try:
+                wakeup_w.send(b"\0")
+            except (BlockingIOError, OSError):
+                pass
+
+    def _apply_op(self, op: tuple[Any, ...]):
+        kind, client, sock = op[0], op[1], op[2]
+        selector = self._selector
+        if selector is None:
+            return
+        try:
+            if kind == "open":
+                selector.register(sock, selectors.EVENT_READ, (op[3], client))
+            elif kind == "close":
+                selector.unregister(sock)
+            elif kind == "write":
+                key = selector.get_key(sock)
+                events = selectors.EVENT_READ
+                if op[3]:
+                    events |= selectors.EVENT_WRITE
+                if key.events != events:
+                    selector.modify(sock, events, key.data)
+        except (KeyError, ValueError):
+            # the socket was closed before the operation reached the network thread
+            pass
+
+    def _run(self):
+        logger.debug(f"{self._name} - network loop started")
+        selector = self._selector
+        next_misc = time.monotonic() + 1.0
+        while True:
+            if self._stopping and self._finish(selector):
+                break
+            while self._ops:
+                self._apply_op(self._ops.popleft())
+
+            for key, mask in selector.select(max(0.0, next_misc - time.monotonic())):
+                if key.data is None:
+                    try:
+                        while key.fileobj.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    continue
+                printer, client = key.data
+                try:
+                    if mask & selectors.EVENT_READ:
+                        client.loop_read()
+                        # TLS may have decrypted more records than the kernel reports
+                        sock = client.socket()
+                        while sock is not None and getattr(sock, "pending", lambda: 0)():
+                            client.loop_read()
+                            sock = client.socket()
+                    if mask & selectors.EVENT_WRITE and client.socket() is not None:
+                        client.loop_write()
+                except Exception as e:
+                    self._session_failed(printer, client, e)
+
+            now = time.monotonic()
+            if now >= next_misc:
+                next_misc = now + 1.0
+                for key in list(selector.get_map().values()):
+                    if key.data is None:
+                        continue
+                    printer, client = key.data
+                    try:
+                        client.loop_misc()
+                    except Exception as e:
+                        self._session_failed(printer, client, e)
+
+        logger.debug(f"{self._name} - network loop stopped")
+
+    def _finish(self, selector: selectors.BaseSelector) -> bool:
+        # returns False, leaving the loop running, if a session was started while the
+        # loop was stopping; give sessions that were just quit a chance to send their
+        # DISCONNECT
+        for key in list(selector.get_map().values()):
+            if key.data is not None and key.data[1].want_write():
+                try:
+                    key.data[1].loop_write()
+                except Exception:
+                    pass
+
+        with self._lock:
+            if not self._stopping:
+                return False
+            self._thread = None
+            self._selector = None
+            wakeup_r, wakeup_w = self._wakeup_r, self._wakeup_w
+            self._wakeup_r = self._wakeup_w = None
+            self._ops.clear()
+        selector.close()
+        wakeup_r.close()
+        wakeup_w.close()
+        return True
+
+    def _session_failed(self, printer: BambuPrinter, client: mqtt.Client, e: Exception):
+        # mirrors the handling around `loop_forever` for standalone sessions
+        logger.exception(f"{self._name} - an internal exception occurred")
+        self._end_session(printer)
+        printer._internalException = e
+        if client.is_connected():
+            client.disconnect()
+        printer.service_state = ServiceState.QUIT
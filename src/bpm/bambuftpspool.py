@@ -0,0 +1,269 @@
+"""
+A small pool of logged-in `IoTFTPSClient` sessions so SD card operations can reuse a
+warm control connection instead of paying for a TCP connect, TLS handshake, login and
+`PROT P` on every call.
+"""
+
+import contextlib
+import dataclasses
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+from bpm.bambutools import LoggerName
+from bpm.bambuworkers import BambuJobExecutor, BambuScheduler, ScheduledCall
+from bpm.ftpsclient.ftpsclient import IoTFTPSClient
+
+logger = logging.getLogger(LoggerName)
+
+# keepalive NOOPs are tiny; one worker serves every pool in the process
+_keepalive_executor = BambuJobExecutor(
+    max_workers=1, max_pending=64, name="bambuprinter-ftps-keepalive"
+)
+
+
+@dataclasses.dataclass
+class FtpsPoolMetrics:
+    """Counters describing an `IoTFTPSPool`'s behaviour."""
+
+    idle: int = 0
+    """Sessions currently parked in the pool."""
+    leased: int = 0
+    """Sessions currently leased out."""
+    hits: int = 0
+    """Leases served by a pooled session."""
+    misses: int = 0
+    """Leases that had to open a new session."""
+    health_check_failures: int = 0
+    """Pooled sessions that failed their `NOOP` check and were discarded."""
+    discarded: int = 0
+    """Sessions closed after an error or because the pool was full."""
+    evicted: int = 0
+    """Sessions closed after sitting idle for `idle_timeout` seconds."""
+    keepalives: int = 0
+    """Keepalive `NOOP`s sent to idle sessions."""
+
+
+class _PooledSession:
+    __slots__ = ("client", "generation", "last_used", "last_activity")
+
+    def __init__(self, client: IoTFTPSClient, generation: int):
+        self.client = client
+        self.generation = generation
+        self.last_used = self.last_activity = time.monotonic()
+
+
+class IoTFTPSPool:
+    """
+    A per-printer pool of FTPS sessions.
+
+    `lease()` hands out the most recently used idle session, checking it with a `NOOP`
+    first if it has been idle for more than `health_check_after` seconds, or opens a new
+    one.  Sessions are returned to the pool when the lease ends cleanly and discarded if
+    the caller raised, since the control connection may be mid-transfer.  Idle sessions
+    are kept alive with a `NOOP` every `keepalive_interval` seconds and closed once idle
+    for `idle_timeout` seconds; both are driven by the shared `BambuScheduler`, so an
+    empty pool costs nothing.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], IoTFTPSClient],
+        max_size: int = 2,
+        idle_timeout: float = 60.0,
+        keepalive_interval: float = 20.0,
+        health_check_after: float = 1.0,
+    ):
+        """
+        Parameters
+        ----------
+        * factory : Callable - Opens and logs in a new `IoTFTPSClient`.
+        * max_size : int = 2 - Maximum idle sessions kept (`0` disables pooling).
+        * idle_timeout : float = 60.0 - Seconds an unused session is kept before being closed.
+        * keepalive_interval : float = 20.0 - Seconds between keepalive `NOOP`s on an idle
+            session (`0` disables keepalives).
+        * health_check_after : float = 1.0 - Idle seconds after which a session is checked
+            with a `NOOP` before being leased.
+        """
+        self._factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.health_check_after = health_check_after
+        self._lock = threading.Lock()
+        self._idle: list[_PooledSession] = []
+        # bumped by `close`; sessions from an older generation are never pooled again
+        self._generation = 0
+        self._maintenance: ScheduledCall | None = None
+        self._metrics = FtpsPoolMetrics()
+
+    @contextlib.contextmanager
+    def lease(self) -> Iterator[IoTFTPSClient]:
+        """
+        Leases a logged-in session for the duration of the `with` block.
+
+        Example
+        -------
+        ```python
+        with pool.lease() as ftps:
+            ftps.download_file("/cache/model.3mf", "model.3mf")
+        ```
+        """
+        session = self._acquire()
+        ok = False
+        try:
+            yield session.client
+            ok = True
+        finally:
+            self._release(session, ok)
+
+    @property
+    def metrics(self) -> FtpsPoolMetrics:
+        """A snapshot of the pool's metrics."""
+        with self._lock:
+            self._metrics.idle = len(self._idle)
+            return dataclasses.replace(self._metrics)
+
+    def close(self):
+        """
+        Closes every idle session.  Sessions that are leased (or being kept alive) are
+        closed when they are returned, so a pool closed because the printer's host or
+        credentials changed never hands them out again; the pool remains usable
+        afterwards.
+        """
+        with self._lock:
+            self._generation += 1
+            idle = self._idle
+            self._idle = []
+            if self._maintenance:
+                self._maintenance.cancel()
+                self._maintenance = None
+        for session in idle:
+            self._disconnect(session.client)
+
+    def _acquire(self) -> _PooledSession:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    self._metrics.misses += 1
+                    self._metrics.leased += 1
+                    generation = self._generation
+                    break
+                # most recently used first: the warmest session is the least likely
+                # to have been dropped by the printer
+                session = self._idle.pop()
+                self._metrics.leased += 1
+
+            idle_for = time.monotonic() - session.last_activity
+            if idle_for < self.health_check_after or self._noop(session.client):
+                with self._lock:
+                    self._metrics.hits += 1
+                return session
+
+            logger.debug("IoTFTPSPool - discarding session that failed its health check")
+            with self._lock:
+                self._metrics.leased -= 1
+                self._metrics.health_check_failures += 1
+            self._disconnect(session.client)
+
+        try:
+            return _PooledSession(self._factory(), generation)
+        except Exception:
+            with self._lock:
+                self._metrics.leased -= 1
+            raise
+
+    def _release(self, session: _PooledSession, ok: bool):
+        with self._lock:
+            self._metrics.leased -= 1
+            if (
+                ok
+                and session.generation == self._generation
+                and len(self._idle) < self.max_size
+            ):
+                session.last_used = session.last_activity = time.monotonic()
+                self._idle.append(session)
+                self._schedule_maintenance()
+                return
+            self._metrics.discarded += 1
+        self._disconnect(session.client)
+
+    def _schedule_maintenance(self):
+        # called with the lock held
+        if self._maintenance is not None or not self._idle:
+            return
+        deadline = min(s.last_used for s in self._idle) + self.idle_timeout
+        if self.keepalive_interval > 0:
+            deadline = min(
+                deadline,
+                min(s.last_activity for s in self._idle) + self.keepalive_interval,
+            )
+        self._maintenance = BambuScheduler.shared().call_at(deadline, self._maintain)
+
+    def _maintain(self):
+        now = time.monotonic()
+        evicted: list[_PooledSession] = []
+        stale: list[_PooledSession] = []
+        with self._lock:
+            self._maintenance = None
+            keep = []
+            for session in self._idle:
+                if now - session.last_used >= self.idle_timeout:
+                    evicted.append(session)
+                elif (
+                    self.keepalive_interval > 0
+                    and now - session.last_activity >= self.keepalive_interval
+                ):
+                    stale.append(session)
+                else:
+                    keep.append(session)
+            self._idle = keep
+            self._metrics.evicted += len(evicted)
+            # sessions being kept alive count as leased until they are returned
+            self._metrics.leased += len(stale)
+            self._schedule_maintenance()
+
+        if stale and (
+            _keepalive_executor.submit(id(stale), self._keepalive, stale) is None
+        ):
+            # never block the shared scheduler on a `NOOP`; drop the sessions instead
+            with self._lock:
+                self._metrics.leased -= len(stale)
+                self._metrics.discarded += len(stale)
+            evicted.extend(stale)
+        for session in evicted:
+            self._disconnect(session.client)
+
+    def _keepalive(self, sessions: list[_PooledSession]):
+        for session in sessions:
+            healthy = self._noop(session.client)
+            with self._lock:
+                self._metrics.leased -= 1
+                self._metrics.keepalives += 1
+                if (
+                    healthy
+                    and session.generation == self._generation
+                    and len(self._idle) < self.max_size
+                ):
+                    session.last_activity = time.monotonic()
+                    self._idle.append(session)
+                    self._schedule_maintenance()
+                    continue
+                self._metrics.discarded += 1
+            self._disconnect(session.client)
+
+    @staticmethod
+    def _noop(client: IoTFTPSClient) -> bool:
+        try:
+            client.ftps_session.voidcmd("NOOP")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _disconnect(client: IoTFTPSClient):
+        try:
+            client.disconnect()
+        except Exception:
+            pass
@@ -0,0 +1,273 @@
+"""
+`bambuprefetch` fills the `3mf` metadata cache for every project file on a printer's SD
+card in the background, so browsing the card rarely has to wait for `get_project_info`
+to download and parse a file.
+"""
+
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
+from zipfile import BadZipFile
+
+from bpm.bambuproject import get_project_info
+from bpm.bambutools import LoggerName, ServiceState
+
+if TYPE_CHECKING:
+    from bpm.bambuprinter import BambuPrinter
+
+logger = logging.getLogger(LoggerName)
+
+# the prefetch never competes with a print for the printer's FTPS server / SD card
+_BUSY_STATES = ("PREPARE", "RUNNING")
+# seconds between checks while the printer is busy or not connected
+_IDLE_RECHECK = 30.0
+
+
+@dataclass
+class PrefetchProgress:
+    """The progress of a printer's background `3mf` metadata prefetch."""
+
+    running: bool = False
+    """The prefetch is enabled and its thread is active."""
+    paused: bool = False
+    """Waiting for the printer to be connected and idle."""
+    passes: int = 0
+    """Completed passes over the SD card."""
+    total: int = 0
+    """`3mf` files found on the SD card by the current (or last) pass."""
+    cached: int = 0
+    """Files whose metadata was already cached when the pass started."""
+    remaining: int = 0
+    """Files still to be parsed by the current pass."""
+    fetched: int = 0
+    """Files parsed and cached by the current (or last) pass."""
+    failed: int = 0
+    """Files that could not be parsed by the current (or last) pass."""
+
+
+class MetadataPrefetcher:
+    """
+    Walks a printer's SD card and runs `get_project_info` for every `3mf` file whose
+    metadata is not cached (or is stale), so later lookups are served from the cache.
+
+    The prefetch only runs while the printer is connected and not printing
+    (`gcode_state` other than `PREPARE` / `RUNNING`); a pass that finds the printer busy
+    stops after the files in progress and resumes once it is idle again.  Up to
+    `BambuConfig.metadata_prefetch_workers` files are read concurrently, each over its
+    own pooled FTPS session, and reads are paced to
+    `BambuConfig.metadata_prefetch_max_rate` bytes per second.  Each file is charged at
+    its full size, which is what a `get_project_info` call downloads to hash the file.
+
+    Files that are not valid `3mf` archives are not retried until their size or timestamp
+    changes; files that failed for any other reason (a dropped connection, a timeout)
+    are retried by the next pass.
+    A new pass starts `BambuConfig.metadata_prefetch_interval` seconds after the
+    previous one finished.
+    """
+
+    def __init__(self, printer: "BambuPrinter", name: str = "bambuprinter-prefetch"):
+        """
+        Parameters
+        ----------
+        * printer : BambuPrinter - The printer whose SD card is prefetched.
+        * name : str = "bambuprinter-prefetch" - Name (and prefix) of the prefetch threads.
+        """
+        self._printer = printer
+        self._name = name
+        self._cv = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._next_start = 0.0
+        self._failed: dict[str, tuple[int, int]] = {}
+        self._progress = PrefetchProgress()
+
+    @property
+    def progress(self) -> PrefetchProgress:
+        """A snapshot of the prefetch's progress."""
+        with self._cv:
+            return replace(self._progress)
+
+    def start(self):
+        """
+        Starts the prefetch thread if it is not already running.  A thread that is still
+        finishing after `stop` keeps running instead.
+        """
+        with self._cv:
+            self._stopping = False
+            self._progress.running = True
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=self._name, daemon=True
+            )
+            self._thread.start()
+        logger.debug(f"{self._name} - started")
+
+    def stop(self):
+        """
+        Stops the prefetch.  Files already being parsed are finished in the background;
+        `start` can be called again afterwards.
+        """
+        with self._cv:
+            self._stopping = True
+            self._cv.notify_all()
+            thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _run(self):
+        try:
+            while True:
+                while not self._wait(0):
+                    if not self._idle():
+                        self._set_paused(True)
+                        self._wait(_IDLE_RECHECK)
+                        continue
+                    self._set_paused(False)
+                    if self._pass():
+                        self._wait(self._printer.config.metadata_prefetch_interval)
+                with self._cv:
+                    # `start` may have been called again before the stop was noticed
+                    if self._stopping:
+                        self._finish()
+                        break
+        except Exception:
+            logger.exception(f"{self._name} - prefetch failed")
+            with self._cv:
+                self._finish()
+        logger.debug(f"{self._name} - stopped")
+
+    def _finish(self):
+        # called with the condition held
+        self._progress.running = False
+        self._progress.paused = False
+        self._thread = None
+
+    def _pass(self) -> bool:
+        # returns False if the pass was interrupted before every file was parsed
+        printer = self._printer
+        try:
+            tree = printer.get_sdcard_3mf_files()
+        except Exception as e:
+            logger.warning(f"{self._name} - failed to list the sdcard - reason: [{e}]")
+            return True
+        files = list(_project_files(tree)) if tree else []
+        records = printer._project_metadata()
+        queue: deque[dict] = deque()
+        for entry in files:
+            identity = (entry.get("size", 0), entry.get("timestamp", 0))
+            if records.has(entry["id"], *identity):
+                continue
+            if self._failed.get(entry["id"]) == identity:
+                continue
+            queue.append(entry)
+
+        with self._cv:
+            self._progress = PrefetchProgress(
+                running=True,
+                passes=self._progress.passes,
+                total=len(files),
+                cached=len(files) - len(queue),
+                remaining=len(queue),
+            )
+        if queue:
+            logger.debug(
+                f"{self._name} - prefetching [{len(queue)}] of [{len(files)}] 3mf files"
+            )
+            workers = max(1, printer.config.metadata_prefetch_workers)
+            threads = [
+                threading.Thread(
+                    target=self._work,
+                    args=(queue,),
+                    name=f"{self._name}-{i}",
+                    daemon=True,
+                )
+                for i in range(1, min(workers, len(queue)))
+            ]
+            for thread in threads:
+                thread.start()
+            self._work(queue)
+            for thread in threads:
+                thread.join()
+
+        with self._cv:
+            if queue:
+                return False
+            self._progress.passes += 1
+        return True
+
+    def _work(self, queue: deque[dict]):
+        printer = self._printer
+        while True:
+            with self._cv:
+                if self._stopping or not queue or not self._idle():
+                    return
+                entry = queue.popleft()
+                # reserve this file's share of the bandwidth limit before reading it
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                rate = printer.config.metadata_prefetch_max_rate
+                self._next_start = start + (
+                    entry.get("size", 0) / rate if rate > 0 else 0
+                )
+                while not self._stopping and start > time.monotonic():
+                    self._cv.wait(start - time.monotonic())
+                if self._stopping or not self._idle():
+                    queue.appendleft(entry)
+                    return
+
+            try:
+                get_project_info(entry["id"], printer, use_cached_list=True)
+                failed = unparseable = False
+            except Exception as e:
+                logger.debug(
+                    f"{self._name} - failed to prefetch [{entry['id']}] - reason: [{e}]"
+                )
+                failed = True
+                # connection drops and timeouts are retried by the next pass
+                unparseable = isinstance(e, (BadZipFile, ValueError, zlib.error))
+
+            with self._cv:
+                self._progress.remaining -= 1
+                if failed:
+                    self._progress.failed += 1
+                    if unparseable:
+                        self._failed[entry["id"]] = (
+                            entry.get("size", 0),
+                            entry.get("timestamp", 0),
+                        )
+                else:
+                    self._failed.pop(entry["id"], None)
+                    self._progress.fetched += 1
+
+    def _idle(self) -> bool:
+        printer = self._printer
+        return (
+            printer.service_state == ServiceState.CONNECTED
+            and printer.printer_state.gcode_state not in _BUSY_STATES
+        )
+
+    def _set_paused(self, paused: bool):
+        with self._cv:
+            self._progress.paused = paused
+
+    def _wait(self, timeout: float) -> bool:
+        # sleeps up to `timeout` seconds (or until stopped); returns True once stopping
+        with self._cv:
+            if not self._stopping and timeout > 0:
+                self._cv.wait(timeout)
+            return self._stopping
+
+
+def _project_files(node: dict) -> Iterator[dict]:
+    # the `3mf` file entries in a tree from `BambuPrinter.get_sdcard_3mf_files`
+    for child in node.get("children", []):
+        if "children" in child:
+            yield from _project_files(child)
+        elif child["id"].endswith(".3mf"):
+            yield child
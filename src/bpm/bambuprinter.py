@@ -4,6 +4,7 @@ The main `bambu-printer-manager` class `BambuPrinter` lives here.
 
 import contextlib
 import copy
+import ftplib
 import json
 import logging
 import math
@@ -13,8 +14,11 @@ import sys
 import threading
 import time
 import traceback
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import paho.mqtt.client as mqtt
 
@@ -25,6 +29,12 @@ else:
 
 from webcolors import hex_to_name, name_to_hex
 
+from bpm.bambucache import (
+    BambuCacheManager,
+    BambuCacheStats,
+    ProjectMetadataCache,
+    project_info_cache,
+)
 from bpm.bambucommands import (
     AMS_CHANGE_FILAMENT,
     AMS_CONTROL,
@@ -56,7 +66,22 @@ from bpm.bambucommands import (
     XCAM_CONTROL_SET,
 )
 from bpm.bambuconfig import BambuConfig
-from bpm.bambuproject import ActiveJobInfo, get_3mf_entry_by_name, get_project_info
+from bpm.bambuftpspool import FtpsPoolMetrics, IoTFTPSPool
+from bpm.bambuprefetch import MetadataPrefetcher, PrefetchProgress
+from bpm.bambuproject import (
+    ActiveJobInfo,
+    ProjectInfo,
+    get_3mf_entry_by_id,
+    get_3mf_entry_by_name,
+    get_project_info,
+)
+from bpm.bambusdcard import (
+    DirectoryLister,
+    SdCardListingCache,
+    insert_tree_node,
+    normalize_sdcard_path,
+    sdcard_parent,
+)
 from bpm.bambuspool import BambuSpool
 from bpm.bambustate import BambuState
 from bpm.bambutools import (
@@ -72,6 +97,7 @@ from bpm.bambutools import (
     PrintOption,
     ServiceState,
     SpeedLevel,
+    UpdateDispatchMode,
     cache_delete,
     cache_read,
     cache_write,
@@ -81,12 +107,34 @@ from bpm.bambutools import (
     nozzle_type_to_telemetry,
     parse_nozzle_type,
     parseStage,
-    sortFileTreeAlphabetically,
 )
-from bpm.ftpsclient.ftpsclient import IoTFTPSClient
+from bpm.bambuworkers import (
+    BambuJobExecutor,
+    BambuScheduler,
+    BambuUpdateDispatcher,
+    UpdateDispatchMetrics,
+)
+from bpm.ftpsclient.ftpsclient import (
+    FtpListItem,
+    IoTFTPSClient,
+    TLSSessionStats,
+    tls_session_cache,
+)
+
+if TYPE_CHECKING:
+    from bpm.bambufleet import BambuFleet
 
 logger = logging.getLogger(LoggerName)
 
+# `BambuPrinter` values diffed by `_collect_changes`, named after their public properties
+_CHANGE_TRACKED = (
+    "light_state",
+    "speed_level",
+    "skipped_objects",
+    "nozzle_type",
+    "nozzle_diameter",
+)
+
 
 class BambuPrinter:
     """
@@ -109,7 +157,11 @@ class BambuPrinter:
             will be created.
         """
         self._mqtt_client_thread = None
-        self._watchdog_thread = None
+        self._scheduler = BambuScheduler.shared()
+        self._watchdog_lock = threading.Lock()
+        self._watchdog_call = None
+        self._watchdog_enabled = False
+        self._fleet: BambuFleet | None = None
 
         self._internalException = None
         self._lastMessageTime = None
@@ -133,9 +185,15 @@ class BambuPrinter:
 
         self._printer_state = BambuState()
         self._active_job_info = ActiveJobInfo()
+        # a `ProjectInfo` fetched in the background, applied by the next `_on_message`
+        self._pending_project_info: deque[ProjectInfo] = deque(maxlen=1)
 
         self._sdcard_contents = None
         self._sdcard_3mf_files = None
+        self._sdcard_listings = SdCardListingCache(ttl=config.sdcard_listing_ttl)
+        # starts the background sweep of orphaned downloads and applies the size / age
+        # limits
+        self.cache_manager.enforce()
 
         self._print_type = ""
         self._skipped_objects = []
@@ -143,6 +201,21 @@ class BambuPrinter:
         self._nozzle_type = ""
         self._nozzle_diameter = 0.0
 
+        self._job_executor = BambuJobExecutor(name="bambuprinter-jobs")
+        self._update_dispatcher = BambuUpdateDispatcher(
+            self._deliver_update,
+            max_rate=config.update_max_rate,
+            name="bambuprinter-updates",
+        )
+        self._ftps_pool = IoTFTPSPool(
+            self._open_ftps_client,
+            max_size=config.ftps_pool_size,
+            idle_timeout=config.ftps_idle_timeout,
+            keepalive_interval=config.ftps_keepalive_interval,
+        )
+        self._ftps_pool_key = None
+        self._metadata_prefetcher = MetadataPrefetcher(self)
+
     # region public methods
 
     def start_session(self):
@@ -153,6 +226,9 @@ class BambuPrinter:
 
         This method is required to be called before any commands or data
         collection / callbacks can take place with the machine.
+
+        If the printer has been added to a `BambuFleet`, the session is driven by the
+        fleet's shared network loop instead of a dedicated `mqtt` thread.
         """
         logger.debug("start_session - starting session")
         if (
@@ -164,28 +240,16 @@ class BambuPrinter:
         if self.client and self.client.is_connected():
             raise Exception("a session is already active")
 
-        def on_connect(client, userdata, flags, reason_code, properties):
-            logger.debug("on_connect - session on_connect")
-            if self.service_state != ServiceState.PAUSED:
-                self.service_state = ServiceState.CONNECTED
-                client.subscribe(f"device/{self.config.serial_number}/report")
-                logger.debug(
-                    f"on_connect -subscribed to [device/{self.config.serial_number}/report]"
-                )
+        self._create_client()
 
-        def on_disconnect(client, userdata, flags, reason_code, properties):
-            logger.debug("on_disconnect - session on_disconnect")
-            if self._internalException:
-                logger.exception("on_disconnect - an internal exception occurred")
-                self.service_state = ServiceState.QUIT
-                raise self._internalException
-            if self.service_state != ServiceState.PAUSED:
-                self.service_state = ServiceState.DISCONNECTED
+        if self._fleet is not None:
+            self._fleet._start_session(self)
+            self._start_watchdog()
+            self._start_metadata_prefetch()
+            return
 
-        def on_message(client, userdata, msg):
-            if self._lastMessageTime and self._recent_update:
-                self._lastMessageTime = time.monotonic()
-            self._on_message(msg.payload.decode("utf-8"))
+        if not self._connect_client():
+            return
 
         def loop_forever(printer: BambuPrinter):
             logger.debug("loop_forever - starting mqtt loop_forever")
@@ -198,39 +262,13 @@ class BambuPrinter:
                     printer.client.disconnect()
             printer.service_state = ServiceState.QUIT
 
-        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)  # type: ignore
-
-        self.client.on_connect = on_connect
-        self.client.on_disconnect = on_disconnect
-        self.client.on_message = on_message
-
-        self.client.tls_set(tls_version=ssl.PROTOCOL_TLS, cert_reqs=ssl.CERT_NONE)
-        self.client.tls_insecure_set(True)
-        self.client.reconnect_delay_set(min_delay=1, max_delay=1)
-
-        self.client.username_pw_set(
-            self.config.mqtt_username, password=self.config.access_code
-        )
-
-        self.client.user_data_set(self.config.mqtt_client_id)
-        self.client.connect_timeout = self.config.mqtt_connection_timeout
-
-        try:
-            self.client.connect(self.config.hostname, self.config.mqtt_port)
-        except Exception as e:
-            self._internalException = e
-            logger.warning(
-                f"start_session - unable to connect to printer - reason: [{e}] stacktrace: [{traceback.format_exc()}]"
-            )
-            self.service_state = ServiceState.QUIT
-            return
-
         self._mqtt_client_thread = threading.Thread(
             target=loop_forever, name="bambuprinter-session", args=(self,)
         )
         self._mqtt_client_thread.start()
 
         self._start_watchdog()
+        self._start_metadata_prefetch()
 
     def pause_session(self):
         """
@@ -269,6 +307,8 @@ class BambuPrinter:
         considered dead after making this call although you may be able to restart a
         session with [start_session](#bpm.bambuprinter.BambuPrinter.start_session)().
         """
+        if self._fleet is not None:
+            self._fleet._end_session(self)
         if self.client and self.client.is_connected():
             self.client.disconnect()
             logger.debug("quit - mqtt client was connected and is now disconnected")
@@ -276,22 +316,29 @@ class BambuPrinter:
             logger.debug("quit - mqtt client was already disconnected")
 
         self._service_state = ServiceState.QUIT
-        self._notify_update()
+        self._notify_update({"service_state"})
+
+        self._stop_watchdog()
+        self._metadata_prefetcher.stop()
+        self._job_executor.shutdown()
+        self._update_dispatcher.shutdown()
+        self._ftps_pool.close()
 
         if self._mqtt_client_thread and self._mqtt_client_thread.is_alive():
             self._mqtt_client_thread.join()
-        if self._watchdog_thread and self._watchdog_thread.is_alive():
-            self._watchdog_thread.join()
         logger.debug("quit - all threads have terminated")
 
     @contextlib.contextmanager
     def ftp_connection(self):
         """
-        Open an FTPS connection to the printer's SD card for file management operations.
+        Lease an FTPS connection to the printer's SD card for file management operations.
 
-        Intended to be used as a context manager so the connection is closed
-        automatically on exit.  All SD card file operations (`upload_sdcard_file`,
-        `download_sdcard_file`, `delete_sdcard_file`, etc.) use this internally.
+        Intended to be used as a context manager so the connection is returned to the
+        printer's FTPS pool (or closed, if the block raised) automatically on exit.
+        Warm sessions are reused for up to `BambuConfig.ftps_idle_timeout` seconds, so
+        back-to-back operations skip the TLS handshake and login.  All SD card file
+        operations (`upload_sdcard_file`, `download_sdcard_file`, `delete_sdcard_file`,
+        etc.) use this internally.
 
         Example
         -------
@@ -300,19 +347,21 @@ class BambuPrinter:
             ftps.upload_file("/local/myfile.3mf", "/jobs/myfile.3mf")
         ```
         """
-        ftps = None
-        try:
-            ftps = IoTFTPSClient(
-                self._config.hostname,
-                990,
-                self._config.mqtt_username,
-                self._config.access_code,
-                ssl_implicit=True,
-            )
+        pool = self._ftps_pool
+        pool_key = (
+            self._config.hostname,
+            self._config.mqtt_username,
+            self._config.access_code,
+        )
+        if pool_key != self._ftps_pool_key:
+            # sessions opened for a different printer / credentials are useless now
+            pool.close()
+            self._ftps_pool_key = pool_key
+        pool.max_size = self._config.ftps_pool_size
+        pool.idle_timeout = self._config.ftps_idle_timeout
+        pool.keepalive_interval = self._config.ftps_keepalive_interval
+        with pool.lease() as ftps:
             yield ftps
-        finally:
-            if ftps and ftps.ftps_session:
-                ftps.disconnect()
 
     def refresh(self):
         """
@@ -402,20 +451,10 @@ class BambuPrinter:
 
         with self.ftp_connection() as ftps:
             ftps.delete_file(file)
+        self._sdcard_listings.invalidate(sdcard_parent(file))
 
-        # Invalidate all cached plate metadata for this file
-        filename = file.lstrip("/").replace("/", "-")
-        serial = self.config.serial_number
-        cache_path = self.config.bpm_cache_path if self.config.bpm_cache_path else Path()
-        if serial:
-            cache_path = cache_path / serial
-        for cached in (
-            (cache_path / "metadata").glob(f"{filename}-*.json")
-            if (cache_path / "metadata").exists()
-            else []
-        ):
-            cached.unlink(missing_ok=True)
-            logger.debug(f"delete_sdcard_file - removed cache entry [{cached.name}]")
+        # Invalidate the cached metadata (every plate) for this file
+        self._forget_project_files(file)
 
         def search_for_and_remove_file(file: str, entry: dict):
             if "children" in entry:
@@ -455,20 +494,11 @@ class BambuPrinter:
 
         with self.ftp_connection() as ftps:
             delete_all_contents(ftps, path)
+        self._sdcard_listings.invalidate_tree(path)
+        self._sdcard_listings.invalidate(sdcard_parent(path))
 
         # Invalidate all cached plate metadata for files under this folder
-        prefix = path.strip("/").replace("/", "-")
-        serial = self.config.serial_number
-        cache_path = self.config.bpm_cache_path if self.config.bpm_cache_path else Path()
-        if serial:
-            cache_path = cache_path / serial
-        metadata_dir = cache_path / "metadata"
-        if metadata_dir.exists():
-            for cached in metadata_dir.glob(f"{prefix}-*.json"):
-                cached.unlink(missing_ok=True)
-                logger.debug(
-                    f"delete_sdcard_folder - removed cache entry [{cached.name}]"
-                )
+        self._forget_project_files(path)
 
         def search_for_and_remove_folder(path: str, entry: dict):
             if not path.endswith("/"):
@@ -486,7 +516,7 @@ class BambuPrinter:
             search_for_and_remove_folder(path, self._sdcard_3mf_files)
         return self._sdcard_contents
 
-    def download_sdcard_file(self, src: str, dest: str):
+    def download_sdcard_file(self, src: str, dest: str, digest: Any = None):
         """
         Downloads a file from the printer
 
@@ -494,12 +524,14 @@ class BambuPrinter:
         ----------
         * src : str - the full path filename on the printer to be downloaded to the host
         * dest : str - the full path filename on the host to store the downloaded file
+        * digest : Any = None - optional `hashlib` object updated with the file's bytes
+            as they arrive, so the caller need not re-read `dest` to hash it
         """
         logger.debug(
             f"download_sdcard_file - downloading file src: [{src}] dest: [{dest}]"
         )
         with self.ftp_connection() as ftps:
-            ftps.download_file(src, dest)
+            ftps.download_file(src, dest, digest=digest)
 
     def get_current_bind_list(self, state: "BambuState") -> list[dict[str, Any]]:
         """
@@ -571,53 +603,62 @@ class BambuPrinter:
     #         f"set_active_tool - published SET_AMS_TO_EXTRUDER_BINDING to [device/{self.config.serial_number}/request] command: [{cmd}]"
     #     )
 
-    def get_sdcard_3mf_files(self):
+    def get_sdcard_3mf_files(self, force_refresh: bool = False):
         """
         Returns a `dict` (json document) of all `.3mf` files on the printer's SD card.
 
+        Parameters
+        ----------
+        * force_refresh : bool = False - Re-list every directory instead of using cached listings.
+
         Usage
         -----
         The return value of this method is very useful for binding to things like a clientside `TreeView`
         """
         logger.debug("get_sdcard_3mf_files - returning sdcard_3mf_files")
-        self.get_sdcard_contents()
+        self.get_sdcard_contents(force_refresh=force_refresh)
         return self._sdcard_3mf_files
 
-    def get_sdcard_contents(self):
+    def get_sdcard_contents(self, force_refresh: bool = False):
         """
         Returns a `dict` (json document) of ALL files on the printer's SD card.
         The private class level `_sdcard_contents` attribute is also populated.
 
+        Directory listings are cached for `BambuConfig.sdcard_listing_ttl` seconds and
+        invalidated by this printer's own upload, delete, rename and mkdir calls, so only
+        stale directories are re-listed (and no FTPS session is leased when none are).
+        Up to `BambuConfig.sdcard_listing_workers` directories are listed concurrently,
+        each over its own pooled FTPS session.
+
+        Parameters
+        ----------
+        * force_refresh : bool = False - Re-list every directory instead of using cached listings.
+
         Usage
         -----
         The return value of this method is very useful for binding to things like a clientside `TreeView`
         """
+        listings = self._sdcard_listings
+        listings.ttl = self._config.sdcard_listing_ttl
+        if force_refresh:
+            listings.clear()
 
-        with self.ftp_connection() as ftps:
-            fs = self._get_sftp_files(ftps, "/")
-        if fs is None:
+        trees = listings.build_trees(
+            self._sdcard_lister,
+            "/",
+            ".3mf",
+            max_workers=self._config.sdcard_listing_workers,
+        )
+
+        if trees is None:
             logger.warning("get_sdcard_contents - failed to retrieve files from sdcard")
             self._sdcard_contents = None
             self._sdcard_3mf_files = None
             return None
 
-        self._sdcard_contents = sortFileTreeAlphabetically(fs)
-
-        def search_for_and_remove_all_other_files(mask: str, entry: dict):
-            if "children" in entry:
-                entry["children"] = [
-                    x
-                    for x in entry["children"]
-                    if x["id"].endswith(mask) or "children" in x
-                ]
-                for child in entry["children"]:
-                    search_for_and_remove_all_other_files(mask, child)
-
-        self._sdcard_3mf_files = json.loads(json.dumps(self._sdcard_contents))
-        search_for_and_remove_all_other_files(".3mf", self._sdcard_3mf_files)
-
+        self._sdcard_contents, self._sdcard_3mf_files = trees
         logger.debug("get_sdcard_contents - retrieved all files from sdcard")
-        return fs
+        return self._sdcard_contents
 
     def load_filament(self, slot_id: int, ams_id: int = 0):
         """
@@ -662,6 +703,7 @@ class BambuPrinter:
         logger.debug(f"make_sdcard_directory - creating remote directory [{dir}]")
         with self.ftp_connection() as ftps:
             ftps.mkdir(dir)
+        self._sdcard_listings.invalidate(sdcard_parent(dir))
         return self.get_sdcard_contents()
 
     def pause_printing(self):
@@ -879,6 +921,11 @@ class BambuPrinter:
         logger.debug(f"rename_sdcard_file - renaming printer file [{src}] to [{dest}]")
         with self.ftp_connection() as ftps:
             ftps.move_file(src, dest)
+        self._forget_project_files(src)
+        self._forget_project_files(dest)
+        self._sdcard_listings.invalidate_tree(src)
+        self._sdcard_listings.invalidate(sdcard_parent(src))
+        self._sdcard_listings.invalidate(sdcard_parent(dest))
         return self.get_sdcard_contents()
 
     def resume_printing(self):
@@ -1732,20 +1779,82 @@ class BambuPrinter:
         """
         Uploads the local filesystem file to the printer and returns an updated dict of all files on the printer
 
+        A `.3mf` is hashed and parsed into the metadata cache from `src` while the transfer
+        runs.  The uploaded file is then added to the cached SD card tree from its path,
+        size and timestamp (one `MLST` / `MDTM` command), so the card is not re-listed.
+
         Parameters
         ----------
         * src : str - the full path filename on the host to be uploaded to the printer
         * dest : str - the full path filename on the printer to upload to
         """
         logger.debug(f"upload_sdcard_file - uploading file src: [{src}] dest: [{dest}]")
-        with self.ftp_connection() as ftps:
-            ftps.upload_file(src, dest)
-
+        path = normalize_sdcard_path(dest)
+        self._forget_project_files(path)
+
+        # a project is hashed and parsed from `src` while it is being transferred; only
+        # its SD card entry has to wait for the transfer to complete
+        entry: Future[dict] = Future()
+        parser = None
+        parse_errors: list[Exception] = []
         if src.endswith(".3mf"):
-            get_project_info(dest, self, local_file=src)
 
-        remote_files = self.get_sdcard_contents()
-        return remote_files
+            def parse():
+                try:
+                    get_project_info(
+                        path, self, local_file=src, sdcard_entry=entry.result
+                    )
+                except Exception as e:
+                    parse_errors.append(e)
+
+            parser = threading.Thread(
+                target=parse, name="bambuprinter-upload-parse", daemon=True
+            )
+            parser.start()
+
+        try:
+            with self.ftp_connection() as ftps:
+                ftps.upload_file(src, dest)
+                item = ftps.stat_file(path)
+        except BaseException as e:
+            entry.set_exception(e)
+            if parser:
+                parser.join()
+            raise
+
+        if item is not None:
+            node = {
+                "id": item.path,
+                "name": item.name,
+                "size": item.size,
+                "timestamp": item.timestamp.timestamp(),
+            }
+            self._sdcard_listings.insert(item)
+            if self._sdcard_contents is not None and insert_tree_node(
+                self._sdcard_contents, node
+            ):
+                if self._sdcard_3mf_files is not None and path.endswith(".3mf"):
+                    insert_tree_node(self._sdcard_3mf_files, dict(node))
+            else:
+                # the destination folder is not in the cached tree yet
+                self.get_sdcard_contents()
+        else:
+            # the printer answers neither MLST nor MDTM; list the destination folder
+            self._sdcard_listings.invalidate(sdcard_parent(path))
+            self.get_sdcard_contents()
+            node = get_3mf_entry_by_id(self._sdcard_contents or {}, path)
+
+        if node is not None:
+            entry.set_result(node)
+        else:
+            entry.set_exception(
+                Exception(f"upload_sdcard_file - [{path}] not found on the sdcard")
+            )
+        if parser:
+            parser.join()
+            if parse_errors:
+                raise parse_errors[0]
+        return self._sdcard_contents
 
     # endregion
 
@@ -1768,7 +1877,13 @@ class BambuPrinter:
     @service_state.setter
     def service_state(self, value: ServiceState):
         self._service_state = value
-        self._notify_update()  # make sure we notify about EVERY state change!
+        if value == ServiceState.CONNECTED:
+            if self._watchdog_enabled:
+                self._schedule_watchdog(time.monotonic())
+        elif value == ServiceState.QUIT:
+            self._stop_watchdog()
+        # make sure we notify about EVERY state change!
+        self._notify_update({"service_state"})
 
     @property
     def client(self) -> mqtt.Client:
@@ -1788,13 +1903,71 @@ class BambuPrinter:
 
     @property
     def on_update(self):
-        """The callback function executed whenever the printer's state is updated."""
+        """
+        The callback function executed whenever the printer's state is updated.
+
+        Called as `on_update(printer)`, or as `on_update(printer, changed)` when
+        `BambuConfig.report_changed_fields` is enabled.  `changed` is a `frozenset` of
+        the field paths that changed (for example `climate.bed_temp`,
+        `spools[3].remaining_percent` or `active_job_info.print_percentage`) and may
+        be empty.
+        """
         return self._on_update
 
     @on_update.setter
     def on_update(self, value):
         self._on_update = value
 
+    @property
+    def update_metrics(self) -> UpdateDispatchMetrics:
+        """
+        Queue depth, coalesced (dropped) update counts and callback latency of the
+        `COALESCED` `on_update` dispatcher.
+        """
+        return self._update_dispatcher.metrics
+
+    @property
+    def cache_manager(self) -> BambuCacheManager:
+        """
+        The manager bounding `bpm_cache_path`, shared by every printer using the same
+        directory, with this printer's `cache_max_bytes` / `cache_max_age` applied.
+        """
+        manager = BambuCacheManager.shared(self._config.bpm_cache_path)
+        if (manager.max_bytes, manager.max_age) != (
+            self._config.cache_max_bytes,
+            self._config.cache_max_age,
+        ):
+            manager.max_bytes = self._config.cache_max_bytes
+            manager.max_age = self._config.cache_max_age
+            manager.enforce()
+        return manager
+
+    @property
+    def cache_stats(self) -> BambuCacheStats:
+        """Entry, byte, hit / miss and eviction counters of the `bpm_cache_path` cache."""
+        return self.cache_manager.stats
+
+    @property
+    def metadata_prefetch_progress(self) -> PrefetchProgress:
+        """
+        Progress of the background `3mf` metadata prefetch enabled by
+        `BambuConfig.metadata_prefetch`.
+        """
+        return self._metadata_prefetcher.progress
+
+    @property
+    def ftps_pool_metrics(self) -> FtpsPoolMetrics:
+        """Hit / miss, health check and eviction counters of the SD card FTPS pool."""
+        return self._ftps_pool.metrics
+
+    @property
+    def ftps_tls_stats(self) -> TLSSessionStats:
+        """
+        FTPS TLS handshake counts, timings and session resumption rate for this
+        printer's host.
+        """
+        return tls_session_cache.stats(self._config.hostname, 990)
+
     @property
     def recent_update(self):
         """Indicates if the printer's state has been updated recently."""
@@ -1958,6 +2131,23 @@ class BambuPrinter:
         ).strip()
         return make_cache_key(raw)
 
+    def _project_metadata(self) -> ProjectMetadataCache:
+        # the metadata records get_project_info keeps for this printer
+        serial = self.config.serial_number
+        cache_path = self.config.bpm_cache_path if self.config.bpm_cache_path else Path()
+        if serial:
+            cache_path = cache_path / serial
+        return ProjectMetadataCache.shared(cache_path / "metadata", self.cache_manager)
+
+    def _forget_project_files(self, path: str):
+        # drops the in-memory and on-disk 3mf metadata for a file or folder we changed
+        project_info_cache.invalidate_tree(self.config.serial_number, path)
+        self._project_metadata().remove_tree(path)
+
+    def _start_metadata_prefetch(self):
+        if self._config.metadata_prefetch:
+            self._metadata_prefetcher.start()
+
     def _persist_job_start(self) -> None:
         key = self._elapsed_key()
         if key and self._active_job_info.wall_start_time >= 0:
@@ -1976,48 +2166,307 @@ class BambuPrinter:
             return float(data["wall_start_time"])
         return -1.0
 
-    def _notify_update(self):
-        if self.on_update:
-            self.on_update(self)
+    def _notify_update(self, changed: set[str] | None = None):
+        if not self.on_update:
+            return
+        if self.config.update_dispatch_mode == UpdateDispatchMode.COALESCED:
+            self._update_dispatcher.max_rate = self.config.update_max_rate
+            self._update_dispatcher.post(changed)
+        else:
+            self._deliver_update(changed)
+
+    def _create_client(self):
+        """
+        Creates and configures the `mqtt` client (callbacks, TLS, credentials) for a
+        new session without connecting it.
+        """
 
-    def _start_watchdog(self):
-        def watchdog_thread(printer):
+        def on_connect(client, userdata, flags, reason_code, properties):
+            logger.debug("on_connect - session on_connect")
+            if self.service_state != ServiceState.PAUSED:
+                self.service_state = ServiceState.CONNECTED
+                client.subscribe(f"device/{self.config.serial_number}/report")
+                logger.debug(
+                    f"on_connect -subscribed to [device/{self.config.serial_number}/report]"
+                )
+
+        def on_disconnect(client, userdata, flags, reason_code, properties):
+            logger.debug("on_disconnect - session on_disconnect")
+            if self._internalException:
+                logger.exception("on_disconnect - an internal exception occurred")
+                self.service_state = ServiceState.QUIT
+                raise self._internalException
+            if self.service_state != ServiceState.PAUSED:
+                self.service_state = ServiceState.DISCONNECTED
+
+        def on_message(client, userdata, msg):
+            if self._lastMessageTime and self._recent_update:
+                self._lastMessageTime = time.monotonic()
+            self._on_message(msg.payload.decode("utf-8"))
+
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)  # type: ignore
+
+        self.client.on_connect = on_connect
+        self.client.on_disconnect = on_disconnect
+        self.client.on_message = on_message
+
+        self.client.tls_set(tls_version=ssl.PROTOCOL_TLS, cert_reqs=ssl.CERT_NONE)
+        self.client.tls_insecure_set(True)
+        self.client.reconnect_delay_set(min_delay=1, max_delay=1)
+
+        self.client.username_pw_set(
+            self.config.mqtt_username, password=self.config.access_code
+        )
+
+        self.client.user_data_set(self.config.mqtt_client_id)
+        self.client.connect_timeout = self.config.mqtt_connection_timeout
+
+    def _connect_client(self) -> bool:
+        """
+        Connects the session's `mqtt` client.  On failure the exception is recorded,
+        the session is moved to `QUIT` and `False` is returned.
+        """
+        try:
+            self.client.connect(self.config.hostname, self.config.mqtt_port)
+        except Exception as e:
+            self._internalException = e
+            logger.warning(
+                f"start_session - unable to connect to printer - reason: [{e}] stacktrace: [{traceback.format_exc()}]"
+            )
+            self.service_state = ServiceState.QUIT
+            return False
+        return True
+
+    @contextlib.contextmanager
+    def _sdcard_lister(self) -> Iterator[DirectoryLister]:
+        with self.ftp_connection() as ftps:
+
+            def list_directory(directory: str) -> list[FtpListItem] | None:
+                # unlike `list_files_ex`, a failed listing is reported as `None` so it is
+                # never cached as an empty directory
+                try:
+                    return list(ftps.iter_files(directory))
+                except ftplib.error_perm as e:
+                    logger.debug(
+                        f"_sdcard_lister - unable to list [{directory}] - reason: [{e}]"
+                    )
+                    return None
+                except Exception:
+                    logger.exception("_sdcard_lister - unexpected ftps exception")
+                    return None
+
+            yield list_directory
+
+    def _open_ftps_client(self) -> IoTFTPSClient:
+        return IoTFTPSClient(
+            self._config.hostname,
+            990,
+            self._config.mqtt_username,
+            self._config.access_code,
+            ssl_implicit=True,
+            prefer_mlsd=self._config.ftps_prefer_mlsd,
+        )
+
+    def _deliver_update(self, changed: set[str] | None = None):
+        on_update = self.on_update
+        if on_update:
+            if self.config.report_changed_fields:
+                on_update(self, frozenset(changed or ()))
+            else:
+                on_update(self)
+
+    def _change_snapshot(self) -> tuple:
+        """
+        Captures the non-`BambuState` values `_on_message` may change so they can be
+        diffed afterwards by `_collect_changes`.
+        """
+        return (
+            vars(self._active_job_info).copy(),
+            vars(self.config).copy(),
+            vars(self.config.capabilities).copy(),
+            list(self._printer_state.spools),
+            {name: getattr(self, f"_{name}") for name in _CHANGE_TRACKED},
+        )
+
+    def _collect_changes(self, snapshot: tuple, changed: set[str]):
+        job, config, capabilities, spools, values = snapshot
+
+        for prefix, before, obj in (
+            ("active_job_info.", job, self._active_job_info),
+            ("config.", config, self.config),
+            ("config.capabilities.", capabilities, self.config.capabilities),
+        ):
+            for name, value in vars(obj).items():
+                old = before.get(name)
+                if old is not value and old != value:
+                    changed.add(f"{prefix}{name}")
+
+        current = self._printer_state.spools
+        for idx, spool in enumerate(current):
+            if idx >= len(spools):
+                changed.add(f"spools[{idx}]")
+            elif spool != spools[idx]:
+                old = vars(spools[idx])
+                changed.update(
+                    f"spools[{idx}].{name}"
+                    for name, value in vars(spool).items()
+                    if old[name] != value
+                )
+        if len(current) < len(spools):
+            changed.add("spools")
+
+        for name, old in values.items():
+            if getattr(self, f"_{name}") != old:
+                changed.add(name)
+
+    def _fetch_project_info(
+        self,
+        subtask_name: str,
+        plate_num: int,
+        file: str | None = None,
+        md5: str | None = None,
+    ):
+        """
+        Resolves the active job's `ProjectInfo` on the background job executor so the
+        FTPS download / SD card listing never blocks the `mqtt` network thread.
+
+        When `file` is not known (job started outside of a `project_file` command) the
+        SD card is searched for `{subtask_name}.gcode.3mf` / `{subtask_name}.3mf`.
+        Requests for the same job and plate that are already in flight are coalesced,
+        whichever of the two paths submitted them.
+
+        In `UpdateDispatchMode.SYNCHRONOUS` the result is applied by the next message
+        handled on the `mqtt` network thread, so `on_update` keeps running there.
+        """
+
+        def fetch() -> ProjectInfo | None:
+            project_file = file
+            if not project_file:
+
+                def find_entry(remote_files):
+                    return get_3mf_entry_by_name(
+                        remote_files, f"{subtask_name}.gcode.3mf"
+                    ) or get_3mf_entry_by_name(remote_files, f"{subtask_name}.3mf")
+
+                file_entry = find_entry(self.get_sdcard_3mf_files())
+                if not file_entry:
+                    # another client may have uploaded the job since the card was listed
+                    file_entry = find_entry(self.get_sdcard_3mf_files(force_refresh=True))
+                if not file_entry:
+                    logger.debug(
+                        f"_fetch_project_info - no 3mf found for subtask [{subtask_name}]"
+                    )
+                    return None
+                project_file = file_entry["id"]
             try:
-                while printer.service_state != ServiceState.QUIT:
-                    if printer.service_state == ServiceState.CONNECTED and (
-                        printer._lastMessageTime is None
-                        or printer._lastMessageTime + printer.config.watchdog_timeout
-                        < time.monotonic()
-                    ):
-                        if printer._lastMessageTime:
-                            logger.debug("watchdog_thread - watchdog timeout")
-                        printer._lastMessageTime = time.monotonic()
-                        printer._recent_update = False
-                        printer.client.publish(
-                            f"device/{printer.config.serial_number}/request",
-                            json.dumps(ANNOUNCE_VERSION),
-                        )
-                        printer.client.publish(
-                            f"device/{printer.config.serial_number}/request",
-                            json.dumps(ANNOUNCE_PUSH),
-                        )
-                    time.sleep(0.1)
+                return get_project_info(project_file, self, md5, plate_num)
             except Exception as e:
-                logger.exception("watchdog_thread - an internal exception occurred")
-                printer._internalException = e
-                if printer.client and printer.client.is_connected():
-                    printer.client.disconnect()
+                logger.warning(f"get_project_info failed for [{project_file}]: {e}")
+                return None
+
+        def on_complete(project_info: ProjectInfo | None):
+            if project_info is None:
+                return
+            # the job may have moved on while we were downloading
+            if subtask_name and self._active_job_info.subtask_name not in (
+                "",
+                subtask_name,
+            ):
+                logger.debug(
+                    f"_fetch_project_info - discarding stale project info for [{project_info.id}]"
+                )
+                return
+            if self.config.update_dispatch_mode == UpdateDispatchMode.COALESCED:
+                self._active_job_info.project_info = project_info
+                self._notify_update({"active_job_info.project_info"})
+            else:
+                self._pending_project_info.append(project_info)
 
-        self._watchdog_thread = threading.Thread(
-            target=watchdog_thread, name="bambuprinter-session-watchdog", args=(self,)
+        self._job_executor.submit(
+            ("project_info", subtask_name or file, plate_num),
+            fetch,
+            on_complete=on_complete,
         )
-        self._watchdog_thread.start()
+
+    def _delayed_refresh(self):
+        logger.debug(
+            f"filament change triggered publishing ANNOUNCE_VERSION to [device/{self.config.serial_number}/request]"
+        )
+        self.client.publish(
+            f"device/{self.config.serial_number}/request",
+            json.dumps(ANNOUNCE_VERSION),
+        )
+        logger.debug(
+            f"filament change triggered publishing ANNOUNCE_PUSH to [device/{self.config.serial_number}/request]"
+        )
+        self.client.publish(
+            f"device/{self.config.serial_number}/request",
+            json.dumps(ANNOUNCE_PUSH),
+        )
+
+    def _start_watchdog(self):
+        """
+        Arms the session watchdog on the process-wide `BambuScheduler`.  Rather than
+        polling, the check is scheduled for the moment the watchdog timeout can
+        expire and re-armed from `service_state` whenever the session (re)connects.
+        """
+        self._watchdog_enabled = True
+        self._schedule_watchdog(time.monotonic())
+
+    def _schedule_watchdog(self, deadline: float):
+        with self._watchdog_lock:
+            if self._watchdog_call:
+                self._watchdog_call.cancel()
+            self._watchdog_call = None
+            if self._watchdog_enabled:
+                self._watchdog_call = self._scheduler.call_at(
+                    deadline, self._watchdog_check
+                )
+
+    def _stop_watchdog(self):
+        self._watchdog_enabled = False
+        self._schedule_watchdog(0.0)
+
+    def _watchdog_check(self):
+        if self.service_state != ServiceState.CONNECTED:
+            # re-armed by the service_state setter once the session is connected
+            return
+        try:
+            # _lastMessageTime may have moved since this check was scheduled; only
+            # announce once it has genuinely gone stale, otherwise re-arm for later
+            if (
+                self._lastMessageTime is None
+                or self._lastMessageTime + self.config.watchdog_timeout < time.monotonic()
+            ):
+                if self._lastMessageTime:
+                    logger.debug("_watchdog_check - watchdog timeout")
+                self._lastMessageTime = time.monotonic()
+                self._recent_update = False
+                self.client.publish(
+                    f"device/{self.config.serial_number}/request",
+                    json.dumps(ANNOUNCE_VERSION),
+                )
+                self.client.publish(
+                    f"device/{self.config.serial_number}/request",
+                    json.dumps(ANNOUNCE_PUSH),
+                )
+            self._schedule_watchdog(self._lastMessageTime + self.config.watchdog_timeout)
+        except Exception as e:
+            logger.exception("_watchdog_check - an internal exception occurred")
+            self._internalException = e
+            self._stop_watchdog()
+            if self.client and self.client.is_connected():
+                self.client.disconnect()
 
     def _on_message(self, msg: str):
         if self.config.verbose:
             logger.debug(f"_on_message - bambu_msg: [{msg}]")
 
         message = json.loads(msg)
+        snapshot = self._change_snapshot() if self.config.report_changed_fields else None
+
+        if self._pending_project_info:
+            self._active_job_info.project_info = self._pending_project_info.popleft()
 
         if "system" in message:
             # system = message["system"]
@@ -2064,40 +2513,17 @@ class BambuPrinter:
                     url.replace("/media/usb0", "").replace("/sdcard", "").split("://", 1)
                 )
                 if len(parts) == 2:
-                    try:
-                        self._active_job_info.project_info = get_project_info(
-                            parts[1], self, md5, plate_num
-                        )
-                    except Exception as e:
-                        logger.warning(f"get_project_info failed for [{parts[1]}]: {e}")
+                    # the job file was most likely just uploaded by the slicer
+                    self._sdcard_listings.invalidate(sdcard_parent(parts[1]))
+                    self._fetch_project_info(subtask_name, plate_num, parts[1], md5)
                 self._active_job_info.subtask_name = subtask_name
                 self._active_job_info.plate_num = plate_num
                 self._active_job_info.plate_type = plate_type
 
             # if ams filament settings have changed
             if "command" in status and status["command"] == "ams_filament_setting":
-
-                def _delayed_refresh():
-                    # let's sleep for a couple seconds and do a full refresh
-                    time.sleep(2.5)
-                    logger.debug(
-                        f"filament change triggered publishing ANNOUNCE_VERSION to [device/{self.config.serial_number}/request]"
-                    )
-                    self.client.publish(
-                        f"device/{self.config.serial_number}/request",
-                        json.dumps(ANNOUNCE_VERSION),
-                    )
-                    logger.debug(
-                        f"filament change triggered publishing ANNOUNCE_PUSH to [device/{self.config.serial_number}/request]"
-                    )
-                    self.client.publish(
-                        f"device/{self.config.serial_number}/request",
-                        json.dumps(ANNOUNCE_PUSH),
-                    )
-
-                threading.Thread(
-                    target=_delayed_refresh, name="bambuprinter-ams-refresh"
-                ).start()
+                # let's wait a couple seconds and do a full refresh
+                self._scheduler.call_later(2.5, self._delayed_refresh)
 
             if "bed_target_temper" in status:
                 bed_temp_target = int(status["bed_target_temper"])
@@ -2171,25 +2597,9 @@ class BambuPrinter:
                                 if self._active_job_info.plate_num > 0
                                 else 1
                             )
-                            remote_files = self.get_sdcard_3mf_files()
-                            file_entry = get_3mf_entry_by_name(
-                                remote_files,
-                                f"{self._active_job_info.subtask_name}.gcode.3mf",
+                            self._fetch_project_info(
+                                self._active_job_info.subtask_name, plate_num
                             )
-                            if not file_entry:
-                                file_entry = get_3mf_entry_by_name(
-                                    remote_files,
-                                    f"{self._active_job_info.subtask_name}.3mf",
-                                )
-                            if file_entry:
-                                try:
-                                    self._active_job_info.project_info = get_project_info(
-                                        file_entry["id"], self, plate_num=plate_num
-                                    )
-                                except Exception as e:
-                                    logger.warning(
-                                        f"get_project_info fallback failed for [{file_entry['id']}]: {e}"
-                                    )
 
             if "mc_remaining_time" in status:
                 remaining_minutes = int(status["mc_remaining_time"])
@@ -2482,56 +2892,10 @@ class BambuPrinter:
                 f"\r_on_message - unknown message type received - bambu_msg: [{message}]"
             )
 
-        self._printer_state = BambuState.fromJson(message, self)
-        self._notify_update()
-
-    def _get_sftp_files(
-        self,
-        ftps: IoTFTPSClient,
-        directory: str,
-        mask: str | None = None,
-    ) -> dict:
-        try:
-            files = ftps.list_files_ex(directory)
-        except Exception:
-            logger.exception("_get_sftp_files - unexpected ftps exception")
-            return {}
-
-        dir: dict = {
-            "id": directory + ("/" if directory != "/" else ""),
-            "name": (
-                directory[directory.rindex("/") + 1 :]
-                if "/" in directory and directory != "/"
-                else directory
-            ),
-        }
-
-        items = []
-
-        for entry in files if files else {}:
-            if entry.is_dir:
-                item = self._get_sftp_files(ftps, entry.path)
-                if not item:
-                    continue
-
-                item["timestamp"] = entry.timestamp.timestamp()
-                items.append(item)
-
-            else:
-                if mask and not entry.name.lower().endswith(mask):
-                    continue
-
-                items.append(
-                    {
-                        "id": entry.path,
-                        "name": entry.name,
-                        "size": entry.size,
-                        "timestamp": entry.timestamp.timestamp(),
-                    }
-                )
-
-        dir["children"] = items
-        return dir
+        changed = self._printer_state.updateFromJson(message, self)
+        if snapshot:
+            self._collect_changes(snapshot, changed)
+        self._notify_update(changed)
 
 
 # endregion
@@ -5,23 +5,39 @@ the job.
 """
 
 import base64
+import contextlib
 import fnmatch
+import ftplib
+import hashlib
+import io
 import json
 import logging
+import os
 import re
+import threading
 import xml.etree.ElementTree as ET
-from dataclasses import asdict, dataclass, field
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
-from zipfile import ZipFile
+from zipfile import BadZipFile, ZipFile
 
+from bpm.bambucache import (
+    BambuCacheManager,
+    ProjectMetadataCache,
+    project_info_cache,
+)
 from bpm.bambutools import LoggerName, PlateType, get_file_md5
+from bpm.ftpsclient.ftpsclient import RemoteFile
 
 if TYPE_CHECKING:
     from bpm.bambuprinter import BambuPrinter
 
 logger = logging.getLogger(LoggerName)
 
+_GCODE_HEADER_MAX_CHARS = 1024 * 1024
+"""Upper bound on the `plate_N.gcode` header text read for the filament fallback."""
+
 
 @dataclass
 class ProjectInfo:
@@ -44,11 +60,14 @@ class ProjectInfo:
 
     | Key          | Type              | Description                                                  |
     |-------------|-------------------|--------------------------------------------------------------|
-    | `thumbnail` | `str`             | `data:image/png;base64,...` — `plate_N.png` as a data URI    |
-    | `topimg`    | `str`             | `data:image/png;base64,...` — `top_N.png` as a data URI      |
     | `map`       | `dict`            | Full `plate_N.json` content, including `filament_ids`, `filament_colors`, and `bbox_objects` (each enriched with `id` from `slice_info.config`) |
     | `filament`  | `list[dict]`      | Normalized per-filament list: `{"id": int, "type": str, "color": "#RRGGBB"}`. `id` is 1-indexed. |
     | `ams_mapping` | `list[str]`     | Stringified absolute tray IDs in the same encoding as `print_3mf_file` `ams_mapping` param. `"-1"` = unmapped. |
+
+    The plate images are not held in memory or in the cached metadata.  They are stored
+    once per distinct image under `{bpm_cache_path}/thumbnails/{md5}.png`, shared by every
+    printer, and loaded on demand with `thumbnail_png()` / `topimg_png()` (or the
+    `*_data_uri()` variants).
     """
 
     id: str = ""
@@ -63,20 +82,18 @@ class ProjectInfo:
     """The md5 checksum of this `3mf`."""
     plate_num: int = 1
     """The plate number this `3mf` targets."""
+    thumbnail_md5: str = ""
+    """The md5 of this plate's slicer preview image (`Metadata/plate_N.png`)."""
+    topimg_md5: str = ""
+    """The md5 of this plate's top-down view image (`Metadata/top_N.png`)."""
+    thumbnail_cache: str = ""
+    """The directory holding the cached plate images, keyed by md5."""
     metadata: dict = field(default_factory=dict)
     """
     Extracted metadata for `plate_num`, populated by `get_project_info`.
 
     Keys
     ----
-    **`thumbnail`** : `str`
-        Slicer preview image for plate N as a `data:image/png;base64,...` URI.
-        Sourced from `Metadata/plate_N.png` inside the `.3mf`.
-
-    **`topimg`** : `str`
-        Top-down view of plate N as a `data:image/png;base64,...` URI.
-        Sourced from `Metadata/top_N.png` inside the `.3mf`.
-
     **`map`** : `dict`
         Full contents of `Metadata/plate_N.json`, including:
 
@@ -138,6 +155,28 @@ class ProjectInfo:
     plates: list[int] = field(default_factory=list)
     """The plate numbers contained within this `3mf`."""
 
+    def thumbnail_png(self) -> bytes | None:
+        """
+        Returns the slicer preview image for `plate_num` (`Metadata/plate_N.png`), or
+        `None` if it is not in the thumbnail cache.
+        """
+        return _load_thumbnail(self.thumbnail_cache, self.thumbnail_md5)
+
+    def topimg_png(self) -> bytes | None:
+        """
+        Returns the top-down view image for `plate_num` (`Metadata/top_N.png`), or
+        `None` if it is not in the thumbnail cache.
+        """
+        return _load_thumbnail(self.thumbnail_cache, self.topimg_md5)
+
+    def thumbnail_data_uri(self) -> str:
+        """`thumbnail_png()` as a `data:image/png;base64,...` URI (`""` if unavailable)."""
+        return _png_data_uri(self.thumbnail_png())
+
+    def topimg_data_uri(self) -> str:
+        """`topimg_png()` as a `data:image/png;base64,...` URI (`""` if unavailable)."""
+        return _png_data_uri(self.topimg_png())
+
 
 @dataclass
 class ActiveJobInfo:
@@ -238,6 +277,7 @@ def get_project_info(
     plate_num: int = 1,
     local_file: str = "",
     use_cached_list: bool = False,
+    sdcard_entry: Callable[[], dict] | None = None,
 ) -> ProjectInfo | None:
     """
     Parse a `.3mf` file and return a populated `ProjectInfo` instance for the
@@ -245,21 +285,37 @@ def get_project_info(
 
     **Resolution order**
 
-    1. If a valid cached metadata file exists at
-       `{bpm_cache_path}/{serial_number}/metadata/{sd_card_path_with_dashes}-{plate_num}.json` **and** the SD card
+    0. If this process already returned the plate and the file is unchanged (same
+       checks as below), the same `ProjectInfo` is returned from memory — no disk or
+       FTPS access beyond the SD card listing (see `bambucache.ProjectInfoCache`).
+       Treat it as read-only.
+    1. If a cached metadata record exists at
+       `{bpm_cache_path}/{serial_number}/metadata/{sd_card_path_with_dashes}.json` **and** the SD card
        entry's `timestamp` + `size` match (or `project_file_md5` matches the cached
-       `md5`), the cached data is returned immediately — no download.
-    2. Otherwise the `.3mf` is downloaded from the printer's SD card via FTPS,
-       every plate is extracted and cached separately, and the local copy is deleted.
-    3. If `local_file` is supplied the download step is skipped entirely and the
+       `md5`), the cached data is returned immediately — no download.  The record
+       points by md5 at the parsed contents of every plate, stored once in
+       `{bpm_cache_path}/projects/{md5}.json` and shared by every printer (see
+       `bambucache.ProjectMetadataCache`).
+    2. If there is no valid record but the file's md5 is known (`project_file_md5`, or
+       the hash of `local_file`) and any printer has already parsed a file with that
+       md5, a record pointing at those contents is written — no download or parsing.
+    3. Otherwise the `.3mf` is read from the printer's SD card via FTPS, every plate
+       is extracted and the contents / record rewritten in atomic writes.  The whole
+       file is downloaded (and hashed as it streams), parsed and the local copy
+       deleted.  A ranged read never sees the whole file, so only when
+       `project_file_md5` is given and `BambuConfig.ftps_ranged_reads` is set are just
+       the ZIP central directory and the `Metadata/` entries listed below fetched
+       (`REST` + `RETR`), falling back to the download if the printer does not support
+       ranged transfers.
+    4. If `local_file` is supplied the download step is skipped entirely and the
        provided path is parsed directly (used during `upload_sdcard_file`).
 
     **What is extracted per plate**
 
     | Source in ZIP                        | Metadata key  | Description                            |
     |--------------------------------------|---------------|----------------------------------------|
-    | `Metadata/plate_N.png`               | `thumbnail`   | Data-URI PNG — slicer preview          |
-    | `Metadata/top_N.png`                 | `topimg`      | Data-URI PNG — top-down view           |
+    | `Metadata/plate_N.png`               | `thumbnail_md5` | PNG — slicer preview (`thumbnail_png()`) |
+    | `Metadata/top_N.png`                 | `topimg_md5`  | PNG — top-down view (`topimg_png()`)   |
     | `Metadata/plate_N.json`              | `map`         | Raw plate JSON (bbox_objects, filament_ids, filament_colors) |
     | `Metadata/slice_info.config` (XML)   | `filament`    | `[{"id": int, "type": str, "color": "#RRGGBB"}, ...]` |
     | `Metadata/slice_info.config` (XML)   | `ams_mapping` | Stringified absolute tray IDs; `"-1"` = unmapped |
@@ -299,6 +355,10 @@ def get_project_info(
         skipped entirely.
     * use_cached_list : bool = False - When `True`, `printer.cached_sd_card_3mf_files`
         is used instead of issuing a fresh `get_sdcard_3mf_files()` call.
+    * sdcard_entry : Optional[Callable] - Returns the file's SD card entry (`id`,
+        `name`, `size`, `timestamp`) in place of a listing lookup.  It is only called
+        once the plates are parsed (used by `upload_sdcard_file`, which knows the entry
+        once its transfer completes).
 
     Returns
     -------
@@ -364,6 +424,38 @@ def get_project_info(
 
         return []
 
+    def _read_gcode_header(zf: ZipFile, name: str) -> str:
+        # filament settings live in the leading comment blocks (HEADER_BLOCK /
+        # CONFIG_BLOCK); stop at the end of those instead of inflating the whole
+        # (often hundreds of MB) G-code member
+        lines: list[str] = []
+        read = 0
+        truncated = False
+        with (
+            zf.open(name) as raw,
+            io.TextIOWrapper(raw, encoding="utf-8", errors="ignore") as f,
+        ):
+            for line in f:
+                stripped = line.strip()
+                if stripped and not stripped.startswith(";"):
+                    break
+                lines.append(line)
+                if "CONFIG_BLOCK_END" in stripped:
+                    break
+                read += len(line)
+                if read >= _GCODE_HEADER_MAX_CHARS:
+                    truncated = True
+                    break
+        if not truncated:
+            return "".join(lines)
+
+        # a truncated header could silently drop the filament settings
+        logger.debug(
+            f"get_project_info - header of [{name}] exceeds [{_GCODE_HEADER_MAX_CHARS}] chars, reading the whole file"
+        )
+        with zf.open(name) as f:
+            return f.read().decode("utf-8", errors="ignore")
+
     def _normalize_hex_color(value: str) -> str:
         color = value.strip().upper()
         if not color:
@@ -423,6 +515,86 @@ def get_project_info(
 
         metadata["ams_mapping"] = ams_mapping
 
+    def _sdcard_entry() -> dict:
+        nonlocal remote_files
+        if sdcard_entry is not None:
+            return sdcard_entry()
+        if not remote_files:
+            remote_files = (
+                printer.get_sdcard_3mf_files()
+                if not use_cached_list
+                else printer.cached_sd_card_3mf_files
+            )
+        entry = get_3mf_entry_by_id(remote_files, file)
+        if entry is None and not use_cached_list:
+            # the SD card listing is cached; the file may be newer than it
+            remote_files = printer.get_sdcard_3mf_files(force_refresh=True)
+            entry = get_3mf_entry_by_id(remote_files, file)
+        if entry is None:
+            raise Exception(
+                f"get_project_info - Entry for file [{file}] not found in sdcard_3mf_files"
+            )
+        return entry
+
+    def _contents(record: dict[str, Any]) -> dict[str, Any] | None:
+        # records written without an md5 keep their plates inline
+        if "plate_data" in record:
+            return record
+        return projects.get_by_md5(record["md5"]) if record.get("md5") else None
+
+    def _link(md5: str) -> dict[str, Any]:
+        # points this printer's record for `file` at contents parsed elsewhere
+        entry = _sdcard_entry()
+        record = {
+            "id": file,
+            "name": entry["name"],
+            "size": entry["size"],
+            "timestamp": entry["timestamp"],
+            "md5": md5,
+        }
+        records.put(record)
+        return record
+
+    def _cached(record: dict[str, Any], contents: dict[str, Any]) -> ProjectInfo | None:
+        manager.hit()
+        pi = _from_record(record, contents, plate_num)
+        if pi is not None:
+            project_info_cache.put(serial, plate_num, pi)
+        return pi
+
+    def _from_record(
+        record: dict[str, Any], contents: dict[str, Any], plate_num: int
+    ) -> ProjectInfo | None:
+        plate_data = contents.get("plate_data", {})
+        if str(plate_num) not in plate_data:
+            if not plate_data:
+                return None
+            num = next(iter(plate_data))
+            logger.debug(
+                f"get_project_info - requested plate_num [{plate_num}] not found in cached metadata - defaulting to plate_num [{num}]"
+            )
+            plate_num = int(num)
+        data = plate_data[str(plate_num)]
+
+        pi = ProjectInfo()
+        pi.id = record["id"]
+        pi.name = record["name"]
+        pi.plates = contents.get("plates", [])
+        pi.plate_num = plate_num
+        pi.md5 = record["md5"]
+        pi.timestamp = record["timestamp"]
+        pi.size = record["size"]
+        pi.thumbnail_md5 = data.get("thumbnail_md5", "")
+        pi.topimg_md5 = data.get("topimg_md5", "")
+        pi.thumbnail_cache = str(thumbnail_cache)
+        pi.metadata = data["metadata"]
+        _ensure_ams_mapping(pi.metadata)
+        # keep the plate images as recently used as the record that refers to them
+        for md5 in (pi.thumbnail_md5, pi.topimg_md5):
+            if md5:
+                manager.touch(thumbnail_cache / f"{md5}.png")
+        return pi
+
     file = project_file_id
 
     if not file.startswith("/"):
@@ -430,13 +602,15 @@ def get_project_info(
 
     filename = file.lstrip("/").replace("/", "-")
     serial = printer.config.serial_number
-    cache_path = (
+    bpm_cache_path = (
         printer.config.bpm_cache_path if printer.config.bpm_cache_path else Path()
     )
-    if serial:
-        cache_path = cache_path / serial
-    (cache_path / "metadata").mkdir(parents=True, exist_ok=True)
-    metadata = cache_path / "metadata" / f"{filename}-{plate_num}.json"
+    cache_path = bpm_cache_path / serial if serial else bpm_cache_path
+    manager = printer.cache_manager
+    records = ProjectMetadataCache.shared(cache_path / "metadata", manager)
+    # parsed contents and plate images are shared by every printer, keyed by md5
+    projects = ProjectMetadataCache.shared(bpm_cache_path / "projects", manager)
+    thumbnail_cache = bpm_cache_path / "thumbnails"
     localfile = cache_path / filename
 
     if local_file:
@@ -444,22 +618,7 @@ def get_project_info(
 
     remote_files = None
 
-    if not metadata.exists() and not local_file:
-        metapath = cache_path / "metadata"
-        matches = list(metapath.glob(f"{filename}-?.json"))
-        if matches:
-            metadata = matches[0]
-            plate_num_match = re.search(
-                rf"{re.escape(filename)}-(\d+)\.json", metadata.name
-            )
-            if plate_num_match:
-                plate_num = int(plate_num_match.group(1))
-            logger.debug(
-                f"get_project_info - using fallback metadata file: [{metadata.name}] plate: [{plate_num}]"
-            )
-
-    if metadata.exists() and not local_file:
-        lmd = None
+    if not local_file:
         rmd = None
 
         if not project_file_md5:
@@ -470,50 +629,59 @@ def get_project_info(
             )
             rmd = get_3mf_entry_by_id(remote_files, file)
 
-        with metadata.open("r") as f:
-            lmd = json.load(f)
-
-        if (
-            lmd
-            and "plate_num" in lmd
-            and lmd["plate_num"] == plate_num
-            and rmd
-            and rmd["timestamp"] == lmd["timestamp"]
-            and rmd["size"] == lmd["size"]
-        ) or (
-            project_file_md5
-            and "md5" in lmd
-            and lmd["md5"] == project_file_md5.upper()
-            and "plate_num" in lmd
-            and lmd["plate_num"] == plate_num
-        ):
-            logger.debug(f"get_project_info - using cached 3mf metadata for [{file}]")
-
-            pi = ProjectInfo()
-
-            pi.id = lmd["id"]
-            pi.name = lmd["name"]
-            pi.plates = lmd.get("plates", [])
-            pi.plate_num = plate_num
-            pi.md5 = lmd["md5"]
-            pi.timestamp = lmd["timestamp"]
-            pi.size = lmd["size"]
-            pi.metadata = lmd["metadata"]
-            _ensure_ams_mapping(pi.metadata)
-
+        size = rmd["size"] if rmd else None
+        timestamp = rmd["timestamp"] if rmd else None
+        pi = project_info_cache.get(
+            serial, file, plate_num, size=size, timestamp=timestamp, md5=project_file_md5
+        )
+        if pi is not None:
+            logger.debug(f"get_project_info - using in-memory 3mf metadata for [{file}]")
             return pi
 
-    if not local_file:
-        localfile.unlink(missing_ok=True)
+        record = records.find(file, size=size, timestamp=timestamp, md5=project_file_md5)
+        contents = _contents(record) if record is not None else None
+        if contents is not None:
+            logger.debug(f"get_project_info - using cached 3mf metadata for [{file}]")
+            return _cached(record, contents)
 
-    for num in range(1, 31):
-        md = cache_path / "metadata" / f"{filename}-{num}.json"
-        md.unlink(missing_ok=True)
+        if project_file_md5:
+            contents = projects.get_by_md5(project_file_md5)
+            if contents is not None:
+                logger.debug(
+                    f"get_project_info - using shared 3mf metadata for [{file}] md5 [{project_file_md5}]"
+                )
+                return _cached(_link(project_file_md5.upper()), contents)
 
-    if not local_file and printer.sdcard_file_exists(file):
-        printer.download_sdcard_file(file, str(localfile))
-    elif not local_file:
-        raise Exception(f"get_project_info - [{file}] not found in sdcard_3mf_files")
+        manager.miss()
+        localfile.unlink(missing_ok=True)
+    else:
+        # an upload of a file some printer already has needs no parsing
+        file_md5 = get_file_md5(localfile)
+        contents = projects.get_by_md5(file_md5)
+        if contents is not None:
+            logger.debug(
+                f"get_project_info - using shared 3mf metadata for [{file}] md5 [{file_md5}]"
+            )
+            return _cached(_link(file_md5), contents)
+
+    # the lease backing a ranged read is released when the ZIP is closed below; a
+    # ranged read never sees the whole file, so it needs the printer's md5
+    stack = contextlib.ExitStack()
+    source: Path | RemoteFile = localfile
+    if not local_file and project_file_md5 and printer.config.ftps_ranged_reads:
+        remote = _open_remote_3mf(stack, printer, file)
+        if remote is not None:
+            source = remote
+            file_md5 = project_file_md5.upper()
+
+    # hashed once per file (while downloading) and shared by every plate
+    if source is localfile and not local_file:
+        if printer.sdcard_file_exists(file):
+            digest = hashlib.md5()
+            printer.download_sdcard_file(file, str(localfile), digest=digest)
+            file_md5 = digest.hexdigest().upper()
+        else:
+            raise Exception(f"get_project_info - [{file}] not found in sdcard_3mf_files")
 
     thumbnail_png = None
     top_view_png = None
@@ -522,7 +690,9 @@ def get_project_info(
     project_settings_cfg = ""
 
     plate_nums = []
-    with ZipFile(localfile, "r") as zf:
+    plate_data: dict[str, dict[str, Any]] = {}
+    parsed: list[ProjectInfo] = []
+    with stack, ZipFile(source, "r") as zf:
         all_files = zf.namelist()
         plate_pattern = "Metadata/plate_*.json"
         plate_files = fnmatch.filter(all_files, plate_pattern)
@@ -531,14 +701,13 @@ def get_project_info(
             if num.isnumeric():
                 plate_nums.append(int(num))
 
-    if plate_num not in plate_nums:
-        num = plate_nums[0] if plate_nums else 1
-        logger.debug(
-            f"get_project_info - requested plate_num [{plate_num}] not found in 3mf metadata - defaulting to plate_num [{num}]"
-        )
-        plate_num = num
+        if plate_num not in plate_nums:
+            num = plate_nums[0] if plate_nums else 1
+            logger.debug(
+                f"get_project_info - requested plate_num [{plate_num}] not found in 3mf metadata - defaulting to plate_num [{num}]"
+            )
+            plate_num = num
 
-    with ZipFile(localfile, "r") as zf:
         with zf.open("Metadata/slice_info.config") as f:
             slice_info_cfg = ET.fromstring(f.read().decode("utf-8"))
 
@@ -561,14 +730,13 @@ def get_project_info(
                 with zf.open(f"Metadata/top_{num}.png") as f:
                     top_view_png = f.read()
 
-                pi.metadata = {}
-                pi.metadata["thumbnail"] = (
-                    f"data:image/png;base64,{base64.b64encode(thumbnail_png).decode()}"
-                )
-                pi.metadata["topimg"] = (
-                    f"data:image/png;base64,{base64.b64encode(top_view_png).decode()}"
+                pi.thumbnail_cache = str(thumbnail_cache)
+                pi.thumbnail_md5 = _store_thumbnail(
+                    thumbnail_cache, thumbnail_png, manager
                 )
+                pi.topimg_md5 = _store_thumbnail(thumbnail_cache, top_view_png, manager)
 
+                pi.metadata = {}
                 pi.metadata["map"] = json.loads(plate_map)
                 objects = get_nodes_by_plate_id(slice_info_cfg, num, "object")
                 idx = 0
@@ -606,8 +774,9 @@ def get_project_info(
 
                     plate_gcode_header = ""
                     try:
-                        with zf.open(f"Metadata/plate_{num}.gcode") as f:
-                            plate_gcode_header = f.read().decode("utf-8", errors="ignore")
+                        plate_gcode_header = _read_gcode_header(
+                            zf, f"Metadata/plate_{num}.gcode"
+                        )
                     except KeyError:
                         plate_gcode_header = ""
 
@@ -721,36 +890,20 @@ def get_project_info(
                     "initial_layer_height": _single("initial_layer_height", "0.2"),
                 }
 
-                if not remote_files:
-                    remote_files = (
-                        printer.get_sdcard_3mf_files()
-                        if not use_cached_list
-                        else printer.cached_sd_card_3mf_files
-                    )
-                entry = get_3mf_entry_by_id(remote_files, file)
-                if entry is None:
-                    raise Exception(
-                        f"get_project_info - Entry for file [{file}] not found in sdcard_3mf_files"
-                    )
-
-                pi.id = entry["id"]
-                pi.name = entry["name"]
                 pi.plates = plate_nums
                 pi.plate_num = num
-                pi.size = entry["size"]
-                pi.timestamp = entry["timestamp"]
-                pi.md5 = get_file_md5(localfile)
+                pi.md5 = file_md5
 
-                md = cache_path / "metadata" / f"{filename}-{num}.json"
-                with md.open("w") as f:
-                    logger.debug(
-                        f"get_project_info - caching 3mf metadata for [{file}] plate [{num}]"
-                    )
-                    json.dump(asdict(pi), f, indent=4)
+                plate_data[str(num)] = {
+                    "thumbnail_md5": pi.thumbnail_md5,
+                    "topimg_md5": pi.topimg_md5,
+                    "metadata": pi.metadata,
+                }
+                parsed.append(pi)
 
                 if pi.plate_num == plate_num:
                     logger.debug(
-                        f"get_project_info - set return value for [{pi.id}] plate [{pi.plate_num}]"
+                        f"get_project_info - set return value for [{file}] plate [{pi.plate_num}]"
                     )
                     ret = pi
 
@@ -761,7 +914,98 @@ def get_project_info(
                     )
                 continue
 
+    if parsed:
+        # only needed once the plates are parsed, so an upload can parse its local copy
+        # while the transfer that produces the SD card entry is still running
+        entry = _sdcard_entry()
+        for pi in parsed:
+            pi.id = entry["id"]
+            pi.name = entry["name"]
+            pi.size = entry["size"]
+            pi.timestamp = entry["timestamp"]
+
+        logger.debug(
+            f"get_project_info - caching 3mf metadata for [{file}] plates [{list(plate_data)}]"
+        )
+        # the cache may move; thumbnail_cache is re-derived when the record is read
+        record = {
+            "id": entry["id"],
+            "name": entry["name"],
+            "size": entry["size"],
+            "timestamp": entry["timestamp"],
+            "md5": file_md5,
+        }
+        projects.put(
+            {
+                "id": file_md5,
+                "md5": file_md5,
+                "plates": plate_nums,
+                "plate_data": plate_data,
+            }
+        )
+        records.put(record)
+    if ret is not None:
+        project_info_cache.put(serial, plate_num, ret)
+
     if not local_file:
         localfile.unlink(missing_ok=True)
 
     return ret
+
+
+def _store_thumbnail(directory: Path, png: bytes, manager: BambuCacheManager) -> str:
+    """
+    Writes `png` to `directory` under its md5 (once per distinct image) and returns the
+    md5.
+    """
+    md5 = hashlib.md5(png).hexdigest().upper()
+    path = directory / f"{md5}.png"
+    if path.exists():
+        manager.touch(path)
+        return md5
+    directory.mkdir(parents=True, exist_ok=True)
+    # readers never see a partially written image
+    tmp = path.with_name(f"{md5}.{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp.write_bytes(png)
+    tmp.replace(path)
+    manager.record(path, len(png))
+    return md5
+
+
+def _load_thumbnail(directory: str, md5: str) -> bytes | None:
+    if not directory or not md5:
+        return None
+    try:
+        return (Path(directory) / f"{md5}.png").read_bytes()
+    except OSError:
+        return None
+
+
+def _png_data_uri(png: bytes | None) -> str:
+    if png is None:
+        return ""
+    return f"data:image/png;base64,{base64.b64encode(png).decode()}"
+
+
+def _open_remote_3mf(
+    stack: contextlib.ExitStack, printer: "BambuPrinter", file: str
+) -> RemoteFile | None:
+    """
+    Opens `file` on the SD card for ranged reading, holding the FTPS lease on `stack`.
+    Returns `None` (with `stack` unwound) if the printer does not support ranged
+    transfers or the file is not a readable ZIP, so the caller can fall back to a full
+    download.
+    """
+    try:
+        ftps = stack.enter_context(printer.ftp_connection())
+        remote = stack.enter_context(ftps.open_file(file))
+        # fetches the end of central directory record and the central directory
+        ZipFile(remote).close()
+        return remote
+    except (ftplib.Error, OSError, EOFError, BadZipFile) as e:
+        logger.debug(
+            f"_open_remote_3mf - ranged read of [{file}] failed, downloading instead - reason: [{e}]"
+        )
+        # unwind with the exception so the lease discards the session
+        stack.__exit__(type(e), e, e.__traceback__)
+        return None
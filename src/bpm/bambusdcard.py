@@ -0,0 +1,327 @@
+"""
+`bambusdcard` caches SD card directory listings so `BambuPrinter` can refresh its file
+tree incrementally instead of re-walking the whole card on every request.
+"""
+
+import contextlib
+import logging
+import posixpath
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+
+from bpm.bambutools import LoggerName
+from bpm.ftpsclient.ftpsclient import FtpListItem
+
+logger = logging.getLogger(LoggerName)
+
+DirectoryLister = Callable[[str], list[FtpListItem] | None]
+"""
+Lists one SD card directory, returning `None` if it could not be listed.  A `None`
+listing is never cached; the directory is left out of the tree and listed again by the
+next refresh.
+"""
+
+
+def normalize_sdcard_path(path: str) -> str:
+    """Returns `path` as an absolute SD card path without a trailing slash."""
+    return "/" + path.strip("/")
+
+
+def sdcard_parent(path: str) -> str:
+    """Returns the directory containing the SD card file or folder `path`."""
+    return posixpath.dirname(normalize_sdcard_path(path)) or "/"
+
+
+@dataclass
+class _DirectoryListing:
+    items: list[FtpListItem]
+    listed_at: float
+
+
+class SdCardListingCache:
+    """
+    A per-directory cache of SD card listings.
+
+    Each directory's listing expires `ttl` seconds after it was fetched, so a refresh
+    only re-lists stale directories.  `BambuPrinter` invalidates listings precisely
+    whenever it changes the card itself (upload, delete, rename, mkdir); changes made
+    by other clients (e.g. a slicer upload) become visible once the listing expires.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        """
+        Parameters
+        ----------
+        * ttl : float = 30.0 - Seconds a directory listing stays fresh (`0` disables caching).
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._listings: dict[str, _DirectoryListing] = {}
+
+    def get(self, path: str) -> list[FtpListItem] | None:
+        """Returns the cached listing for a directory, or `None` if missing or stale."""
+        with self._lock:
+            listing = self._listings.get(normalize_sdcard_path(path))
+        if listing is None or time.monotonic() - listing.listed_at >= self.ttl:
+            return None
+        return listing.items
+
+    def put(self, path: str, items: list[FtpListItem]):
+        """Caches the listing for a directory."""
+        with self._lock:
+            self._listings[normalize_sdcard_path(path)] = _DirectoryListing(
+                items, time.monotonic()
+            )
+
+    def insert(self, item: FtpListItem):
+        """
+        Adds (or replaces) `item` in the cached listing of its directory, if that
+        listing is cached, without extending how long the listing stays fresh.
+        """
+        with self._lock:
+            listing = self._listings.get(sdcard_parent(item.path))
+            if listing is not None:
+                listing.items = [i for i in listing.items if i.path != item.path]
+                listing.items.append(item)
+
+    def invalidate(self, path: str):
+        """Drops the cached listing for a single directory."""
+        with self._lock:
+            self._listings.pop(normalize_sdcard_path(path), None)
+
+    def invalidate_tree(self, path: str):
+        """Drops the cached listings for a directory and everything beneath it."""
+        path = normalize_sdcard_path(path)
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            for key in [k for k in self._listings if k == path or k.startswith(prefix)]:
+                del self._listings[key]
+
+    def clear(self):
+        """Drops every cached listing."""
+        with self._lock:
+            self._listings.clear()
+
+    def build_trees(
+        self,
+        open_lister: Callable[[], AbstractContextManager[DirectoryLister]],
+        root: str = "/",
+        mask: str = ".3mf",
+        max_workers: int = 1,
+    ) -> tuple[dict, dict] | None:
+        """
+        Builds the SD card tree from cached listings, listing only directories whose
+        listing is missing or stale.
+
+        Stale directories are listed by up to `max_workers` workers, each holding its own
+        lister (FTPS session) for the duration of the refresh.  The calling thread is
+        always the first worker; the others are started only while more directories are
+        waiting to be listed than there are workers, so a refresh that touches one
+        directory never opens a second session.
+
+        Parameters
+        ----------
+        * open_lister : Callable - Returns a context manager yielding a `DirectoryLister`.
+            It is only entered by a worker that has a directory to list.
+        * root : str = "/" - The directory to start from.
+        * mask : str = ".3mf" - File suffix kept in the second (filtered) tree.
+        * max_workers : int = 1 - Maximum number of directories listed concurrently.
+
+        Returns
+        -------
+        A `(contents, masked)` pair of alphabetically sorted trees in the `id` / `name` /
+        `children` format used by `BambuPrinter.get_sdcard_contents`, or `None` if
+        `root` could not be listed.  The trees share no nodes.
+        """
+        root = normalize_sdcard_path(root)
+        listings: dict[str, list[FtpListItem]] = {}
+        stale: list[str] = []
+        self._collect(root, listings, stale)
+        if stale:
+            _ListingRun(self, open_lister, listings, stale, max(1, max_workers)).run()
+        return self._build_node(root, listings, mask)
+
+    def _collect(
+        self, directory: str, listings: dict[str, list[FtpListItem]], stale: list[str]
+    ):
+        # walks the cached listings below `directory`, gathering the fresh ones and the
+        # directories that need to be (re-)listed
+        items = self.get(directory)
+        if items is None:
+            stale.append(directory)
+            return
+        listings[directory] = items
+        for entry in items:
+            if entry.is_dir:
+                self._collect(entry.path, listings, stale)
+
+    def _build_node(
+        self, directory: str, listings: dict[str, list[FtpListItem]], mask: str
+    ) -> tuple[dict, dict] | None:
+        items = listings.get(directory)
+        if items is None:
+            return None
+
+        node_id = directory + ("/" if directory != "/" else "")
+        name = directory[directory.rindex("/") + 1 :] if directory != "/" else directory
+        children = []
+        masked_children = []
+
+        for entry in items:
+            if entry.is_dir:
+                nodes = self._build_node(entry.path, listings, mask)
+                if nodes is None:
+                    continue
+                timestamp = entry.timestamp.timestamp()
+                nodes[0]["timestamp"] = timestamp
+                nodes[1]["timestamp"] = timestamp
+                children.append(nodes[0])
+                masked_children.append(nodes[1])
+            else:
+                node = {
+                    "id": entry.path,
+                    "name": entry.name,
+                    "size": entry.size,
+                    "timestamp": entry.timestamp.timestamp(),
+                }
+                children.append(node)
+                if entry.path.endswith(mask):
+                    masked_children.append(dict(node))
+
+        # folders first, then case-insensitive by name (see `sortFileTreeAlphabetically`)
+        children.sort(key=_tree_sort_key)
+        masked_children.sort(key=_tree_sort_key)
+        return (
+            {"id": node_id, "name": name, "children": children},
+            {"id": node_id, "name": name, "children": masked_children},
+        )
+
+
+class _ListingRun:
+    """Lists a set of stale directories (and any stale directories found beneath them)."""
+
+    def __init__(
+        self,
+        cache: SdCardListingCache,
+        open_lister: Callable[[], AbstractContextManager[DirectoryLister]],
+        listings: dict[str, list[FtpListItem]],
+        stale: list[str],
+        max_workers: int,
+    ):
+        self._cache = cache
+        self._open_lister = open_lister
+        self._listings = listings
+        self._queue = deque(stale)
+        self._max_workers = max_workers
+        self._cv = threading.Condition()
+        self._workers = 1
+        self._busy = 0
+        self._threads: list[threading.Thread] = []
+
+    def run(self):
+        try:
+            self._work()
+        finally:
+            with self._cv:
+                # stop any helpers that have not picked up work yet
+                self._queue.clear()
+                self._cv.notify_all()
+            for thread in self._threads:
+                thread.join()
+
+    def _helper(self):
+        try:
+            self._work()
+        except Exception as e:
+            logger.warning(f"build_trees - listing worker failed - reason: [{e}]")
+        finally:
+            with self._cv:
+                self._workers -= 1
+                self._cv.notify_all()
+
+    def _work(self):
+        with contextlib.ExitStack() as stack:
+            list_directory: DirectoryLister | None = None
+            while True:
+                with self._cv:
+                    while not self._queue and self._busy:
+                        self._cv.wait()
+                    if not self._queue:
+                        return
+                    directory = self._queue.popleft()
+                    self._busy += 1
+                    self._spawn_helpers()
+
+                try:
+                    if list_directory is None:
+                        list_directory = stack.enter_context(self._open_lister())
+                    items = list_directory(directory)
+                except BaseException:
+                    with self._cv:
+                        self._queue.appendleft(directory)
+                        self._busy -= 1
+                        self._cv.notify_all()
+                    raise
+
+                stale: list[str] = []
+                with self._cv:
+                    if items is not None:
+                        self._cache.put(directory, items)
+                        self._listings[directory] = items
+                        for entry in items:
+                            if entry.is_dir:
+                                self._cache._collect(entry.path, self._listings, stale)
+                    self._queue.extend(stale)
+                    self._busy -= 1
+                    self._cv.notify_all()
+
+    def _spawn_helpers(self):
+        # called with the condition held
+        # only add a worker while more directories are queued than there are idle workers
+        while (
+            self._workers < self._max_workers
+            and len(self._queue) > self._workers - self._busy
+        ):
+            self._workers += 1
+            thread = threading.Thread(
+                target=self._helper,
+                name=f"bambuprinter-sdcard-{len(self._threads) + 1}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+
+
+def insert_tree_node(tree: dict, node: dict) -> bool:
+    """
+    Adds (or replaces) the file `node` in a tree built by
+    `SdCardListingCache.build_trees`, keeping its folder sorted.  Returns `False` if
+    the file's folder is not part of the tree.
+    """
+    folder = sdcard_parent(node["id"])
+    folder_id = folder + ("/" if folder != "/" else "")
+    parent = tree
+    while parent["id"] != folder_id:
+        parent = next(
+            (
+                child
+                for child in parent.get("children", [])
+                if child["id"].endswith("/") and folder_id.startswith(child["id"])
+            ),
+            None,
+        )
+        if parent is None:
+            return False
+    children = [child for child in parent["children"] if child["id"] != node["id"]]
+    children.append(node)
+    children.sort(key=_tree_sort_key)
+    parent["children"] = children
+    return True
+
+
+def _tree_sort_key(node: dict) -> tuple[bool, str]:
+    return (not node["id"].endswith("/"), node["name"].lower())
@@ -5,10 +5,9 @@ operational state, synchronized via MQTT telemetry.
 
 # region imports
 import logging
-from dataclasses import asdict, dataclass, field, replace
+from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, Any, Self
 
-from bpm.bambuconfig import PrinterCapabilities
 from bpm.bambuspool import BambuSpool
 from bpm.bambutools import (
     ActiveTool,
@@ -35,6 +34,7 @@ from bpm.bambutools import (
     parseExtruderStatus,
     parseExtruderTrayState,
     scaleFanSpeed,
+    set_if_changed,
     unpackTemperature,
 )
 
@@ -300,13 +300,58 @@ class BambuState:
 
     @classmethod
     def fromJson(cls, data: dict[str, Any], printer: "BambuPrinter") -> "BambuState":
-        """Parses root MQTT payloads into a hierachical BambuState object."""
+        """
+        Parses root MQTT payloads into a hierachical BambuState object.
 
+        Returns a new `BambuState`: a shallow copy of the printer's current state with
+        `data` applied through `updateFromJson`.  `BambuPrinter` updates its own state
+        in place; this entry point remains for callers that want a separate snapshot.
+        """
         current_state = printer.printer_state
+        if current_state:
+            state = replace(
+                current_state,
+                climate=replace(current_state.climate),
+                ams_units=[replace(u) for u in current_state.ams_units],
+                extruders=[replace(e) for e in current_state.extruders],
+            )
+        else:
+            state = cls()
+        state.updateFromJson(data, printer)
+        return state
+
+    def updateFromJson(self, data: dict[str, Any], printer: "BambuPrinter") -> set[str]:
+        """
+        Applies a root MQTT payload to this state in place.
+
+        Only attributes whose value actually changes are written and nothing is
+        copied, so small delta pushes (for example a lone `mc_percent`) cost little
+        more than the keys they carry.
+
+        Parameters
+        ----------
+        * data : dict[str, Any] - The decoded MQTT payload.
+        * printer : BambuPrinter - The printer the payload belongs to.  Its
+            `config.capabilities` are updated from the payload as well.
+
+        Returns
+        -------
+        The set of changed field paths.  Nested attributes are reported as dotted paths
+        (`climate.bed_temp`, `ams_units[1].humidity_index`), a list element that was
+        added is reported by index (`extruders[1]`) and a list that shrank by name.
+        """
         config = printer.config
+        caps = config.capabilities
         aji = printer.active_job_info
+        climate = self.climate
+        changed: set[str] = set()
+
+        def update(name: str, value: Any):
+            set_if_changed(self, name, value, changed)
+
+        def update_climate(name: str, value: Any):
+            set_if_changed(climate, name, value, changed, "climate.")
 
-        base = current_state if current_state else cls()
         info = data.get("info", {})
         p = data.get("print", {})
 
@@ -315,9 +360,17 @@ class BambuState:
             and p.get("result", "") == "success"
         ):
             ams_id = p.get("ams_id", -1)
-            ams = next((u for u in base.ams_units if u.ams_id == ams_id), None)
-            if ams:
-                ams.temp_target = int(p.get("temp", 0))
+            idx = next(
+                (i for i, u in enumerate(self.ams_units) if u.ams_id == ams_id), None
+            )
+            if idx is not None:
+                set_if_changed(
+                    self.ams_units[idx],
+                    "temp_target",
+                    int(p.get("temp", 0)),
+                    changed,
+                    f"ams_units[{idx}].",
+                )
 
         ams_root = p.get("ams", {})
         device = p.get("device", {})
@@ -328,93 +381,85 @@ class BambuState:
         airduct_root = device.get("airduct", {})
 
         modules = info.get("module", [])
-        updates = {}
 
         # CAPABILITIES
-        caps = asdict(config.capabilities)
+        # the fan mapping below is based on what was known before this payload
+        had_chamber_temp = caps.has_chamber_temp
         if ctc_root:
-            caps["has_chamber_temp"] = True
+            caps.has_chamber_temp = True
         if "ams" in ams_root or "ams" in p:
-            caps["has_ams"] = True
-            caps["has_auto_switch_filament_support"] = True
+            caps.has_ams = True
+            caps.has_auto_switch_filament_support = True
         if airduct_root:
-            caps["has_air_filtration"] = True
+            caps.has_air_filtration = True
         if len(extruder_root.get("info", [])) > 1:
-            caps["has_dual_extruder"] = True
+            caps.has_dual_extruder = True
 
-        caps["has_camera"] = True
+        caps.has_camera = True
 
         xcam_data = p.get("xcam", None)
         if xcam_data:
-            caps["has_lidar"] = xcam_data.get("first_layer_inspector", False)
-        else:
-            caps["has_lidar"] = config.capabilities.has_lidar
-
-        new_caps = PrinterCapabilities(**caps)
-
-        climate = asdict(base.climate)
-        updates["climate"] = BambuClimate(**climate)
+            caps.has_lidar = xcam_data.get("first_layer_inspector", False)
 
         # STATUS & PROGRESS
-        updates["gcode_state"] = p.get("gcode_state", base.gcode_state)
-
-        updates["fun"] = p.get("fun", base.fun)
-        fun = int(updates["fun"], 16)
-        new_caps.has_chamber_door_sensor = bool((fun >> 12) & 0x01)
-        new_caps.has_spaghetti_detector_support = bool((fun >> 42) & 0x01)
-        new_caps.has_purgechutepileup_detector_support = bool((fun >> 43) & 0x01)
-        new_caps.has_nozzleclumping_detector_support = bool((fun >> 44) & 0x01)
-        new_caps.has_airprinting_detector_support = bool((fun >> 45) & 0x01)
-
-        if new_caps.has_chamber_door_sensor:
-            updates["stat"] = p.get("stat", base.stat)
-            stat = int(updates["stat"], 16)
-            updates["climate"].is_chamber_door_open = bool((stat >> 23) & 0x01)
-            updates["climate"].is_chamber_lid_open = bool((stat >> 24) & 0x01)
+        update("gcode_state", p.get("gcode_state", self.gcode_state))
+
+        update("fun", p.get("fun", self.fun))
+        fun = int(self.fun, 16)
+        caps.has_chamber_door_sensor = bool((fun >> 12) & 0x01)
+        caps.has_spaghetti_detector_support = bool((fun >> 42) & 0x01)
+        caps.has_purgechutepileup_detector_support = bool((fun >> 43) & 0x01)
+        caps.has_nozzleclumping_detector_support = bool((fun >> 44) & 0x01)
+        caps.has_airprinting_detector_support = bool((fun >> 45) & 0x01)
+
+        if caps.has_chamber_door_sensor:
+            update("stat", p.get("stat", self.stat))
+            stat = int(self.stat, 16)
+            update_climate("is_chamber_door_open", bool((stat >> 23) & 0x01))
+            update_climate("is_chamber_lid_open", bool((stat >> 24) & 0x01))
 
         # AIRDUCT
+        chamber_temp_target = climate.chamber_temp_target
+        base_chamber_temp_target = chamber_temp_target
         if airduct_root:
-            updates["climate"].airduct_mode = int(
-                airduct_root.get("modeCur", base.climate.airduct_mode)
+            update_climate(
+                "airduct_mode", int(airduct_root.get("modeCur", climate.airduct_mode))
             )
-            updates["climate"].airduct_sub_mode = int(
-                airduct_root.get("subMode", base.climate.airduct_sub_mode)
+            update_climate(
+                "airduct_sub_mode",
+                int(airduct_root.get("subMode", climate.airduct_sub_mode)),
             )
 
-            if updates["climate"].airduct_mode == 1:
-                updates["climate"].air_conditioning_mode = AirConditioningMode.HEAT_MODE
-            elif updates["climate"].airduct_mode == 0:
-                updates["climate"].air_conditioning_mode = AirConditioningMode.COOL_MODE
-                base.climate.chamber_temp_target = 0
+            if climate.airduct_mode == 1:
+                update_climate("air_conditioning_mode", AirConditioningMode.HEAT_MODE)
+            elif climate.airduct_mode == 0:
+                update_climate("air_conditioning_mode", AirConditioningMode.COOL_MODE)
+                base_chamber_temp_target = 0
             else:
-                updates[
-                    "climate"
-                ].air_conditioning_mode = AirConditioningMode.NOT_SUPPORTED
+                update_climate("air_conditioning_mode", AirConditioningMode.NOT_SUPPORTED)
 
             parts = {part["id"]: part["state"] for part in airduct_root.get("parts", [])}
 
-            updates["climate"].zone_part_fan_percent = parts.get(
-                16, base.climate.zone_part_fan_percent
-            )
-            updates["climate"].zone_aux_percent = parts.get(
-                32, base.climate.zone_aux_percent
+            update_climate(
+                "zone_part_fan_percent", parts.get(16, climate.zone_part_fan_percent)
             )
-            updates["climate"].zone_exhaust_percent = parts.get(
-                48, base.climate.zone_exhaust_percent
+            update_climate("zone_aux_percent", parts.get(32, climate.zone_aux_percent))
+            update_climate(
+                "zone_exhaust_percent", parts.get(48, climate.zone_exhaust_percent)
             )
 
             zone_intake_open = parts.get(96, -1)
-            updates["climate"].zone_intake_open = zone_intake_open not in (-1, 0)
+            update_climate("zone_intake_open", zone_intake_open not in (-1, 0))
 
-            updates["climate"].zone_top_vent_open = bool(
-                updates["climate"].zone_exhaust_percent > 0
-                and not updates["climate"].zone_intake_open
+            update_climate(
+                "zone_top_vent_open",
+                bool(climate.zone_exhaust_percent > 0 and not climate.zone_intake_open),
             )
 
         # THERMALS & CTC DECODING
-        updates["climate"].bed_temp = float(p.get("bed_temper", base.climate.bed_temp))
-        updates["climate"].bed_temp_target = int(
-            p.get("bed_target_temper", base.climate.bed_temp_target)
+        update_climate("bed_temp", float(p.get("bed_temper", climate.bed_temp)))
+        update_climate(
+            "bed_temp_target", int(p.get("bed_target_temper", climate.bed_temp_target))
         )
 
         ctc_temp_target = 0
@@ -422,26 +467,29 @@ class BambuState:
             ctc_temp_raw = unpackTemperature(ctc_root.get("info", {}).get("temp", 0.0))
             ctc_temp = ctc_temp_raw[0]
             ctc_temp_target = int(ctc_temp_raw[1])
-            updates["climate"].chamber_temp = ctc_temp
-            updates["climate"].chamber_temp_target = ctc_temp_target
+            update_climate("chamber_temp", ctc_temp)
+            chamber_temp_target = ctc_temp_target
         elif not config.external_chamber:
-            chamber_temp = int(p.get("chamber_temper", base.climate.chamber_temp))
+            chamber_temp = int(p.get("chamber_temper", climate.chamber_temp))
             if chamber_temp != 5:
-                updates["climate"].chamber_temp = chamber_temp
+                update_climate("chamber_temp", chamber_temp)
 
         if (
             ctc_temp_target == 0
-            and updates["climate"].air_conditioning_mode != AirConditioningMode.HEAT_MODE
+            and climate.air_conditioning_mode != AirConditioningMode.HEAT_MODE
         ):
-            updates["climate"].chamber_temp_target = base.climate.chamber_temp_target
+            chamber_temp_target = base_chamber_temp_target
 
         if p.get("command", "") == "set_ctt" and p.get("result", "") == "success":
-            ctc_temp_target = int(p.get("ctt_val", -1))
-            updates["climate"].chamber_temp_target = ctc_temp_target
-            if ctc_temp_target < 45:
-                updates["climate"].air_conditioning_mode = AirConditioningMode.COOL_MODE
+            chamber_temp_target = int(p.get("ctt_val", -1))
+            if chamber_temp_target < 45:
+                update_climate("air_conditioning_mode", AirConditioningMode.COOL_MODE)
+
+        update_climate("chamber_temp_target", chamber_temp_target)
 
         # EXTRUDERS
+        # freshly parsed extruders are merged into `self.extruders` once the AMS units
+        # below have had a chance to assign themselves to them
         new_extruders = []
         if "info" in extruder_root:
             nozzle_by_id: dict[int, dict[str, Any]] = {}
@@ -498,8 +546,8 @@ class BambuState:
                 ext.active_tray_id = parseExtruderTrayState(ext.id, hn, sn)
                 ext.target_tray_id = parseExtruderTrayState(ext.id, ht, st)
 
-                if base.extruders and len(base.extruders) > ext.id:
-                    base_tray_state = base.extruders[ext.id].tray_state
+                if self.extruders and len(self.extruders) > ext.id:
+                    base_tray_state = self.extruders[ext.id].tray_state
                 else:
                     base_tray_state = (
                         TrayState.LOADED
@@ -526,20 +574,20 @@ class BambuState:
                 elif ext.status is not ExtruderStatus.IDLE:
                     ext.tray_state = TrayState.LOADING
                 else:
-                    ext.tray_state = base.active_tray_state
+                    ext.tray_state = self.active_tray_state
 
                 new_extruders.append(ext)
         else:
-            ext = base.extruders[0] if base.extruders else ExtruderState()
+            ext = replace(self.extruders[0]) if self.extruders else ExtruderState()
             ext.id = ActiveTool.SINGLE_EXTRUDER
-            ext.temp = float(p.get("nozzle_temper", base.active_nozzle_temp))
+            ext.temp = float(p.get("nozzle_temper", self.active_nozzle_temp))
             ext.temp_target = int(
-                p.get("nozzle_target_temper", base.active_nozzle_temp_target)
+                p.get("nozzle_target_temper", self.active_nozzle_temp_target)
             )
             ext.state = ExtruderInfoState.NOT_AVAILABLE
             ext.status = ExtruderStatus.NOT_AVAILABLE
-            ext.active_tray_id = base.active_tray_id
-            ext.target_tray_id = base.target_tray_id
+            ext.active_tray_id = self.active_tray_id
+            ext.target_tray_id = self.target_tray_id
             if "tray_now" in ams_root:
                 raw = int(ams_root["tray_now"])
                 ext.active_tray_id = -1 if raw == 255 else raw
@@ -570,69 +618,86 @@ class BambuState:
             )
             new_extruders.append(ext)
 
-        updates["extruders"] = new_extruders if new_extruders else base.extruders
+        extruders = new_extruders if new_extruders else self.extruders
 
         # TOOL SELECTION
         if "state" in extruder_root:
             raw_t_idx = (int(extruder_root["state"]) >> 4) & 0xF
-            if new_caps.has_dual_extruder:
-                updates["active_tool"] = ActiveTool(raw_t_idx)
+            if caps.has_dual_extruder:
+                update("active_tool", ActiveTool(raw_t_idx))
             else:
-                updates["active_tool"] = ActiveTool.SINGLE_EXTRUDER
-        else:
-            updates["active_tool"] = base.active_tool
+                update("active_tool", ActiveTool.SINGLE_EXTRUDER)
 
         # AMS UNITS
-        cur_ams = {u.ams_id: u for u in base.ams_units}
-
         for m in modules:
             if (
                 m.get("name", "").startswith("n3f/")
                 or m.get("name", "").startswith("n3s/")
                 or m.get("name", "").startswith("ams")
             ):
-                ams_id = int(m["name"].split("/")[-1])
-                u = cur_ams.get(ams_id, AMSUnitState(ams_id=ams_id))
-                u.chip_id = m.get("sn", u.chip_id)
-                u.model = getAMSModelBySerial(u.chip_id)
-                cur_ams[ams_id] = u
+                u, path = self._get_ams_unit(int(m["name"].split("/")[-1]), changed)
+                set_if_changed(u, "chip_id", m.get("sn", u.chip_id), changed, path)
+                set_if_changed(u, "model", getAMSModelBySerial(u.chip_id), changed, path)
 
         for ams_u in ams_root.get("ams", []):
             id = int(ams_u.get("id", 0))
-            u = cur_ams.get(id, AMSUnitState(ams_id=id))
-            u.temp_actual = float(ams_u.get("temp", u.temp_actual))
+            u, path = self._get_ams_unit(id, changed)
+            set_if_changed(
+                u, "temp_actual", float(ams_u.get("temp", u.temp_actual)), changed, path
+            )
             _hIdx = int(float(ams_u.get("humidity", 0)))
             if 1 <= _hIdx <= 5:
-                u.humidity_index = _hIdx
+                set_if_changed(u, "humidity_index", _hIdx, changed, path)
             _hRaw = int(float(ams_u.get("humidity_raw", 0)))
             if 1 <= _hRaw <= 100:
-                u.humidity_raw = _hRaw
-            u.dry_time = int(float(ams_u.get("dry_time", u.dry_time)))
+                set_if_changed(u, "humidity_raw", _hRaw, changed, path)
+            set_if_changed(
+                u,
+                "dry_time",
+                int(float(ams_u.get("dry_time", u.dry_time))),
+                changed,
+                path,
+            )
 
             # ugly hack for capturing target temp
             if u.dry_time > 0 and u.temp_target < int(u.temp_actual) - 1:
-                u.temp_target = int(u.temp_actual)
+                set_if_changed(u, "temp_target", int(u.temp_actual), changed, path)
             elif u.dry_time == 0:
-                u.temp_target = 0
+                set_if_changed(u, "temp_target", 0, changed, path)
 
             if "info" in ams_u:
-                u.ams_info = int(ams_u["info"], 16)
+                set_if_changed(u, "ams_info", int(ams_u["info"], 16), changed, path)
                 p_ams = parseAMSInfo(ams_u["info"])
 
-                u.heater_state = p_ams["heater_state"]
-                u.dry_fan1_status = p_ams["dry_fan1_status"]
-                u.dry_fan2_status = p_ams["dry_fan2_status"]
-                u.dry_sub_status = p_ams["dry_sub_status"]
+                for key in (
+                    "heater_state",
+                    "dry_fan1_status",
+                    "dry_fan2_status",
+                    "dry_sub_status",
+                ):
+                    set_if_changed(u, key, p_ams[key], changed, path)
 
                 # Update AMS model from parsed info if not already set
                 if u.model == AMSModel.UNKNOWN:
-                    u.model = p_ams["ams_type"]
-
-                if new_caps.has_dual_extruder:
-                    u.assigned_to_extruder = ActiveTool(p_ams.get("extruder_id", 15))
-                    updates["extruders"][
-                        u.assigned_to_extruder.value
-                    ].assigned_to_ams_id = u.ams_id
+                    set_if_changed(u, "model", p_ams["ams_type"], changed, path)
+
+                if caps.has_dual_extruder:
+                    set_if_changed(
+                        u,
+                        "assigned_to_extruder",
+                        ActiveTool(p_ams.get("extruder_id", 15)),
+                        changed,
+                        path,
+                    )
+                    idx = u.assigned_to_extruder.value
+                    # freshly parsed extruders are reported when merged below
+                    set_if_changed(
+                        extruders[idx],
+                        "assigned_to_ams_id",
+                        u.ams_id,
+                        changed if extruders is self.extruders else None,
+                        f"extruders[{idx}].",
+                    )
 
                 rb = ams_root.get("tray_exist_bits")
                 if rb is not None:
@@ -644,146 +709,170 @@ class BambuState:
                     if id >= 128:
                         shift = 16 + (4 * (id - 128))
                         # AMS-HT has 4 slots like standard AMS
-                        u.tray_exists = [bool((eb >> shift) & (1 << j)) for j in range(4)]
+                        tray_exists = [bool((eb >> shift) & (1 << j)) for j in range(4)]
                     else:
                         shift = 4 * id
                         # Standard AMS is a 4-slot unit, so we check range(4)
-                        u.tray_exists = [bool((eb >> shift) & (1 << j)) for j in range(4)]
+                        tray_exists = [bool((eb >> shift) & (1 << j)) for j in range(4)]
+                    set_if_changed(u, "tray_exists", tray_exists, changed, path)
 
-            cur_ams[id] = u
-
-        updates["ams_units"] = list(cur_ams.values())
+        if new_extruders:
+            self._merge_list("extruders", new_extruders, changed)
 
         # ACTIVE / TARGET TRAYS AND TOOL TEMP
         # if multi-extruder return the active one
         a_ext = next(
-            (e for e in updates["extruders"] if e.id == updates["active_tool"].value),
+            (e for e in self.extruders if e.id == self.active_tool.value),
             None,
         )
         if a_ext:
             if a_ext.active_tray_id not in (254, 255, -1):
-                updates["active_ams_id"] = (
+                update(
+                    "active_ams_id",
                     a_ext.assigned_to_ams_id
                     if a_ext.assigned_to_ams_id != -1
-                    else a_ext.active_tray_id >> 2
+                    else a_ext.active_tray_id >> 2,
                 )
             else:
-                updates["active_ams_id"] = -1
-            updates["active_tray_id"] = a_ext.active_tray_id
-            updates["target_tray_id"] = a_ext.target_tray_id
+                update("active_ams_id", -1)
+            update("active_tray_id", a_ext.active_tray_id)
+            update("target_tray_id", a_ext.target_tray_id)
 
-            updates["active_tray_state"] = a_ext.tray_state
+            update("active_tray_state", a_ext.tray_state)
 
-            updates["active_nozzle_temp"] = a_ext.temp
-            updates["active_nozzle_temp_target"] = a_ext.temp_target
-            updates["active_nozzle"] = a_ext.nozzle
+            update("active_nozzle_temp", a_ext.temp)
+            update("active_nozzle_temp_target", a_ext.temp_target)
+            update("active_nozzle", a_ext.nozzle)
         else:
             # otherwise process a single extruder printer update
-            updates["active_nozzle_temp"] = float(
-                p.get("nozzle_temper", base.active_nozzle_temp)
+            update(
+                "active_nozzle_temp",
+                float(p.get("nozzle_temper", self.active_nozzle_temp)),
             )
-            updates["active_nozzle_temp_target"] = int(
-                p.get("nozzle_target_temper", base.active_nozzle_temp_target)
+            update(
+                "active_nozzle_temp_target",
+                int(p.get("nozzle_target_temper", self.active_nozzle_temp_target)),
             )
-            updates["active_nozzle"] = (
-                updates["extruders"][0].nozzle
-                if updates.get("extruders")
-                else base.active_nozzle
+            update(
+                "active_nozzle",
+                self.extruders[0].nozzle if self.extruders else self.active_nozzle,
             )
-            updates["active_tray_id"] = int(ams_root.get("tray_now", base.active_tray_id))
-            if updates["active_tray_id"] == 255:
-                updates["active_tray_id"] = -1
-                updates["active_tray_state"] = TrayState.UNLOADED
+            active_tray_id = int(ams_root.get("tray_now", self.active_tray_id))
+            if active_tray_id == 255:
+                active_tray_id = -1
+                update("active_tray_state", TrayState.UNLOADED)
             elif aji.stage_id == 24:
-                updates["active_tray_state"] = TrayState.LOADING
+                update("active_tray_state", TrayState.LOADING)
             elif aji.stage_id == 22:
-                updates["active_tray_state"] = TrayState.UNLOADING
+                update("active_tray_state", TrayState.UNLOADING)
             else:
-                updates["active_tray_state"] = TrayState.LOADED
+                update("active_tray_state", TrayState.LOADED)
+            update("active_tray_id", active_tray_id)
 
-            updates["active_ams_id"] = (
-                updates["active_tray_id"] >> 2
-                if updates["active_tray_id"] not in (254, 255)
-                else base.active_ams_id
-            )
+            if active_tray_id not in (254, 255):
+                update("active_ams_id", active_tray_id >> 2)
 
-        if "active_tray_id" in updates:
-            updates["is_external_spool_active"] = updates["active_tray_id"] in [254, 255]
-        else:
-            updates["is_external_spool_active"] = False
-
-        if "active_tray_state" in updates:
-            updates["active_tray_state_name"] = updates["active_tray_state"].name
+        update("is_external_spool_active", self.active_tray_id in (254, 255))
+        update("active_tray_state_name", self.active_tray_state.name)
 
         # GLOBAL METADATA & FANS
-        raw_exist = ams_root.get("ams_exist_bits", base.ams_exist_bits)
-        updates["ams_exist_bits"] = (
-            int(raw_exist, 16) if isinstance(raw_exist, str) else int(raw_exist)
+        raw_exist = ams_root.get("ams_exist_bits", self.ams_exist_bits)
+        update(
+            "ams_exist_bits",
+            int(raw_exist, 16) if isinstance(raw_exist, str) else int(raw_exist),
         )
-        updates["ams_connected_count"] = bin(updates["ams_exist_bits"]).count("1")
-        updates["ams_status_raw"] = int(p.get("ams_status", base.ams_status_raw))
-        updates["ams_status_text"] = parseAMSStatus(updates["ams_status_raw"])
+        update("ams_connected_count", bin(self.ams_exist_bits).count("1"))
+        update("ams_status_raw", int(p.get("ams_status", self.ams_status_raw)))
+        update("ams_status_text", parseAMSStatus(self.ams_status_raw))
 
         part_cooling_fan_speed_percent = -1
 
-        if not config.capabilities.has_chamber_temp:
+        if not had_chamber_temp:
             part_cooling_fan_speed_percent = (
                 scaleFanSpeed(p.get("cooling_fan_speed"))
                 if p.get("cooling_fan_speed", -1) != -1
                 else -1
             )
         else:
-            part_cooling_fan_speed_percent = updates["climate"].zone_part_fan_percent
-
-        if part_cooling_fan_speed_percent == -1:
-            part_cooling_fan_speed_percent = base.climate.part_cooling_fan_speed_percent
+            part_cooling_fan_speed_percent = climate.zone_part_fan_percent
 
-        updates["climate"].part_cooling_fan_speed_percent = part_cooling_fan_speed_percent
-        updates["climate"].part_cooling_fan_speed_target_percent = updates[
-            "climate"
-        ].part_cooling_fan_speed_percent
+        if part_cooling_fan_speed_percent != -1:
+            update_climate(
+                "part_cooling_fan_speed_percent", part_cooling_fan_speed_percent
+            )
+        update_climate(
+            "part_cooling_fan_speed_target_percent",
+            climate.part_cooling_fan_speed_percent,
+        )
 
         heatbreak_fan_speed_percent = scaleFanSpeed(p.get("heatbreak_fan_speed", -1))
-        if heatbreak_fan_speed_percent == -1:
-            heatbreak_fan_speed_percent = base.climate.heatbreak_fan_speed_percent
-        updates["climate"].heatbreak_fan_speed_percent = heatbreak_fan_speed_percent
+        if heatbreak_fan_speed_percent != -1:
+            update_climate("heatbreak_fan_speed_percent", heatbreak_fan_speed_percent)
 
         exhaust_fan_speed_percent = -1
-        if not config.capabilities.has_chamber_temp:
+        if not had_chamber_temp:
             exhaust_fan_speed_percent = scaleFanSpeed(p.get("big_fan2_speed", -1))
         else:
-            exhaust_fan_speed_percent = updates["climate"].zone_exhaust_percent
+            exhaust_fan_speed_percent = climate.zone_exhaust_percent
 
-        if exhaust_fan_speed_percent == -1:
-            exhaust_fan_speed_percent = base.climate.exhaust_fan_speed_percent
-        updates["climate"].exhaust_fan_speed_percent = exhaust_fan_speed_percent
+        if exhaust_fan_speed_percent != -1:
+            update_climate("exhaust_fan_speed_percent", exhaust_fan_speed_percent)
 
         aux_fan_speed_percent = -1
-        if not config.capabilities.has_chamber_temp:
+        if not had_chamber_temp:
             aux_fan_speed_percent = scaleFanSpeed(p.get("big_fan1_speed", -1))
         else:
-            aux_fan_speed_percent = updates["climate"].zone_aux_percent
+            aux_fan_speed_percent = climate.zone_aux_percent
 
-        if aux_fan_speed_percent == -1:
-            aux_fan_speed_percent = base.climate.aux_fan_speed_percent
-        updates["climate"].aux_fan_speed_percent = aux_fan_speed_percent
+        if aux_fan_speed_percent != -1:
+            update_climate("aux_fan_speed_percent", aux_fan_speed_percent)
 
-        updates["wifi_signal_strength"] = p.get("wifi_signal", base.wifi_signal_strength)
+        update("wifi_signal_strength", p.get("wifi_signal", self.wifi_signal_strength))
 
         # ERROR HANDLING
-        updates["print_error"] = int(p.get("print_error", base.print_error))
+        update("print_error", int(p.get("print_error", self.print_error)))
 
-        if updates["print_error"] != 0:
-            decoded_error = decodeError(updates["print_error"])
+        if self.print_error != 0:
+            decoded_error = decodeError(self.print_error)
+            hms_errors = decodeHMS(p.get("hms", self.hms_errors))
         else:
             decoded_error = {}
-            base.hms_errors = []
+            hms_errors = decodeHMS(p.get("hms", []))
 
-        updates["hms_errors"] = decodeHMS(p.get("hms", base.hms_errors))
-        if decoded_error and decoded_error not in updates["hms_errors"]:
-            updates["hms_errors"].insert(0, decoded_error)
+        if decoded_error and decoded_error not in hms_errors:
+            hms_errors.insert(0, decoded_error)
+        update("hms_errors", hms_errors)
 
-        # capabilities mapped to BambuConfig
-        config.capabilities = new_caps
+        return changed
 
-        return replace(base, **updates)
+    def _get_ams_unit(self, ams_id: int, changed: set[str]) -> tuple[AMSUnitState, str]:
+        """
+        Returns the `AMSUnitState` for `ams_id` (appending a new unit when it is not yet
+        known) together with its field path prefix.
+        """
+        for idx, unit in enumerate(self.ams_units):
+            if unit.ams_id == ams_id:
+                return unit, f"ams_units[{idx}]."
+        idx = len(self.ams_units)
+        unit = AMSUnitState(ams_id=ams_id)
+        self.ams_units.append(unit)
+        changed.add(f"ams_units[{idx}]")
+        return unit, f"ams_units[{idx}]."
+
+    def _merge_list(self, name: str, items: list, changed: set[str]):
+        """
+        Merges freshly parsed dataclass `items` into the list attribute `name` field by
+        field, appending or truncating elements so both lists end up the same length.
+        """
+        target = getattr(self, name)
+        for idx, item in enumerate(items):
+            if idx < len(target):
+                path = f"{name}[{idx}]."
+                for attr, value in vars(item).items():
+                    set_if_changed(target[idx], attr, value, changed, path)
+            else:
+                target.append(item)
+                changed.add(f"{name}[{idx}]")
+        if len(target) > len(items):
+            del target[len(items) :]
+            changed.add(name)
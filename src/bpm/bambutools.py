@@ -6,11 +6,12 @@ import hashlib
 import json
 import logging
 from enum import Enum, IntEnum
+from functools import lru_cache
 from pathlib import Path
 from threading import Thread
 from typing import Any
 
-from bpm.bambucommands import HMS_STATUS
+from bpm.bambucommands import get_hms_status
 
 """
 `bambutools' hosts various classes and methods used internally and externally
@@ -462,13 +463,64 @@ class TrayState(IntEnum):
     UNLOADING = 3
 
 
-def decodeError(error: int) -> dict:
+class UpdateDispatchMode(Enum):
+    """
+    Controls how `BambuPrinter` delivers `on_update` callbacks.
+
+    * `SYNCHRONOUS (0)`: `on_update` runs on the `mqtt` network thread for every update.
+    * `COALESCED (1)`: Updates are coalesced and `on_update` runs on a dispatcher thread,
+        at most `BambuConfig.update_max_rate` times per second, always with the latest state.
+    """
+
+    SYNCHRONOUS = 0
+    COALESCED = 1
+
+
+@lru_cache(maxsize=None)
+def _hms_index(kind: str, lang: str) -> dict[str, dict]:
+    index: dict[str, dict] = {}
+    for entry in get_hms_status().get("data", {}).get(kind, {}).get(lang, []):
+        ecode = str(entry.get("ecode", "")).upper()
+        # first entry wins, matching the behavior of a linear scan
+        if ecode and ecode not in index:
+            index[ecode] = entry
+    return index
+
+
+def lookupHMSEntry(ecode: str, kind: str = "device_hms", lang: str = "en") -> dict | None:
+    """
+    Returns the `HMS_STATUS` entry for `ecode` (case-insensitive) or `None`.
+
+    The ecode → entry index for each `kind` (`device_hms` / `device_error`) and
+    language is built once on first use, so lookups are O(1).  Languages missing
+    from `HMS_STATUS` fall back to `en`.
+    """
+    index = _hms_index(kind, lang)
+    if not index and lang != "en":
+        index = _hms_index(kind, "en")
+    return index.get(ecode.upper())
+
+
+# Decoded HMS / print_error results are memoized by their raw integer codes.  The same
+# handful of codes is reported on every push_status for as long as a condition persists,
+# so steady-state decoding is a cache hit plus a shallow copy of the result.
+HMS_DECODE_CACHE_SIZE = 256
+
+
+def decodeError(error: int, lang: str = "en") -> dict:
     """
     Decodes a raw print_error integer into a full HMS dictionary.
+
+    Results are memoized (bounded LRU keyed by `error`); each call returns a fresh
+    shallow copy so callers may safely modify it.
     """
     if error == 0:
         return {}
+    return dict(_decodeErrorCode(error, lang))
 
+
+@lru_cache(maxsize=HMS_DECODE_CACHE_SIZE)
+def _decodeErrorCode(error: int, lang: str) -> dict:
     raw_hex = f"{error:08X}".upper()
     wiki_slug = "-".join(raw_hex[i : i + 4] for i in range(0, 8, 4))
     res = {
@@ -492,20 +544,17 @@ def decodeError(error: int) -> dict:
     }
     res["module"] = module_map.get(real_module, "System")
 
-    msg_list = HMS_STATUS.get("data", {}).get("device_error", {}).get("en", [])
     modules = ["03", "05", "07", "0B", "0C", "10", "12"]
     if raw_hex[:2] in modules:
         modules.remove(raw_hex[:2])
     modules.insert(0, raw_hex[:2])
 
     for module in modules:
-        current_hex = f"{module}{raw_hex[2:]}"
-        for entry in msg_list:
-            if entry.get("ecode", "").upper() == current_hex.upper():
-                res["msg"] = entry.get("intro", res["msg"])
+        entry = lookupHMSEntry(f"{module}{raw_hex[2:]}", "device_error", lang)
+        if entry is not None:
+            res["msg"] = entry.get("intro", res["msg"])
+            if res["msg"] != "Unknown HMS Error":
                 break
-        if res["msg"] != "Unknown HMS Error":
-            break
 
     mask = (error >> 16) & 0xFF
     if mask in (0x00, 0x01):
@@ -521,9 +570,12 @@ def decodeError(error: int) -> dict:
     return res
 
 
-def decodeHMS(hms_list: list) -> list[dict]:
+def decodeHMS(hms_list: list, lang: str = "en") -> list[dict]:
     """
     Decodes the raw HMS list from telemetry into a structured list of dictionaries.
+
+    Each `(attr, code)` pair is decoded once and memoized (bounded LRU); the returned
+    dictionaries are fresh shallow copies of the memoized results.
     """
     decoded_errors = []
     for item in hms_list:
@@ -537,48 +589,50 @@ def decodeHMS(hms_list: list) -> list[dict]:
             continue
         if attr == 0:
             continue
+        decoded_errors.append(dict(_decodeHMSCode(attr, code, lang)))
+    return decoded_errors
 
-        ecode = f"{attr:08X}{code:08X}"
-        wiki_slug = "-".join(ecode[i : i + 4] for i in range(0, 16, 4))
-        res = {
-            "code": f"HMS_{wiki_slug}",
-            "msg": "Unknown HMS Error",
-            "module": "System",
-            "severity": "Error",
-            "is_critical": False,
-            "type": "device_hms",
-            "url": f"https://e.bambulab.com/?e={ecode}",
-        }
-
-        mid = (attr >> 24) & 0xFF
-        mask = (attr >> 16) & 0xFF
-        module_map = {
-            0x03: "Mainboard",
-            0x05: "AMS",
-            0x12: "AMS",
-            0x07: "Toolhead",
-            0x0B: "Webcam",
-            0x10: "HMS",
-        }
-        res["module"] = module_map.get(mid, "System")
-
-        msg_list = HMS_STATUS.get("data", {}).get("device_hms", {}).get("en", [])
-        for entry in msg_list:
-            if entry.get("ecode", "").upper() == ecode:
-                res["msg"] = entry.get("intro", res["msg"])
-                break
 
-        if mask in (0x00, 0x01):
-            res["severity"], res["is_critical"] = (
-                ("Fatal" if mask == 0x00 else "Error"),
-                True,
-            )
-        elif mask == 0x02:
-            res["severity"] = "Warning"
-        else:
-            res["severity"] = "Info"
-        decoded_errors.append(res)
-    return decoded_errors
+@lru_cache(maxsize=HMS_DECODE_CACHE_SIZE)
+def _decodeHMSCode(attr: int, code: int, lang: str) -> dict:
+    ecode = f"{attr:08X}{code:08X}"
+    wiki_slug = "-".join(ecode[i : i + 4] for i in range(0, 16, 4))
+    res = {
+        "code": f"HMS_{wiki_slug}",
+        "msg": "Unknown HMS Error",
+        "module": "System",
+        "severity": "Error",
+        "is_critical": False,
+        "type": "device_hms",
+        "url": f"https://e.bambulab.com/?e={ecode}",
+    }
+
+    mid = (attr >> 24) & 0xFF
+    mask = (attr >> 16) & 0xFF
+    module_map = {
+        0x03: "Mainboard",
+        0x05: "AMS",
+        0x12: "AMS",
+        0x07: "Toolhead",
+        0x0B: "Webcam",
+        0x10: "HMS",
+    }
+    res["module"] = module_map.get(mid, "System")
+
+    entry = lookupHMSEntry(ecode, "device_hms", lang)
+    if entry is not None:
+        res["msg"] = entry.get("intro", res["msg"])
+
+    if mask in (0x00, 0x01):
+        res["severity"], res["is_critical"] = (
+            ("Fatal" if mask == 0x00 else "Error"),
+            True,
+        )
+    elif mask == 0x02:
+        res["severity"] = "Warning"
+    else:
+        res["severity"] = "Info"
+    return res
 
 
 def getAMSHeatingState(ams_info: int) -> AMSHeatingState:
@@ -933,6 +987,37 @@ def jsonSerializer(obj: Any) -> Any:
         return ""
 
 
+def set_if_changed(
+    obj: Any,
+    name: str,
+    value: Any,
+    changed: set[str] | None = None,
+    path: str = "",
+) -> bool:
+    """
+    Assign ``obj.<name> = value`` only when the value actually differs.
+
+    Used by the incremental state engine so that untouched attributes are never
+    rewritten and every real change can be reported to callers.
+
+    Args:
+        obj:     The object (typically a dataclass instance) to update.
+        name:    Attribute name.
+        value:   The new value.
+        changed: Optional set receiving ``path + name`` when the attribute changed.
+        path:    Dotted prefix for the reported field path (e.g. ``"climate."``).
+
+    Returns:
+        ``True`` if the attribute was updated.
+    """
+    if getattr(obj, name) == value:
+        return False
+    setattr(obj, name, value)
+    if changed is not None:
+        changed.add(f"{path}{name}")
+    return True
+
+
 # ---------------------------------------------------------------------------
 # Disk-persistence framework
 # ---------------------------------------------------------------------------
@@ -0,0 +1,382 @@
+"""
+`bambuworkers` hosts the background worker primitives `BambuPrinter` uses to keep slow
+work off the `mqtt` network thread.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any
+
+from bpm.bambutools import LoggerName
+
+logger = logging.getLogger(LoggerName)
+
+
+class BambuJobExecutor:
+    """
+    A small, bounded background executor for slow printer I/O (FTPS downloads,
+    SD card listings, `3mf` parsing).
+
+    Every job is submitted with a `key`.  While a job with the same key is queued or
+    running, further submissions return the in-flight `Future` instead of scheduling
+    duplicate work.  Once `max_pending` jobs are in flight new submissions are
+    rejected (`submit` returns `None`) so a burst of telemetry can never queue an
+    unbounded amount of FTPS traffic.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_pending: int = 8,
+        name: str = "bambuprinter-jobs",
+    ):
+        """
+        Parameters
+        ----------
+        * max_workers : int = 1 - Number of worker threads (created lazily on first submit).
+        * max_pending : int = 8 - Maximum number of queued + running jobs.
+        * name : str = "bambuprinter-jobs" - Thread name prefix for the workers.
+        """
+        self._max_workers = max(1, max_workers)
+        self._max_pending = max(1, max_pending)
+        self._name = name
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: dict[Hashable, Future] = {}
+
+    def submit(
+        self,
+        key: Hashable,
+        fn: Callable[..., Any],
+        *args,
+        on_complete: Callable[[Any], None] | None = None,
+        **kwargs,
+    ) -> Future | None:
+        """
+        Schedule `fn(*args, **kwargs)` unless a job with the same `key` is already in flight.
+
+        Parameters
+        ----------
+        * key : Hashable - De-duplication key for the job.
+        * fn : Callable - The work to perform on a worker thread.
+        * on_complete : Optional[Callable] - Invoked on the worker thread with the
+            job's return value when it completes successfully.  Failures are logged
+            and `on_complete` is not called.
+
+        Returns
+        -------
+        The `Future` for the (new or already in-flight) job, or `None` if the executor
+        is saturated.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                logger.debug(f"{self._name} - job [{key}] already in flight")
+                return future
+            if len(self._inflight) >= self._max_pending:
+                logger.warning(
+                    f"{self._name} - rejecting job [{key}], [{len(self._inflight)}] jobs pending"
+                )
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix=self._name
+                )
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._inflight[key] = future
+
+        future.add_done_callback(lambda f: self._on_done(key, f, on_complete))
+        return future
+
+    def _on_done(
+        self,
+        key: Hashable,
+        future: Future,
+        on_complete: Callable[[Any], None] | None,
+    ):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        if future.cancelled():
+            return
+        e = future.exception()
+        if e is not None:
+            logger.warning(f"{self._name} - job [{key}] failed: {e}")
+            return
+        if on_complete:
+            try:
+                on_complete(future.result())
+            except Exception:
+                logger.exception(f"{self._name} - completion callback for [{key}] failed")
+
+    @property
+    def pending(self) -> int:
+        """The number of queued + running jobs."""
+        with self._lock:
+            return len(self._inflight)
+
+    def shutdown(self, wait: bool = False):
+        """
+        Cancels all queued jobs and releases the worker threads.  The executor can be
+        reused afterwards; new workers are created on the next `submit`.
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            self._inflight.clear()
+        if executor:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+@dataclass
+class UpdateDispatchMetrics:
+    """Counters describing a `BambuUpdateDispatcher`'s behaviour."""
+
+    queue_depth: int = 0
+    """Updates posted since the last delivery that are still waiting to be delivered."""
+    posted: int = 0
+    """Total updates posted."""
+    delivered: int = 0
+    """Total `on_update` invocations."""
+    dropped: int = 0
+    """Updates that were merged into a later delivery instead of being delivered individually."""
+    last_latency_ms: float = 0.0
+    """Time between the oldest coalesced update being posted and its delivery starting."""
+    max_latency_ms: float = 0.0
+    """Highest `last_latency_ms` observed."""
+    last_callback_ms: float = 0.0
+    """Duration of the most recent `on_update` invocation."""
+    max_callback_ms: float = 0.0
+    """Highest `last_callback_ms` observed."""
+
+
+class BambuUpdateDispatcher:
+    """
+    Delivers coalesced `on_update` notifications from a dedicated thread.
+
+    `post` never blocks the caller (the `mqtt` network thread).  Updates posted
+    while a delivery is pending are merged: their changed-field sets are unioned and
+    only one callback is made, at most `max_rate` times per second.  Since the
+    callback reads the printer directly it always observes the latest state.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[set[str]], None],
+        max_rate: float = 5.0,
+        name: str = "bambuprinter-updates",
+    ):
+        """
+        Parameters
+        ----------
+        * deliver : Callable - Invoked on the dispatcher thread with the merged set of
+            changed field paths.
+        * max_rate : float = 5.0 - Maximum deliveries per second (`0` disables the limit).
+        * name : str = "bambuprinter-updates" - Name of the dispatcher thread.
+        """
+        self._deliver = deliver
+        self.max_rate = max_rate
+        self._name = name
+        self._cv = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._pending: set[str] | None = None
+        self._pending_since = 0.0
+        self._last_delivery = 0.0
+        self._stopping = False
+        self._metrics = UpdateDispatchMetrics()
+
+    def post(self, changed: set[str] | None = None):
+        """
+        Queues an update for delivery, merging it with any update still pending.
+
+        Parameters
+        ----------
+        * changed : Optional[set[str]] - Field paths changed by this update.
+        """
+        with self._cv:
+            self._metrics.posted += 1
+            if self._pending is None:
+                self._pending = set()
+                self._pending_since = time.monotonic()
+            else:
+                self._metrics.dropped += 1
+            if changed:
+                self._pending.update(changed)
+            self._metrics.queue_depth += 1
+
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            self._cv.notify()
+
+    @property
+    def metrics(self) -> UpdateDispatchMetrics:
+        """A snapshot of the dispatcher's metrics."""
+        with self._cv:
+            return replace(self._metrics)
+
+    def shutdown(self):
+        """
+        Delivers any pending update and stops the dispatcher thread.  A later `post`
+        starts a new thread.
+        """
+        with self._cv:
+            self._stopping = True
+            self._cv.notify()
+            thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while True:
+                    if self._pending is not None:
+                        if self._stopping or self.max_rate <= 0:
+                            break
+                        wait = (
+                            self._last_delivery + 1.0 / self.max_rate - time.monotonic()
+                        )
+                        if wait <= 0:
+                            break
+                        self._cv.wait(wait)
+                    elif self._stopping:
+                        self._thread = None
+                        return
+                    else:
+                        self._cv.wait()
+
+                changed = self._pending
+                self._pending = None
+                start = time.monotonic()
+                latency = (start - self._pending_since) * 1000.0
+                self._last_delivery = start
+                self._metrics.queue_depth = 0
+                self._metrics.last_latency_ms = latency
+                self._metrics.max_latency_ms = max(self._metrics.max_latency_ms, latency)
+
+            try:
+                self._deliver(changed)
+            except Exception:
+                logger.exception(f"{self._name} - update callback failed")
+
+            elapsed = (time.monotonic() - start) * 1000.0
+            with self._cv:
+                self._metrics.delivered += 1
+                self._metrics.last_callback_ms = elapsed
+                self._metrics.max_callback_ms = max(
+                    self._metrics.max_callback_ms, elapsed
+                )
+
+
+class ScheduledCall:
+    """A handle for a call scheduled on a `BambuScheduler`."""
+
+    def __init__(self, deadline: float, fn: Callable[..., Any], args: tuple):
+        self.deadline = deadline
+        """The `time.monotonic()` value at which the call becomes due."""
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Prevents the call from running if it has not started yet."""
+        self.cancelled = True
+
+
+class BambuScheduler:
+    """
+    A process-wide deadline scheduler.
+
+    Calls are kept in a heap ordered by deadline and a single thread sleeps until the
+    earliest one is due, so an idle process with any number of printers only wakes
+    up when a deadline can actually expire.  Cancelled calls are discarded lazily
+    when they reach the top of the heap.  Scheduled callables run on the scheduler
+    thread and must be short; hand slow work to a `BambuJobExecutor`.
+    """
+
+    _shared: "BambuScheduler | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, name: str = "bambuprinter-scheduler"):
+        """
+        Parameters
+        ----------
+        * name : str = "bambuprinter-scheduler" - Name of the scheduler thread.
+        """
+        self._name = name
+        self._cv = threading.Condition()
+        self._heap: list[tuple[float, int, ScheduledCall]] = []
+        self._seq = itertools.count()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def shared(cls) -> "BambuScheduler":
+        """The scheduler instance shared by every `BambuPrinter` in the process."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def call_at(self, deadline: float, fn: Callable[..., Any], *args) -> ScheduledCall:
+        """
+        Schedules `fn(*args)` to run once `time.monotonic()` reaches `deadline`.
+
+        Returns
+        -------
+        A `ScheduledCall` handle that can be used to cancel the call.
+        """
+        call = ScheduledCall(deadline, fn, args)
+        with self._cv:
+            heapq.heappush(self._heap, (deadline, next(self._seq), call))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            elif self._heap[0][2] is call:
+                # only wake the scheduler when its next deadline moved earlier
+                self._cv.notify()
+        return call
+
+    def call_later(self, delay: float, fn: Callable[..., Any], *args) -> ScheduledCall:
+        """Schedules `fn(*args)` to run `delay` seconds from now."""
+        return self.call_at(time.monotonic() + delay, fn, *args)
+
+    @property
+    def pending(self) -> int:
+        """The number of scheduled calls (including cancelled calls not yet discarded)."""
+        with self._cv:
+            return len(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cv.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        call = heapq.heappop(self._heap)[2]
+                        break
+                    self._cv.wait(delay)
+
+            if call.cancelled:
+                continue
+            try:
+                call.fn(*call.args)
+            except Exception:
+                logger.exception(f"{self._name} - scheduled call [{call.fn}] failed")
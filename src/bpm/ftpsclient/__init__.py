@@ -1 +1,6 @@
-from .ftpsclient import IoTFTPSClient
+from .ftpsclient import (
+    FtpListItem,
+    IoTFTPSClient,
+    TLSSessionStats,
+    tls_session_cache,
+)
@@ -30,16 +30,15 @@ import ftplib
 import io
 import logging
 import os
-import re
 import socket
 import ssl
+import threading
+import time
+from collections.abc import Iterator
 
 logger = logging.getLogger(__name__)
 
 
-FTP_LIST_PATTERN = re.compile(
-    r"(?P<directory>[d-])(?P<permissions>(?:[r-][w-][x-]){3})\s+\d+\s+(?P<owner>\w+)\s+(?P<group>\w+)\s+(?P<size>\d+)\s+(?:(?P<date>(?P<month>\w{3})\s+(?P<day>\d{2}))\s+(?:(?P<year>\d{4})|(?P<time>(?P<hour>\d{2}):(?P<minute>\d{2}))))\s+(?P<name>.*)"
-)
 MONTH_LOOKUP = {
     "Jan": 1,
     "Feb": 2,
@@ -56,24 +55,259 @@ MONTH_LOOKUP = {
 }
 
 
-@dataclasses.dataclass
+_UTC = datetime.timezone.utc
+_EPOCH = datetime.datetime.fromtimestamp(0, _UTC)
+
+
+@dataclasses.dataclass(slots=True)
 class FtpListItem:
+    """one entry of a directory listing
+
+    `timestamp` is utc and truncated to the minute whichever command produced it, as
+    `LIST` rows only carry minutes (or just the date, for older files), so an entry's
+    identity does not depend on the listing mode the server supports.
+    """
+
     path: str
     name: str
     size: int
     is_dir: bool
     timestamp: datetime.datetime
-    owner: str
-    group: str
-    permissions: str
+    owner: str = ""
+    group: str = ""
+    permissions: str = ""
+
+
+def parse_list_line(
+    row: str, prefix: str, today: datetime.datetime
+) -> FtpListItem | None:
+    """parse one unix style `LIST` row, returning None for rows that are not entries
+
+    `today` is the (utc) reference date for rows that carry a time instead of a year.
+    """
+    parts = row.split(None, 8)
+    if len(parts) != 9:
+        return None
+    mode, _, owner, group, size, month, day, clock, name = parts
+    if len(mode) != 10 or mode[0] not in "d-" or not size.isdigit():
+        return None
+    month_num = MONTH_LOOKUP.get(month)
+    if month_num is None:
+        # invalid month
+        return None
+
+    try:
+        if len(clock) == 5 and clock[2] == ":":  # "Nov 11 18:19"
+            date = datetime.datetime(
+                today.year,
+                month_num,
+                int(day),
+                hour=int(clock[:2]),
+                minute=int(clock[3:]),
+                tzinfo=_UTC,
+            )
+            if date > today:
+                date = date + datetime.timedelta(days=-365)
+        elif len(clock) == 4:  # "Nov 11 2025"
+            date = datetime.datetime(int(clock), month_num, int(day), tzinfo=_UTC)
+        else:
+            return None
+    except ValueError:
+        return None
+
+    return FtpListItem(
+        path=f"{prefix}/{name}",
+        name=name,
+        size=int(size),
+        is_dir=mode[0] == "d",
+        timestamp=date,
+        owner=owner,
+        group=group,
+        permissions=mode[1:],
+    )
+
+
+def parse_mlsd_line(row: str, prefix: str) -> FtpListItem | None:
+    """parse one `MLSD` row, returning None for `.` / `..` and unknown entry types"""
+    facts, sep, name = row.partition(" ")
+    if not sep or not name:
+        return None
+
+    kind = modify = mode = owner = group = ""
+    size = "0"
+    for fact in facts.split(";"):
+        key, _, value = fact.partition("=")
+        key = key.lower()
+        if key == "type":
+            kind = value.lower()
+        elif key == "size" or key == "sizd":
+            size = value
+        elif key == "modify":
+            modify = value
+        elif key == "unix.mode":
+            mode = value
+        elif key == "unix.owner" or (key == "unix.uid" and not owner):
+            owner = value
+        elif key == "unix.group" or (key == "unix.gid" and not group):
+            group = value
+    if kind != "file" and kind != "dir":
+        return None
+
+    try:
+        date = (
+            datetime.datetime(
+                int(modify[0:4]),
+                int(modify[4:6]),
+                int(modify[6:8]),
+                int(modify[8:10]),
+                int(modify[10:12]),
+                tzinfo=_UTC,
+            )
+            if len(modify) >= 14
+            else _EPOCH
+        )
+        size = int(size)
+    except ValueError:
+        return None
+
+    return FtpListItem(
+        path=f"{prefix}/{name}",
+        name=name,
+        size=size,
+        is_dir=kind == "dir",
+        timestamp=date,
+        owner=owner,
+        group=group,
+        permissions=_mode_to_permissions(mode) if mode else "",
+    )
+
+
+def _mode_to_permissions(mode: str) -> str:
+    try:
+        bits = int(mode, 8)
+    except ValueError:
+        return ""
+    return "".join(
+        flag if bits & (1 << (8 - i)) else "-" for i, flag in enumerate("rwxrwxrwx")
+    )
+
+
+@dataclasses.dataclass
+class TLSSessionStats:
+    """TLS handshake counters for FTPS connections"""
+
+    handshakes: int = 0
+    """Control connection handshakes performed."""
+    resumed: int = 0
+    """Control connection handshakes that resumed a cached session."""
+    handshake_ms: float = 0.0
+    """Total time spent in control connection handshakes."""
+    last_handshake_ms: float = 0.0
+    """Duration of the most recent control connection handshake."""
+    data_handshakes: int = 0
+    """Data connection handshakes performed."""
+    data_resumed: int = 0
+    """Data connection handshakes that resumed the control session."""
+
+    @property
+    def resumption_rate(self) -> float:
+        """Fraction of control connection handshakes that were resumed."""
+        return self.resumed / self.handshakes if self.handshakes else 0.0
+
+    @property
+    def average_handshake_ms(self) -> float:
+        """Mean control connection handshake time."""
+        return self.handshake_ms / self.handshakes if self.handshakes else 0.0
+
+
+class TLSSessionCache:
+    """
+    per (host, port) TLS session cache so new control connections can resume the
+    previous session instead of performing a full handshake
+
+    `ssl` only resumes a session on a socket created from the same `SSLContext` that
+    negotiated it, so the cache also hands out one shared context per endpoint.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._contexts: dict[tuple[str, int], ssl.SSLContext] = {}
+        self._sessions: dict[tuple[str, int], ssl.SSLSession] = {}
+        self._stats: dict[tuple[str, int], TLSSessionStats] = {}
+
+    def context(self, host: str, port: int, default: ssl.SSLContext) -> ssl.SSLContext:
+        """return the shared context for an endpoint, adopting `default` on first use"""
+        with self._lock:
+            return self._contexts.setdefault((host, port), default)
+
+    def session(self, host: str, port: int) -> ssl.SSLSession | None:
+        """return the most recent resumable session for an endpoint"""
+        with self._lock:
+            return self._sessions.get((host, port))
+
+    def store(self, host: str, port: int, session: ssl.SSLSession | None) -> None:
+        """remember a session for later resumption"""
+        if session is None:
+            return
+        with self._lock:
+            self._sessions[(host, port)] = session
+
+    def discard(self, host: str, port: int) -> None:
+        """forget the cached session for an endpoint"""
+        with self._lock:
+            self._sessions.pop((host, port), None)
+
+    def record(
+        self, host: str, port: int, elapsed_ms: float, resumed: bool, data: bool = False
+    ) -> None:
+        """record a completed handshake"""
+        with self._lock:
+            stats = self._stats.setdefault((host, port), TLSSessionStats())
+            if data:
+                stats.data_handshakes += 1
+                stats.data_resumed += int(resumed)
+                return
+            stats.handshakes += 1
+            stats.resumed += int(resumed)
+            stats.handshake_ms += elapsed_ms
+            stats.last_handshake_ms = elapsed_ms
+
+    def stats(self, host: str | None = None, port: int | None = None) -> TLSSessionStats:
+        """return handshake stats for one endpoint, or totals across all endpoints"""
+        with self._lock:
+            if host is not None:
+                return dataclasses.replace(
+                    self._stats.get((host, port), TLSSessionStats())
+                )
+            total = TLSSessionStats()
+            for stats in self._stats.values():
+                total.handshakes += stats.handshakes
+                total.resumed += stats.resumed
+                total.handshake_ms += stats.handshake_ms
+                total.last_handshake_ms = stats.last_handshake_ms
+                total.data_handshakes += stats.data_handshakes
+                total.data_resumed += stats.data_resumed
+            return total
+
+    def clear(self) -> None:
+        """drop all cached contexts, sessions and stats"""
+        with self._lock:
+            self._contexts.clear()
+            self._sessions.clear()
+            self._stats.clear()
+
+
+tls_session_cache = TLSSessionCache()
+"""process-wide TLS session cache used by `IoTFTPSClient`"""
 
 
 class ImplicitTLS(ftplib.FTP_TLS):
     """ftplib.FTP_TLS sub-class to support implicit SSL FTPS"""
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, session_cache: TLSSessionCache | None = None, **kwargs):
         super().__init__(*args, **kwargs)
         self._sock = None
+        self._session_cache = session_cache
 
     @property
     def sock(self):
@@ -83,10 +317,49 @@ class ImplicitTLS(ftplib.FTP_TLS):
     @sock.setter
     def sock(self, value):
         """wrap and set SSL socket"""
-        if value is not None and not isinstance(value, ssl.SSLSocket):
-            value = self.context.wrap_socket(value)
+        if value is None:
+            self.remember_session()
+        elif not isinstance(value, ssl.SSLSocket):
+            value = self._wrap_control_socket(value)
         self._sock = value
 
+    def _wrap_control_socket(self, raw):
+        cache = self._session_cache
+        if cache is None:
+            return self.context.wrap_socket(raw)
+
+        self.context = cache.context(self.host, self.port, self.context)
+        session = cache.session(self.host, self.port)
+        start = time.perf_counter()
+        try:
+            conn = self.context.wrap_socket(raw, session=session)
+        except (ssl.SSLError, ValueError):
+            if session is None:
+                raise
+            # the cached session was rejected outright; forget it and start over
+            logger.debug(
+                "ImplicitTLS - session resumption failed, retrying full handshake"
+            )
+            cache.discard(self.host, self.port)
+            raw.close()
+            raw = socket.create_connection(
+                (self.host, self.port), self.timeout, source_address=self.source_address
+            )
+            start = time.perf_counter()
+            conn = self.context.wrap_socket(raw)
+        cache.record(
+            self.host,
+            self.port,
+            (time.perf_counter() - start) * 1000.0,
+            conn.session_reused,
+        )
+        return conn
+
+    def remember_session(self) -> None:
+        """store the control connection's current TLS session for resumption"""
+        if self._session_cache is not None and self._sock is not None:
+            self._session_cache.store(self.host, self.port, self._sock.session)
+
     def ntransfercmd(self, cmd, rest=None):
         conn, size = ftplib.FTP.ntransfercmd(self, cmd, rest)
 
@@ -94,9 +367,171 @@ class ImplicitTLS(ftplib.FTP_TLS):
             conn = self.context.wrap_socket(
                 conn, server_hostname=self.host, session=self.sock.session
             )  # this is the fix
+            if self._session_cache is not None:
+                self._session_cache.record(
+                    self.host, self.port, 0.0, conn.session_reused, data=True
+                )
         return conn, size
 
 
+class RemoteFile(io.RawIOBase):
+    """read-only, seekable view of a file inside the FTPS server
+
+    bytes are fetched on demand with `REST` + `RETR`, so `zipfile.ZipFile` can read
+    an archive's central directory and individual members without downloading the
+    whole file.  the last `tail_size` bytes (end of central directory and, usually,
+    the central directory itself) are fetched once and cached.  sequential reads
+    share one transfer, and a forward seek of up to `skip_limit` bytes reads through
+    the gap instead of starting a new one.
+
+    the client's control connection is busy while a transfer is open; `close()` the
+    file before issuing other commands on the same client.
+    """
+
+    def __init__(
+        self,
+        client: "IoTFTPSClient",
+        path: str,
+        size: int | None = None,
+        tail_size: int = 65536,
+        skip_limit: int = 262144,
+    ) -> None:
+        super().__init__()
+        self._session = client.ftps_session
+        self._path = path
+        if size is None:
+            # some servers refuse SIZE in ASCII mode
+            self._session.voidcmd("TYPE I")
+            size = self._session.size(path)
+        self._size = size
+        if self._size is None:
+            raise ftplib.error_reply(f"SIZE not available for {path}")
+        self._tail_start = max(0, self._size - tail_size)
+        self._tail: bytes | None = None
+        self._skip_limit = skip_limit
+        self._pos = 0
+        self._conn = None
+        self._conn_pos = 0
+        self.transfers = 0
+        """number of `RETR` transfers started"""
+        self.bytes_fetched = 0
+        """bytes received over the data connection (including skipped gaps)"""
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if pos < 0:
+            raise OSError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        n = min(len(view), self._size - self._pos)
+        if n <= 0:
+            return 0
+
+        if self._pos >= self._tail_start:
+            if self._tail is None:
+                self._tail = self._fetch_tail()
+            offset = self._pos - self._tail_start
+            view[:n] = self._tail[offset : offset + n]
+        else:
+            filled = 0
+            while filled < n:
+                conn = self._stream_at(self._pos + filled)
+                got = conn.recv_into(view[filled:n])
+                if not got:
+                    raise EOFError(f"transfer of {self._path} ended early")
+                filled += got
+                self._conn_pos += got
+                self.bytes_fetched += got
+
+        self._pos += n
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._close_stream()
+        super().close()
+
+    def _fetch_tail(self) -> bytes:
+        self._close_stream()
+        conn = self._stream_at(self._tail_start)
+        chunks = []
+        while True:
+            data = conn.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+            self._conn_pos += len(data)
+            self.bytes_fetched += len(data)
+        self._close_stream()
+        return b"".join(chunks)
+
+    def _stream_at(self, pos: int):
+        conn = self._conn
+        if (
+            conn is not None
+            and self._conn_pos <= pos <= self._conn_pos + self._skip_limit
+        ):
+            # cheaper to read through a small gap than to start a new transfer
+            scratch = bytearray(min(65536, max(1, pos - self._conn_pos)))
+            while self._conn_pos < pos:
+                got = conn.recv_into(scratch, min(len(scratch), pos - self._conn_pos))
+                if not got:
+                    raise EOFError(f"transfer of {self._path} ended early")
+                self._conn_pos += got
+                self.bytes_fetched += got
+            return conn
+
+        self._close_stream()
+        self._session.voidcmd("TYPE I")
+        self._conn = self._session.transfercmd(f"RETR {self._path}", rest=pos or None)
+        self._conn_pos = pos
+        self.transfers += 1
+        return self._conn
+
+    def _close_stream(self) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        self._conn = None
+        complete = self._conn_pos >= self._size
+        try:
+            if complete and isinstance(conn, ssl.SSLSocket):
+                conn.unwrap()
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        try:
+            self._session.voidresp()
+        except (ftplib.error_temp, ftplib.error_perm):
+            # 426 / 451 after a transfer we closed early
+            if complete:
+                raise
+
+
 class IoTFTPSClient:
     """iot ftps ftpsclient"""
 
@@ -116,12 +551,14 @@ class IoTFTPSClient:
         ftps_user: str | None = "",
         ftps_pass: str | None = "",
         ssl_implicit: bool | None = False,
+        prefer_mlsd: bool = True,
     ) -> None:
         self.ftps_host = ftps_host
         self.ftps_port = ftps_port
         self.ftps_user = ftps_user
         self.ftps_pass = ftps_pass
         self.ssl_implicit = ssl_implicit
+        self.prefer_mlsd = prefer_mlsd
         self.instantiate_ftps_session()
 
     def __repr__(self) -> str:
@@ -136,7 +573,13 @@ class IoTFTPSClient:
 
     def instantiate_ftps_session(self) -> None:
         """init ftps_session based on input params"""
-        self.ftps_session = ImplicitTLS() if self.ssl_implicit else ftplib.FTP()
+        self._features: set[str] | None = None
+        self._mlst_facts_set = False
+        self.ftps_session = (
+            ImplicitTLS(session_cache=tls_session_cache)
+            if self.ssl_implicit
+            else ftplib.FTP()
+        )
         self.ftps_session.set_debuglevel(0)
 
         self.welcome = self.ftps_session.connect(
@@ -150,15 +593,29 @@ class IoTFTPSClient:
 
         if self.ssl_implicit:
             self.ftps_session.prot_p()
+            # by now any TLS 1.3 session ticket has arrived on the control connection
+            self.ftps_session.remember_session()
 
     def disconnect(self) -> None:
         """disconnect the current session from the ftps server"""
         self.ftps_session.close()
 
-    def download_file(self, source: str, dest: str):
-        """download a file to a path on the local filesystem"""
+    def open_file(self, path: str, size: int | None = None) -> RemoteFile:
+        """open a file inside the FTPS server for ranged, seekable reading"""
+        return RemoteFile(self, path, size=size)
+
+    def download_file(self, source: str, dest: str, digest=None):
+        """download a file to a path on the local filesystem, updating `digest` with its bytes"""
         with open(dest, "wb") as file:
-            self.ftps_session.retrbinary(f"RETR {source}", file.write)
+            if digest is None:
+                self.ftps_session.retrbinary(f"RETR {source}", file.write)
+                return
+
+            def write(block: bytes):
+                file.write(block)
+                digest.update(block)
+
+            self.ftps_session.retrbinary(f"RETR {source}", write)
 
     def upload_file(self, source: str, dest: str, callback=None):
         """upload a file to a path inside the FTPS server"""
@@ -231,68 +688,137 @@ class IoTFTPSClient:
         """list files under a path inside the FTPS server"""
         return self.ftps_session.dir(path, print)
 
+    def features(self) -> set[str]:
+        """return the (upper case) feature names advertised by `FEAT`, cached per session"""
+        if self._features is None:
+            try:
+                resp = self.ftps_session.sendcmd("FEAT")
+            except ftplib.Error:
+                resp = ""
+            # feature lines are indented by a single space between "211-" and "211 "
+            self._features = {
+                line.split()[0].upper()
+                for line in resp.splitlines()
+                if line.startswith(" ") and line.strip()
+            }
+        return self._features
+
+    def iter_files(self, path: str) -> Iterator[FtpListItem]:
+        """lazily yield the entries under a path inside the FTPS server
+
+        `MLSD` is used when the server advertises it (and `prefer_mlsd` is set), `LIST`
+        otherwise.  Rows are parsed as they arrive off the data connection.
+        """
+        prefix = "" if path == "/" else path
+
+        if self.prefer_mlsd and "MLST" in self.features():
+            if not self._mlst_facts_set:
+                self._mlst_facts_set = True
+                try:
+                    # only ask for the facts FtpListItem needs
+                    self.ftps_session.sendcmd("OPTS MLST type;size;modify;")
+                except ftplib.Error:
+                    pass
+            lines = self._iter_lines(f"MLSD {path}")
+            try:
+                line = next(lines, None)
+            except ftplib.error_perm as e:
+                if not str(e).startswith(("500", "502")):
+                    raise
+                # advertised but not implemented; don't try again on this session
+                logger.debug(f"MLSD rejected, falling back to LIST: {e}")
+                self._features.discard("MLST")
+            else:
+                while line is not None:
+                    item = parse_mlsd_line(line, prefix)
+                    if item is not None:
+                        yield item
+                    line = next(lines, None)
+                return
+
+        today = datetime.datetime.today().astimezone(_UTC)
+        for line in self._iter_lines(f"LIST {path}"):
+            item = parse_list_line(line, prefix, today)
+            if item is not None:
+                yield item
+
+    def _iter_lines(self, cmd: str) -> Iterator[str]:
+        """`ftplib.FTP.retrlines` as a generator"""
+        session = self.ftps_session
+        session.sendcmd("TYPE A")
+        with session.transfercmd(cmd) as conn, conn.makefile(
+            "r", encoding=session.encoding
+        ) as fp:
+            try:
+                while True:
+                    line = fp.readline(session.maxline + 1)
+                    if len(line) > session.maxline:
+                        raise ftplib.Error(f"got more than {session.maxline} bytes")
+                    if not line:
+                        break
+                    yield line.rstrip("\r\n")
+            except GeneratorExit:
+                # the consumer stopped early; drain the transfer so the control
+                # connection stays in sync
+                for _ in fp:
+                    pass
+            # shutdown ssl layer
+            if isinstance(conn, ssl.SSLSocket):
+                conn.unwrap()
+        session.voidresp()
+
+    def stat_file(self, path: str) -> FtpListItem | None:
+        """return the listing entry for one file without listing its directory
+
+        `MLST` is used when `iter_files` would use `MLSD`, otherwise `SIZE` + `MDTM`
+        with the time truncated to the minute, as a `LIST` row shows it.  returns None
+        if the server answers neither.
+        """
+        prefix, _, name = path.rpartition("/")
+        if self.prefer_mlsd and "MLST" in self.features():
+            try:
+                resp = self.ftps_session.sendcmd(f"MLST {path}")
+            except ftplib.error_perm:
+                resp = ""
+            for line in resp.splitlines():
+                # " type=file;size=123;modify=20250101120000; /path/name.3mf"
+                if line.startswith(" "):
+                    facts = line[1:].partition(" ")[0]
+                    item = parse_mlsd_line(f"{facts} {name}", prefix)
+                    if item is not None:
+                        return item
+
+        try:
+            self.ftps_session.voidcmd("TYPE I")
+            size = self.ftps_session.size(path)
+            modify = self.ftps_session.sendcmd(f"MDTM {path}").split()[-1]
+            date = datetime.datetime(
+                int(modify[0:4]),
+                int(modify[4:6]),
+                int(modify[6:8]),
+                int(modify[8:10]),
+                int(modify[10:12]),
+                tzinfo=_UTC,
+            )
+        except (ftplib.Error, ValueError, IndexError):
+            return None
+        if size is None:
+            return None
+        return FtpListItem(
+            path=f"{prefix}/{name}",
+            name=name,
+            size=size,
+            is_dir=False,
+            timestamp=date,
+        )
+
     def list_files_ex(self, path: str) -> list[FtpListItem] | None:
         """list files under a path inside the FTPS server"""
         try:
-            lines: list[str] = []
-            self.ftps_session.dir(path, lines.append)
-            s = "\n".join(lines)
+            return list(self.iter_files(path))
         except ftplib.error_perm:
             # no permission for this path
             return []
         except Exception:
             logger.exception("Unexpected exception occurred while fetching file list")
             return []
-
-        files = []
-        for row in s.split("\n"):
-            try:
-                if len(row) <= 0:
-                    continue
-
-                match = FTP_LIST_PATTERN.fullmatch(row)
-                if not match:
-                    continue
-
-                month = MONTH_LOOKUP.get(match.group("month"))
-                if month is None:
-                    # invalid month
-                    continue
-
-                if match.group("year"):  # "Nov 11 2025"
-                    date = datetime.datetime(
-                        int(match.group("year")), month, int(match.group("day"))
-                    )
-                else:  # "Nov 11 18:19"
-                    today = datetime.datetime.today().astimezone(datetime.timezone.utc)
-                    date = datetime.datetime(
-                        today.year,
-                        month,
-                        int(match.group("day")),
-                        hour=int(match.group("hour")),
-                        minute=int(match.group("minute")),
-                        tzinfo=datetime.timezone.utc,
-                    )
-                    if date > today:
-                        date = (date + datetime.timedelta(days=-365))
-
-                prefix = "" if path == "/" else path
-                name = match.group("name")
-                size = int(match.group("size"))
-
-                files.append(
-                    FtpListItem(
-                        path=f"{prefix}/{name}",
-                        name=name,
-                        size=size,
-                        is_dir=match.group("directory") == "d",
-                        timestamp=date,
-                        owner=match.group("owner"),
-                        group=match.group("group"),
-                        permissions=match.group("permissions"),
-                    )
-                )
-            except Exception:
-                logger.exception(f"Unexpected error while parsing listing row: {row}")
-
-        return files
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+
+from bpm.bambuasync import AsyncBambuPrinter
+from bpm.bambuconfig import BambuConfig
+from bpm.bambutools import ServiceState
+
+
+@pytest.fixture
+def printer(tmp_path) -> AsyncBambuPrinter:
+    config = BambuConfig(
+        hostname="10.0.0.1",
+        access_code="1234",
+        serial_number="SN",
+        bpm_cache_path=tmp_path,
+    )
+    return AsyncBambuPrinter(config)
+
+
+def test_properties_are_read_directly(printer):
+    assert printer.config is printer.printer.config
+    assert printer.printer_state is printer.printer.printer_state
+    with pytest.raises(AttributeError):
+        printer._not_there  # noqa: B018
+
+
+def test_methods_become_coroutines(printer):
+    calls = []
+
+    def pause_printing():
+        calls.append(threading.current_thread())
+
+    def get_sdcard_contents(force_refresh=False):
+        calls.append(threading.current_thread())
+        return {"id": "/", "force_refresh": force_refresh}
+
+    printer.printer.pause_printing = pause_printing
+    printer.printer.get_sdcard_contents = get_sdcard_contents
+
+    async def main():
+        await printer.pause_printing()
+        return await printer.get_sdcard_contents(force_refresh=True)
+
+    assert asyncio.run(main()) == {"id": "/", "force_refresh": True}
+    # mqtt commands run on the event loop, FTPS calls in the default executor
+    assert calls[0] is threading.main_thread()
+    assert calls[1] is not threading.main_thread()
+
+
+def test_ftps_calls_run_one_at_a_time(printer):
+    running = 0
+    overlapped = False
+    lock = threading.Lock()
+
+    def download_sdcard_file(src, dest):
+        nonlocal running, overlapped
+        with lock:
+            running += 1
+            overlapped |= running > 1
+        threading.Event().wait(0.05)
+        with lock:
+            running -= 1
+
+    printer.printer.download_sdcard_file = download_sdcard_file
+
+    async def main():
+        await asyncio.gather(
+            *(printer.download_sdcard_file(f"/{n}.3mf", f"{n}.3mf") for n in range(3))
+        )
+
+    asyncio.run(main())
+    assert not overlapped
+
+
+def test_updates_are_merged_and_end_on_quit(printer):
+    received = []
+
+    async def main():
+        printer._loop = asyncio.get_running_loop()
+
+        async def consume():
+            async for changed in printer.updates():
+                received.append(changed)
+                if len(received) == 1:
+                    # both arrive while the consumer is busy and are merged
+                    on_update = printer.printer.on_update
+                    on_update(printer.printer, frozenset({"climate.bed_temp"}))
+                    on_update(printer.printer, frozenset({"gcode_state"}))
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        # updates can arrive from any thread
+        thread = threading.Thread(
+            target=printer.printer.on_update,
+            args=(printer.printer, frozenset({"mc_percent"})),
+        )
+        thread.start()
+        thread.join()
+        while len(received) < 2:
+            await asyncio.sleep(0.01)
+        await printer.quit()
+        await asyncio.wait_for(consumer, 5)
+
+    asyncio.run(main())
+    assert received[:2] == [
+        frozenset({"mc_percent"}),
+        frozenset({"climate.bed_temp", "gcode_state"}),
+    ]
+    # `quit` reports the service state change before the iterator ends
+    assert len(received) == 3
+    assert printer.service_state == ServiceState.QUIT
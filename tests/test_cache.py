@@ -0,0 +1,241 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from bpm import bambucache
+from bpm.bambucache import BambuCacheManager, ProjectInfoCache, ProjectMetadataCache
+from bpm.bambuproject import ProjectInfo
+
+
+def write(path: Path, size: int, age: float = 0.0) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    if age:
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def make_manager(root: Path, **kwargs) -> BambuCacheManager:
+    manager = BambuCacheManager(root, **kwargs)
+    assert manager._swept.wait(5)
+    return manager
+
+
+@pytest.fixture
+def root(tmp_path) -> Path:
+    return tmp_path / "cache"
+
+
+def test_record_tracks_size(root):
+    manager = make_manager(root)
+    a = write(root / "projects" / "a.json", 100)
+    b = write(root / "projects" / "b.json", 50)
+    manager.record(a)
+    manager.record(b)
+
+    # rewriting a file replaces its size rather than adding to it
+    write(a, 30)
+    manager.record(a)
+
+    stats = manager.stats
+    assert (stats.entries, stats.bytes) == (2, 80)
+
+    manager.forget(b)
+    stats = manager.stats
+    assert (stats.entries, stats.bytes) == (1, 30)
+
+
+def test_evicts_least_recently_used_first(root):
+    manager = make_manager(root, max_bytes=300)
+    files = [write(root / "projects" / f"{n}.json", 100) for n in "abc"]
+    for file in files:
+        manager.record(file)
+    # `a` becomes the most recently used, leaving `b` as the oldest
+    manager.touch(files[0])
+
+    d = write(root / "projects" / "d.json", 100)
+    manager.record(d)
+
+    assert [f.exists() for f in files] == [True, False, True]
+    assert d.exists()
+    stats = manager.stats
+    assert (stats.entries, stats.bytes, stats.evictions) == (3, 300, 1)
+
+    # an entry larger than the whole budget evicts everything older than itself
+    e = write(root / "projects" / "e.json", 250)
+    manager.record(e)
+    assert [f.exists() for f in [*files, d, e]] == [False, False, False, False, True]
+    stats = manager.stats
+    assert (stats.entries, stats.bytes, stats.evictions) == (1, 250, 4)
+
+
+def test_evicts_entries_older_than_max_age(root, monkeypatch):
+    monkeypatch.setattr(bambucache, "_EXPIRE_INTERVAL", 0.0)
+    manager = make_manager(root, max_age=60.0)
+    old = write(root / "thumbnails" / "old.png", 10)
+    new = write(root / "thumbnails" / "new.png", 10)
+    manager.record(old)
+    manager.record(new)
+    manager._entries[old.absolute()].accessed -= 120
+
+    manager.enforce()
+
+    assert not old.exists()
+    assert new.exists()
+    assert manager.stats.bytes == 10
+
+
+def test_sweep_seeds_lru_order_from_mtime(root):
+    newest = write(root / "projects" / "newest.json", 100, age=10)
+    oldest = write(root / "SN" / "metadata" / "oldest.json", 100, age=1000)
+    middle = write(root / "thumbnails" / "middle.png", 100, age=100)
+
+    manager = make_manager(root, max_bytes=200)
+    manager.enforce()
+
+    assert not oldest.exists()
+    assert middle.exists()
+    assert newest.exists()
+    stats = manager.stats
+    assert (stats.entries, stats.bytes, stats.evictions) == (2, 200, 1)
+
+
+def test_sweep_removes_orphans_and_ignores_other_files(root):
+    download = write(root / "SN" / "model.3mf", 100, age=1000)
+    in_progress = write(root / "SN" / "other.3mf", 100)
+    tmp = write(root / "projects" / "a.json.1-2.tmp", 100, age=1000)
+    elapsed = write(root / "elapsed" / "SN.json", 100, age=1000)
+
+    manager = make_manager(root, max_bytes=1)
+
+    assert not download.exists()
+    assert not tmp.exists()
+    assert in_progress.exists()
+    assert elapsed.exists()
+    stats = manager.stats
+    assert (stats.orphans_removed, stats.entries, stats.bytes) == (2, 0, 0)
+
+
+def test_metadata_cache_indexes_records(root):
+    cache = ProjectMetadataCache(root / "SN" / "metadata")
+    cache.put(
+        {
+            "id": "/cache/a.3mf",
+            "name": "a.3mf",
+            "size": 100,
+            "timestamp": 1700000000,
+            "md5": "abc",
+        }
+    )
+
+    assert "/cache/a.3mf" in cache
+    assert cache.find("/cache/a.3mf", size=100, timestamp=1700000000)["md5"] == "abc"
+    assert cache.find("/cache/a.3mf", md5="ABC") is not None
+    assert cache.find("/cache/a.3mf", size=101, timestamp=1700000000) is None
+    assert cache.find("/cache/a.3mf", size=100) is None
+    assert cache.get_by_md5("ABC")["id"] == "/cache/a.3mf"
+    assert not list(cache.directory.glob("*.tmp"))
+
+    # a fresh instance rebuilds the index from disk
+    reopened = ProjectMetadataCache(root / "SN" / "metadata")
+    assert reopened.has("/cache/a.3mf", md5="abc")
+
+
+def test_metadata_cache_remove_tree(root):
+    cache = ProjectMetadataCache(root / "metadata")
+    for project_id in ("/cache/a.3mf", "/cache/sub/b.3mf", "/cachedir/c.3mf"):
+        cache.put({"id": project_id, "md5": project_id})
+
+    cache.remove_tree("/cache")
+
+    assert len(cache) == 1
+    assert "/cachedir/c.3mf" in cache
+    assert cache.get_by_md5("/cache/a.3mf") is None
+    assert len(list(cache.directory.iterdir())) == 1
+
+
+def test_metadata_cache_drops_outdated_and_colliding_records(root):
+    directory = root / "metadata"
+    directory.mkdir(parents=True)
+    (directory / "old.json").write_text('{"id": "/old.3mf"}')
+    (directory / "broken.json").write_text("{")
+    (directory / "partial.json.1-2.tmp").write_text("{")
+
+    cache = ProjectMetadataCache(directory)
+    assert len(cache) == 0
+    assert not list(directory.iterdir())
+
+    # "/a-b.3mf" and "/a/b.3mf" share a file name; the later write wins
+    cache.put({"id": "/a-b.3mf", "md5": "1"})
+    cache.put({"id": "/a/b.3mf", "md5": "2"})
+    assert "/a-b.3mf" not in cache
+    assert cache.find("/a/b.3mf", md5="2") is not None
+    assert cache.get_by_md5("1") is None
+
+
+def test_metadata_cache_reports_to_manager(root):
+    manager = make_manager(root)
+    cache = ProjectMetadataCache(root / "metadata", manager)
+    cache.put({"id": "/a.3mf", "md5": "1"})
+    assert manager.stats.entries == 1
+
+    cache.remove("/a.3mf")
+    assert manager.stats.entries == 0
+    assert manager.stats.bytes == 0
+
+
+def project_info(project_id: str, size: int = 100, md5: str = "ABC") -> ProjectInfo:
+    return ProjectInfo(id=project_id, size=size, timestamp=1700000000, md5=md5)
+
+
+def test_project_info_cache_checks_file_identity():
+    cache = ProjectInfoCache()
+    info = project_info("/a.3mf")
+    cache.put("SN", 1, info)
+
+    assert cache.get("SN", "/a.3mf", 1, size=100, timestamp=1700000000) is info
+    assert cache.get("SN", "/a.3mf", 1, md5="abc") is info
+    assert cache.get("OTHER", "/a.3mf", 1, md5="abc") is None
+    assert cache.get("SN", "/a.3mf", 2, md5="abc") is None
+    assert cache.get("SN", "/a.3mf", 1) is None
+
+    # a changed file drops the stale entry
+    assert cache.get("SN", "/a.3mf", 1, size=101, timestamp=1700000000) is None
+    assert len(cache) == 0
+
+
+def test_project_info_cache_evicts_least_recently_used():
+    cache = ProjectInfoCache(max_entries=2)
+    a, b, c = (project_info(f"/{name}.3mf") for name in "abc")
+    cache.put("SN", 1, a)
+    cache.put("SN", 1, b)
+    assert cache.get("SN", "/a.3mf", 1, md5="ABC") is a
+
+    cache.put("SN", 1, c)
+
+    assert cache.get("SN", "/b.3mf", 1, md5="ABC") is None
+    assert cache.get("SN", "/a.3mf", 1, md5="ABC") is a
+    assert cache.get("SN", "/c.3mf", 1, md5="ABC") is c
+
+
+def test_project_info_cache_invalidate_tree():
+    cache = ProjectInfoCache()
+    for project_id in ("/cache/a.3mf", "/cache/sub/b.3mf", "/cachedir/c.3mf"):
+        cache.put("SN", 1, project_info(project_id))
+        cache.put("SN", 2, project_info(project_id))
+    cache.put("OTHER", 1, project_info("/cache/a.3mf"))
+
+    cache.invalidate_tree("SN", "/cache/")
+
+    assert len(cache) == 3
+    assert cache.get("OTHER", "/cache/a.3mf", 1, md5="ABC") is not None
+    assert cache.get("SN", "/cachedir/c.3mf", 2, md5="ABC") is not None
+
+
+def test_project_info_cache_can_be_disabled():
+    cache = ProjectInfoCache(max_entries=0)
+    cache.put("SN", 1, project_info("/a.3mf"))
+    assert len(cache) == 0
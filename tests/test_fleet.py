@@ -0,0 +1,117 @@
+import socket
+import threading
+
+import pytest
+
+from bpm.bambuconfig import BambuConfig
+from bpm.bambufleet import BambuFleet
+from bpm.bambuprinter import BambuPrinter
+from bpm.bambutools import ServiceState
+
+
+def make_printer(tmp_path, serial: str) -> BambuPrinter:
+    config = BambuConfig(
+        hostname="10.0.0.1",
+        access_code="1234",
+        serial_number=serial,
+        bpm_cache_path=tmp_path / serial,
+    )
+    return BambuPrinter(config=config)
+
+
+def test_add_and_remove(tmp_path):
+    fleet = BambuFleet()
+    a = make_printer(tmp_path, "A")
+    b = make_printer(tmp_path, "B")
+    fleet.add(a)
+    fleet.add(b)
+
+    assert fleet.printers == {"A": a, "B": b}
+    assert a._fleet is fleet
+
+    assert fleet.remove("A") is a
+    assert a._fleet is None
+    assert a.service_state == ServiceState.QUIT
+    assert fleet.remove("A") is None
+    assert fleet.printers == {"B": b}
+    fleet.quit()
+
+
+def test_add_rejects_duplicate_and_missing_serial(tmp_path):
+    fleet = BambuFleet()
+    fleet.add(make_printer(tmp_path, "A"))
+
+    with pytest.raises(Exception, match="already part of the fleet"):
+        fleet.add(make_printer(tmp_path, "A"))
+
+    printer = make_printer(tmp_path, "B")
+    printer.config.serial_number = ""
+    with pytest.raises(Exception, match="serial_number is required"):
+        fleet.add(printer)
+    fleet.quit()
+
+
+def test_state_aggregates_printers(tmp_path):
+    fleet = BambuFleet()
+    printers = [make_printer(tmp_path, serial) for serial in "ABC"]
+    for printer in printers:
+        fleet.add(printer)
+    printers[0].printer_state.gcode_state = "RUNNING"
+    printers[1].printer_state.gcode_state = "PREPARE"
+    printers[1].printer_state.hms_errors = [{"code": "0300-0100-0001-0001"}]
+    printers[2].printer_state.gcode_state = "IDLE"
+
+    state = fleet.state
+
+    assert state.printers == 3
+    assert state.gcode_states == {"RUNNING": 1, "PREPARE": 1, "IDLE": 1}
+    assert state.printing == ["A", "B"]
+    assert state.hms_errors == ["B"]
+    assert sum(state.service_states.values()) == 3
+    assert state.sockets == 0
+    fleet.quit()
+
+
+class FakeClient:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.received = b""
+        self.read = threading.Event()
+
+    def socket(self):
+        return self.sock
+
+    def loop_read(self):
+        self.received += self.sock.recv(4096)
+        self.read.set()
+
+    def loop_write(self):
+        pass
+
+    def loop_misc(self):
+        pass
+
+    def want_write(self) -> bool:
+        return False
+
+
+def test_network_loop_services_registered_sockets(tmp_path):
+    fleet = BambuFleet()
+    printer = make_printer(tmp_path, "A")
+    fleet.add(printer)
+    fleet._ensure_loop()
+    ours, theirs = socket.socketpair()
+    client = FakeClient(ours)
+
+    fleet._post_op("open", client, ours, printer)
+    theirs.send(b"telemetry")
+    assert client.read.wait(5)
+    assert client.received == b"telemetry"
+    assert fleet.state.sockets == 1
+
+    fleet._post_op("close", client, ours)
+    fleet.quit()
+    assert fleet._thread is None
+    assert fleet._selector is None
+    ours.close()
+    theirs.close()
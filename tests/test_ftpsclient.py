@@ -0,0 +1,112 @@
+import datetime
+
+import pytest
+
+from bpm.ftpsclient.ftpsclient import parse_list_line, parse_mlsd_line
+
+UTC = datetime.timezone.utc
+TODAY = datetime.datetime(2025, 11, 20, 12, 0, tzinfo=UTC)
+
+
+def test_list_file_with_time():
+    item = parse_list_line(
+        "-rw-rw-rw-   1 root  root   4821504 Nov 11 18:19 Benchy.gcode.3mf",
+        "/cache",
+        TODAY,
+    )
+    assert item.path == "/cache/Benchy.gcode.3mf"
+    assert item.name == "Benchy.gcode.3mf"
+    assert item.size == 4821504
+    assert not item.is_dir
+    assert item.timestamp == datetime.datetime(2025, 11, 11, 18, 19, tzinfo=UTC)
+    assert (item.owner, item.group, item.permissions) == ("root", "root", "rw-rw-rw-")
+
+
+def test_list_directory_with_year():
+    item = parse_list_line(
+        "drwxrwxrwx   2 root  root      4096 Jan  5  2024 timelapse", "", TODAY
+    )
+    assert item.path == "/timelapse"
+    assert item.is_dir
+    assert item.timestamp == datetime.datetime(2024, 1, 5, tzinfo=UTC)
+
+
+def test_list_time_after_today_is_last_year():
+    item = parse_list_line(
+        "-rw-rw-rw-   1 root  root       100 Dec 24 09:30 xmas.3mf", "", TODAY
+    )
+    assert item.timestamp.year == 2024
+
+
+def test_list_name_with_spaces():
+    item = parse_list_line(
+        "-rw-rw-rw-   1 root  root       100 Nov 11 18:19 my  model (2).3mf", "", TODAY
+    )
+    assert item.name == "my  model (2).3mf"
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        "total 12",
+        "lrwxrwxrwx   1 root  root         4 Nov 11 18:19 link -> x",
+        "-rw-rw-rw-   1 root  root       big Nov 11 18:19 a.3mf",
+        "-rw-rw-rw-   1 root  root       100 Foo 11 18:19 a.3mf",
+        "-rw-rw-rw-   1 root  root       100 Feb 30 18:19 a.3mf",
+        "-rw-rw-rw-   1 root  root       100 Nov 11 18h19 a.3mf",
+    ],
+)
+def test_list_rejects_invalid_rows(row):
+    assert parse_list_line(row, "", TODAY) is None
+
+
+def test_mlsd_file():
+    item = parse_mlsd_line(
+        "type=file;size=4821504;modify=20251111181942;UNIX.mode=0666; Benchy.gcode.3mf",
+        "/cache",
+    )
+    assert item.path == "/cache/Benchy.gcode.3mf"
+    assert item.size == 4821504
+    assert not item.is_dir
+    assert item.permissions == "rw-rw-rw-"
+    # seconds are dropped to match `LIST`
+    assert item.timestamp == datetime.datetime(2025, 11, 11, 18, 19, tzinfo=UTC)
+
+
+def test_mlsd_directory_and_name_with_spaces():
+    item = parse_mlsd_line("Type=dir;Modify=20240105000000; my models", "")
+    assert item.path == "/my models"
+    assert item.is_dir
+    assert item.size == 0
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        "type=cdir;modify=20251111181942; .",
+        "type=pdir;modify=20251111181942; ..",
+        "type=file;size=12;modify=20251111181942;",
+        "type=file;size=abc;modify=20251111181942; a.3mf",
+    ],
+)
+def test_mlsd_rejects_invalid_rows(row):
+    assert parse_mlsd_line(row, "") is None
+
+
+def test_mlsd_without_modify_uses_epoch():
+    item = parse_mlsd_line("type=file;size=1; a.3mf", "")
+    assert item.timestamp == datetime.datetime.fromtimestamp(0, UTC)
+
+
+def test_list_and_mlsd_agree():
+    listed = parse_list_line(
+        "-rw-rw-rw-   1 root  root   4821504 Nov 11 18:19 Benchy.gcode.3mf",
+        "/cache",
+        TODAY,
+    )
+    mlsd = parse_mlsd_line(
+        "type=file;size=4821504;modify=20251111181942;"
+        "UNIX.mode=0666;UNIX.owner=root;UNIX.group=root; Benchy.gcode.3mf",
+        "/cache",
+    )
+    assert mlsd == listed
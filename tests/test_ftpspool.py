@@ -0,0 +1,168 @@
+import threading
+
+import pytest
+
+from bpm.bambuconfig import BambuConfig
+from bpm.bambuftpspool import IoTFTPSPool
+from bpm.bambuprinter import BambuPrinter
+
+
+class FakeSession:
+    def __init__(self, client: "FakeClient"):
+        self._client = client
+
+    def voidcmd(self, cmd: str):
+        if not self._client.healthy:
+            raise OSError("connection reset")
+        self._client.commands.append(cmd)
+
+
+class FakeClient:
+    def __init__(self, key=None):
+        self.key = key
+        self.healthy = True
+        self.connected = True
+        self.commands: list[str] = []
+        self.ftps_session = FakeSession(self)
+
+    def disconnect(self):
+        self.connected = False
+
+
+class FakeFactory:
+    def __init__(self):
+        self.key = None
+        self.opened: list[FakeClient] = []
+
+    def __call__(self) -> FakeClient:
+        client = FakeClient(self.key)
+        self.opened.append(client)
+        return client
+
+
+def make_pool(factory, **kwargs) -> IoTFTPSPool:
+    kwargs.setdefault("keepalive_interval", 0)
+    kwargs.setdefault("idle_timeout", 60.0)
+    return IoTFTPSPool(factory, **kwargs)
+
+
+def test_lease_reuses_released_session():
+    factory = FakeFactory()
+    pool = make_pool(factory)
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    assert second is first
+    assert len(factory.opened) == 1
+    metrics = pool.metrics
+    assert (metrics.misses, metrics.hits, metrics.leased, metrics.idle) == (1, 1, 0, 1)
+    pool.close()
+
+
+def test_failed_lease_discards_session():
+    factory = FakeFactory()
+    pool = make_pool(factory)
+    with pytest.raises(RuntimeError), pool.lease() as client:
+        raise RuntimeError("transfer aborted")
+
+    assert not client.connected
+    metrics = pool.metrics
+    assert (metrics.discarded, metrics.leased, metrics.idle) == (1, 0, 0)
+
+
+def test_unhealthy_session_is_replaced():
+    factory = FakeFactory()
+    pool = make_pool(factory, health_check_after=0)
+    with pool.lease() as first:
+        pass
+    first.healthy = False
+    with pool.lease() as second:
+        pass
+
+    assert second is not first
+    assert not first.connected
+    assert pool.metrics.health_check_failures == 1
+    pool.close()
+
+
+def test_close_drops_idle_sessions():
+    factory = FakeFactory()
+    pool = make_pool(factory)
+    with pool.lease() as client:
+        pass
+    pool.close()
+
+    assert not client.connected
+    assert pool.metrics.idle == 0
+
+
+def test_session_leased_across_close_is_not_pooled():
+    factory = FakeFactory()
+    pool = make_pool(factory)
+    factory.key = "old"
+    with pool.lease() as old:
+        factory.key = "new"
+        pool.close()
+
+    assert not old.connected
+    assert pool.metrics.idle == 0
+    with pool.lease() as client:
+        assert client.key == "new"
+    assert pool.metrics.leased == 0
+    pool.close()
+
+
+def test_session_opened_during_close_is_not_pooled():
+    # `close` runs while the factory is still logging in with the old credentials
+    factory = FakeFactory()
+    opening = threading.Event()
+    proceed = threading.Event()
+
+    def slow_factory():
+        opening.set()
+        proceed.wait(5)
+        return factory()
+
+    pool = make_pool(slow_factory)
+    leased = []
+
+    def lease():
+        with pool.lease() as client:
+            leased.append(client)
+
+    thread = threading.Thread(target=lease)
+    thread.start()
+    assert opening.wait(5)
+    pool.close()
+    proceed.set()
+    thread.join(5)
+
+    assert not leased[0].connected
+    assert pool.metrics.idle == 0
+
+
+def test_printer_closes_pool_when_host_changes(tmp_path):
+    config = BambuConfig(
+        hostname="10.0.0.1",
+        access_code="1234",
+        serial_number="SN",
+        bpm_cache_path=tmp_path,
+    )
+    printer = BambuPrinter(config=config)
+    factory = FakeFactory()
+    printer._ftps_pool._factory = factory
+
+    factory.key = config.hostname
+    with printer.ftp_connection() as first:
+        pass
+    with printer.ftp_connection() as client:
+        assert client is first
+
+    config.hostname = factory.key = "10.0.0.2"
+    with printer.ftp_connection() as client:
+        assert client.key == "10.0.0.2"
+    assert not first.connected
+    assert len(factory.opened) == 2
+    printer._ftps_pool.close()
@@ -0,0 +1,244 @@
+import contextlib
+import datetime
+import ftplib
+import threading
+
+import pytest
+
+from bpm import bambusdcard
+from bpm.bambuconfig import BambuConfig
+from bpm.bambuprinter import BambuPrinter
+from bpm.bambusdcard import SdCardListingCache
+from bpm.ftpsclient.ftpsclient import FtpListItem
+
+TIMESTAMP = datetime.datetime(2025, 11, 11, 18, 19, tzinfo=datetime.timezone.utc)
+
+
+def item(path: str, is_dir: bool = False) -> FtpListItem:
+    return FtpListItem(
+        path=path,
+        name=path.rsplit("/", 1)[1],
+        size=0 if is_dir else 100,
+        is_dir=is_dir,
+        timestamp=TIMESTAMP,
+    )
+
+
+CARD = {
+    "/": [item("/cache", is_dir=True), item("/a.3mf")],
+    "/cache": [item("/cache/sub", is_dir=True), item("/cache/b.3mf")],
+    "/cache/sub": [item("/cache/sub/c.gcode")],
+}
+
+
+class FakeCard:
+    def __init__(self, listings: dict[str, list[FtpListItem]]):
+        self.listings = listings
+        self.listed: list[str] = []
+
+    def list_directory(self, directory: str) -> list[FtpListItem] | None:
+        self.listed.append(directory)
+        return self.listings.get(directory)
+
+    @contextlib.contextmanager
+    def open_lister(self):
+        yield self.list_directory
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(bambusdcard.time, "monotonic", clock)
+    return clock
+
+
+def ids(node: dict) -> list[str]:
+    result = [node["id"]]
+    for child in node.get("children", []):
+        result.extend(ids(child))
+    return result
+
+
+def test_listing_expires_after_ttl(clock):
+    cache = SdCardListingCache(ttl=30.0)
+    cache.put("/cache/", CARD["/cache"])
+
+    clock.now += 29.9
+    assert cache.get("/cache") == CARD["/cache"]
+    clock.now += 0.1
+    assert cache.get("/cache") is None
+
+
+def test_zero_ttl_disables_caching(clock):
+    cache = SdCardListingCache(ttl=0)
+    cache.put("/", CARD["/"])
+    assert cache.get("/") is None
+
+
+def test_insert_does_not_extend_ttl(clock):
+    cache = SdCardListingCache(ttl=30.0)
+    cache.put("/cache", CARD["/cache"])
+    clock.now += 20
+    cache.insert(item("/cache/d.3mf"))
+
+    assert [i.path for i in cache.get("/cache")][-1] == "/cache/d.3mf"
+    clock.now += 10
+    assert cache.get("/cache") is None
+
+
+def test_invalidate_tree_drops_directory_and_descendants(clock):
+    cache = SdCardListingCache()
+    for path, items in CARD.items():
+        cache.put(path, items)
+    cache.put("/cachedir", [])
+
+    cache.invalidate_tree("/cache/")
+
+    assert cache.get("/cache") is None
+    assert cache.get("/cache/sub") is None
+    assert cache.get("/") is not None
+    # a sibling sharing the name as a prefix is not beneath "/cache"
+    assert cache.get("/cachedir") is not None
+
+
+def test_invalidate_tree_from_root_drops_everything(clock):
+    cache = SdCardListingCache()
+    for path, items in CARD.items():
+        cache.put(path, items)
+
+    cache.invalidate_tree("/")
+
+    assert all(cache.get(path) is None for path in CARD)
+
+
+def test_build_trees_only_lists_stale_directories(clock):
+    cache = SdCardListingCache(ttl=30.0)
+    card = FakeCard(CARD)
+
+    contents, masked = cache.build_trees(card.open_lister)
+    assert sorted(card.listed) == sorted(CARD)
+    assert ids(contents) == [
+        "/",
+        "/cache/",
+        "/cache/sub/",
+        "/cache/sub/c.gcode",
+        "/cache/b.3mf",
+        "/a.3mf",
+    ]
+    assert ids(masked) == ["/", "/cache/", "/cache/sub/", "/cache/b.3mf", "/a.3mf"]
+
+    card.listed.clear()
+    cache.build_trees(card.open_lister)
+    assert card.listed == []
+
+    cache.invalidate("/cache/sub")
+    cache.build_trees(card.open_lister)
+    assert card.listed == ["/cache/sub"]
+
+    clock.now += 30
+    card.listed.clear()
+    cache.build_trees(card.open_lister)
+    assert sorted(card.listed) == sorted(CARD)
+
+
+def test_failed_listing_is_not_cached(clock):
+    cache = SdCardListingCache()
+    card = FakeCard({k: v for k, v in CARD.items() if k != "/cache/sub"})
+
+    contents, _ = cache.build_trees(card.open_lister)
+    assert "/cache/sub/" not in ids(contents)
+    assert cache.get("/cache/sub") is None
+
+    card.listings = CARD
+    card.listed.clear()
+    contents, _ = cache.build_trees(card.open_lister)
+    assert card.listed == ["/cache/sub"]
+    assert "/cache/sub/c.gcode" in ids(contents)
+
+
+def test_build_trees_returns_none_when_root_fails(clock):
+    cache = SdCardListingCache()
+    assert cache.build_trees(FakeCard({}).open_lister) is None
+
+
+def test_build_trees_with_concurrent_workers(clock):
+    cache = SdCardListingCache()
+    card = FakeCard(CARD)
+
+    contents, _ = cache.build_trees(card.open_lister, max_workers=4)
+
+    assert sorted(card.listed) == sorted(CARD)
+    assert len(ids(contents)) == 6
+
+
+def test_printer_retries_directory_it_could_not_list(tmp_path, clock):
+    class FakeFtps:
+        denied = {"/cache/sub"}
+
+        def iter_files(self, directory):
+            if directory in self.denied:
+                raise ftplib.error_perm("550 Failed to open directory.")
+            yield from CARD[directory]
+
+        def disconnect(self):
+            pass
+
+    ftps = FakeFtps()
+    config = BambuConfig(
+        hostname="10.0.0.1",
+        access_code="1234",
+        serial_number="SN",
+        bpm_cache_path=tmp_path,
+    )
+    printer = BambuPrinter(config=config)
+    printer._ftps_pool._factory = lambda: ftps
+
+    contents = printer.get_sdcard_contents()
+    assert "/cache/sub/" not in ids(contents)
+
+    ftps.denied = set()
+    contents = printer.get_sdcard_contents()
+    assert "/cache/sub/c.gcode" in ids(contents)
+    printer._ftps_pool.close()
+
+
+def test_build_trees_opens_extra_sessions_only_for_queued_work(clock):
+    wide = {"/": [item(f"/d{n}", is_dir=True) for n in range(6)]}
+    wide.update({f"/d{n}": [item(f"/d{n}/a.3mf")] for n in range(6)})
+    all_open = threading.Event()
+    sessions = []
+
+    @contextlib.contextmanager
+    def open_lister():
+        sessions.append(threading.current_thread())
+        if len(sessions) == 3:
+            all_open.set()
+
+        def list_directory(directory):
+            if directory != "/":
+                # holds every worker until all three are listing at the same time
+                all_open.wait(5)
+            return wide[directory]
+
+        yield list_directory
+
+    cache = SdCardListingCache()
+    contents, _ = cache.build_trees(open_lister, max_workers=3)
+
+    assert len(sessions) == 3
+    assert len(ids(contents)) == 13
+    assert all_open.is_set()
+
+    # a refresh touching one directory stays on the calling thread
+    sessions.clear()
+    cache.invalidate("/d0")
+    cache.build_trees(open_lister, max_workers=3)
+    assert sessions == [threading.current_thread()]
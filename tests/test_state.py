@@ -0,0 +1,195 @@
+import copy
+import dataclasses
+
+import pytest
+
+from bpm.bambuconfig import BambuConfig
+from bpm.bambuprinter import BambuPrinter
+from bpm.bambustate import BambuState
+
+# a full push from a single extruder printer followed by the deltas it sends
+SINGLE_EXTRUDER = [
+    {
+        "print": {
+            "gcode_state": "RUNNING",
+            "mc_percent": 45,
+            "nozzle_temper": 220.5,
+            "nozzle_target_temper": 220,
+            "bed_temper": 60.0,
+            "bed_target_temper": 60,
+            "chamber_temper": 31,
+            "cooling_fan_speed": "15",
+            "big_fan1_speed": "7",
+            "big_fan2_speed": "0",
+            "heatbreak_fan_speed": "15",
+            "wifi_signal": "-45dBm",
+            "nozzle_type": "hardened_steel",
+            "nozzle_diameter": "0.4",
+            "ams_status": 768,
+            "ams": {
+                "tray_now": "3",
+                "tray_tar": "3",
+                "ams_exist_bits": "1",
+                "tray_exist_bits": "f",
+                "ams": [{"id": 0, "temp": 25.5, "humidity": 3, "info": "2003"}],
+            },
+        },
+        "info": {"module": [{"name": "ams/0", "sn": "00600A000000001"}]},
+    },
+    {"print": {"mc_percent": 46}},
+    {"print": {"bed_temper": 59.5, "nozzle_temper": 221.0}},
+    {"print": {"ams": {"tray_now": "255", "tray_exist_bits": "7"}}},
+    {
+        "print": {
+            "ams": {
+                "ams": [
+                    {"id": 0, "temp": 65.2, "dry_time": 180, "info": "142024"},
+                    {"id": 1, "temp": 24.0, "humidity": 4, "info": "2003"},
+                ]
+            }
+        }
+    },
+    {"print": {"print_error": 50397185, "hms": [{"attr": 50397185, "code": 100}]}},
+    {"print": {"print_error": 0, "hms": []}},
+]
+
+# a full push from a dual extruder printer with a heated chamber, then partial pushes
+DUAL_EXTRUDER = [
+    {
+        "print": {
+            "gcode_state": "IDLE",
+            "fun": "3EC1AFFF9CFF",
+            "stat": "46A58008",
+            "bed_temper": 25.0,
+            "ams": {
+                "ams_exist_bits": "3",
+                "tray_exist_bits": "33",
+                "ams": [
+                    {"id": 0, "temp": 25.5, "humidity": 3, "info": "1003"},
+                    {"id": 1, "temp": 24.0, "humidity_raw": 40, "info": "2003"},
+                ],
+            },
+            "device": {
+                "extruder": {
+                    "state": 0x10,
+                    "info": [
+                        {"id": 0, "temp": 14418176, "info": 11, "stat": 0, "hnow": 0},
+                        {"id": 1, "temp": 26, "info": 0, "stat": 0, "hnow": 1},
+                    ],
+                },
+                "nozzle": {
+                    "info": [
+                        {"id": 0, "type": "HS01", "diameter": 0.4},
+                        {"id": 1, "type": "HH01", "diameter": 0.6},
+                    ]
+                },
+                "ctc": {"info": {"temp": 35 | (45 << 16)}},
+                "airduct": {
+                    "modeCur": 1,
+                    "subMode": 0,
+                    "parts": [
+                        {"id": 16, "state": 40},
+                        {"id": 32, "state": 0},
+                        {"id": 48, "state": 60},
+                        {"id": 96, "state": 0},
+                    ],
+                },
+            },
+        }
+    },
+    {"print": {"device": {"ctc": {"info": {"temp": 36 | (45 << 16)}}}}},
+    {"print": {"device": {"extruder": {"state": 0x00}}}},
+    {
+        "print": {
+            "device": {
+                "extruder": {
+                    "state": 0x00,
+                    "info": [
+                        {"id": 0, "temp": 14418190, "info": 11, "stat": 0, "hnow": 0}
+                    ],
+                }
+            }
+        }
+    },
+]
+
+
+def make_printer(tmp_path, name: str) -> BambuPrinter:
+    config = BambuConfig(
+        hostname="10.0.0.1",
+        access_code="1234",
+        serial_number="SN",
+        bpm_cache_path=tmp_path / name,
+    )
+    return BambuPrinter(config=config)
+
+
+def changed_fields(before: BambuState, after: BambuState) -> set[str]:
+    """The field paths `updateFromJson` should report for `before` -> `after`."""
+    changed = set()
+    for f in dataclasses.fields(BambuState):
+        old, new = getattr(before, f.name), getattr(after, f.name)
+        if f.name == "climate":
+            changed |= {
+                f"climate.{c.name}"
+                for c in dataclasses.fields(old)
+                if getattr(old, c.name) != getattr(new, c.name)
+            }
+        elif f.name in ("ams_units", "extruders"):
+            if len(new) < len(old):
+                changed.add(f.name)
+            for idx, item in enumerate(new):
+                if idx >= len(old):
+                    changed.add(f"{f.name}[{idx}]")
+                    continue
+                changed |= {
+                    f"{f.name}[{idx}].{c.name}"
+                    for c in dataclasses.fields(item)
+                    if getattr(old[idx], c.name) != getattr(item, c.name)
+                }
+        elif old != new:
+            changed.add(f.name)
+    return changed
+
+
+def collapse(changed: set[str]) -> set[str]:
+    """Drops the fields of added list elements, which the element itself covers."""
+    return {path for path in changed if path.split(".")[0] not in changed - {path}}
+
+
+@pytest.mark.parametrize(
+    "payloads",
+    [SINGLE_EXTRUDER, DUAL_EXTRUDER],
+    ids=["single-extruder", "dual-extruder"],
+)
+def test_update_from_json_matches_from_json(tmp_path, payloads):
+    # `copied` takes the copying `fromJson` path, `updated` is updated in place
+    copied = make_printer(tmp_path, "copied")
+    updated = make_printer(tmp_path, "updated")
+
+    for data in payloads:
+        before = copy.deepcopy(copied.printer_state)
+        copied._printer_state = BambuState.fromJson(data, copied)
+        changed = updated.printer_state.updateFromJson(data, updated)
+
+        assert updated.printer_state == copied.printer_state
+        assert collapse(changed) == changed_fields(before, copied.printer_state)
+        assert updated.config.capabilities == copied.config.capabilities
+
+
+def test_from_json_leaves_current_state_alone(tmp_path):
+    printer = make_printer(tmp_path, "printer")
+    printer.printer_state.updateFromJson(DUAL_EXTRUDER[0], printer)
+    before = copy.deepcopy(printer.printer_state)
+
+    state = BambuState.fromJson(DUAL_EXTRUDER[1], printer)
+
+    assert state.climate.chamber_temp == 36
+    assert printer.printer_state == before
+
+
+def test_repeated_payload_reports_no_changes(tmp_path):
+    printer = make_printer(tmp_path, "printer")
+    for data in SINGLE_EXTRUDER:
+        printer.printer_state.updateFromJson(data, printer)
+        assert printer.printer_state.updateFromJson(data, printer) == set()